@@ -3,25 +3,49 @@ AgentCoreClient.py
 Thin wrapper exposing generate, chat, embed, and streaming methods for AgentCoreProvider.
 """
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
-import boto3
-import json
+import orjson
 import logging
+from .bedrock_client import get_bedrock_client
+from .config import MODEL_CAPS
 
 class AgentCoreClient:
-    def __init__(self):
+    def __init__(self, caller_retries: bool = False):
         self.app = BedrockAgentCoreApp()
-        self.bedrock_client = boto3.client("bedrock-runtime")
+        # caller_retries: the caller retries throttles itself, so botocore should not
+        self.bedrock_client = get_bedrock_client(caller_retries=caller_retries)
         self.logger = logging.getLogger("AgentCoreClient")
         if not self.logger.hasHandlers():
             logging.basicConfig(level=logging.INFO)
 
+    def _nova_payload(self, messages, model_id):
+        """
+        Build a Nova request body, hoisting any "system" role messages into the
+        top-level "system" field (Nova only accepts user/assistant in messages).
+        For models with prompt caching, a cachePoint after the system blocks lets
+        Bedrock reuse the static prefix across calls.
+        """
+        system = [block for m in messages if m.get("role") == "system" for block in m.get("content", [])]
+        messages = [m for m in messages if m.get("role") != "system"]
+        if not messages:
+            self.logger.error("Nova chat: 'messages' must be a non-empty list.")
+            raise ValueError("Nova chat: 'messages' must be a non-empty list.")
+        if messages[0].get("role") != "user":
+            self.logger.error("Nova chat: First message must have role 'user'.")
+            raise ValueError("Nova chat: First message must have role 'user'.")
+        body = {"messages": messages}
+        if system:
+            if MODEL_CAPS.get(model_id, {}).get("prompt_cache"):
+                system.append({"cachePoint": {"type": "default"}})
+            body["system"] = system
+        return orjson.dumps(body)
+
     def generate(self, prompt, model_id, **kwargs):
         # TODO: Implement actual call to Bedrock model
         raise NotImplementedError("BedrockAgentCoreApp does not expose 'generate' directly. Implement model call here.")
 
     def chat(self, messages, model_id, **kwargs):
-        self.logger.debug(f"chat called with model_id={model_id}")
-        self.logger.debug(f"messages={messages}")
+        self.logger.debug("chat called with model_id=%s", model_id)
+        self.logger.debug("messages=%s", messages)
         
         # Amazon Nova models use specific format
         if model_id == "amazon.nova-lite-v1:0":
@@ -29,11 +53,8 @@ class AgentCoreClient:
             if not messages or not isinstance(messages, list):
                 self.logger.error("Nova chat: 'messages' must be a non-empty list.")
                 raise ValueError("Nova chat: 'messages' must be a non-empty list.")
-            if messages[0].get("role") != "user":
-                self.logger.error("Nova chat: First message must have role 'user'.")
-                raise ValueError("Nova chat: First message must have role 'user'.")
-            payload = json.dumps({"messages": messages})
-            self.logger.debug(f"Nova payload={payload}")
+            payload = self._nova_payload(messages, model_id)
+            self.logger.debug("Nova payload=%s", payload)
             try:
                 response = self.bedrock_client.invoke_model(
                     modelId=model_id,
@@ -41,8 +62,8 @@ class AgentCoreClient:
                     contentType="application/json",
                     accept="application/json"
                 )
-                body = json.loads(response["body"].read())
-                self.logger.debug(f"Nova response={body}")
+                body = orjson.loads(response["body"].read())
+                self.logger.debug("Nova response=%s", body)
             except Exception as e:
                 self.logger.error(f"Nova Bedrock error: {e}")
                 raise
@@ -67,8 +88,8 @@ class AgentCoreClient:
             self.logger.error("Bedrock chat: 'messages' must be a non-empty list.")
             raise ValueError("Bedrock chat: 'messages' must be a non-empty list.")
         
-        payload = json.dumps({"messages": messages})
-        self.logger.debug(f"Bedrock payload for {model_id}={payload}")
+        payload = orjson.dumps({"messages": messages})
+        self.logger.debug("Bedrock payload for %s=%s", model_id, payload)
         try:
             response = self.bedrock_client.invoke_model(
                 modelId=model_id,
@@ -76,8 +97,8 @@ class AgentCoreClient:
                 contentType="application/json",
                 accept="application/json"
             )
-            body = json.loads(response["body"].read())
-            self.logger.debug(f"Bedrock response for {model_id}={body}")
+            body = orjson.loads(response["body"].read())
+            self.logger.debug("Bedrock response for %s=%s", model_id, body)
         except Exception as e:
             self.logger.error(f"Bedrock error for {model_id}: {e}")
             raise
@@ -114,9 +135,9 @@ class AgentCoreClient:
             if not texts or not isinstance(texts, list):
                 self.logger.error("Cohere embed: 'texts' must be a non-empty list.")
                 raise ValueError("Cohere embed: 'texts' must be a non-empty list.")
-            payload = json.dumps({"texts": texts,
-                                  "input_type": "search_document"})
-            self.logger.debug(f"Cohere embed payload={payload}")
+            payload = orjson.dumps({"texts": texts,
+                                    "input_type": "search_document"})
+            self.logger.debug("Cohere embed payload=%s", payload)
             try:
                 response = self.bedrock_client.invoke_model(
                     modelId=model_id,
@@ -124,8 +145,8 @@ class AgentCoreClient:
                     contentType="application/json",
                     accept="application/json"
                 )
-                body = json.loads(response["body"].read())
-                self.logger.debug(f"Cohere embed response={body}")
+                body = orjson.loads(response["body"].read())
+                self.logger.debug("Cohere embed response=%s", body)
             except Exception as e:
                 self.logger.error(f"Cohere embed Bedrock error: {e}")
                 raise
@@ -138,14 +159,14 @@ class AgentCoreClient:
         # Actual embedding using AWS Bedrock
         vectors = []
         for text in texts:
-            payload = json.dumps({"inputText": text})
+            payload = orjson.dumps({"inputText": text})
             response = self.bedrock_client.invoke_model(
                 modelId=model_id,
                 body=payload,
                 contentType="application/json",
                 accept="application/json"
             )
-            body = json.loads(response["body"].read())
+            body = orjson.loads(response["body"].read())
             # Titan returns {"embedding": [...]}, Cohere returns {"embeddings": [[...]]}
             if "embedding" in body:
                 vectors.append(body["embedding"])
@@ -160,5 +181,40 @@ class AgentCoreClient:
         raise NotImplementedError("Streaming not implemented.")
 
     def chat_stream(self, messages, model_id, **kwargs):
-        # TODO: Implement streaming call
-        raise NotImplementedError("Streaming not implemented.")
+        """
+        Stream a chat completion, yielding {"text": delta} as tokens arrive.
+        Handles Nova (contentBlockDelta) and OpenAI-compatible (choices[].delta) events.
+        """
+        if not messages or not isinstance(messages, list):
+            self.logger.error("Bedrock chat_stream: 'messages' must be a non-empty list.")
+            raise ValueError("Bedrock chat_stream: 'messages' must be a non-empty list.")
+        if model_id == "amazon.nova-lite-v1:0":
+            payload = self._nova_payload(messages, model_id)
+        else:
+            payload = orjson.dumps({"messages": messages})
+        self.logger.debug("Bedrock stream payload for %s=%s", model_id, payload)
+        try:
+            response = self.bedrock_client.invoke_model_with_response_stream(
+                modelId=model_id,
+                body=payload,
+                contentType="application/json",
+                accept="application/json"
+            )
+        except Exception as e:
+            self.logger.error(f"Bedrock stream error for {model_id}: {e}")
+            raise
+
+        for event in response["body"]:
+            chunk = event.get("chunk")
+            if not chunk:
+                continue
+            body = orjson.loads(chunk["bytes"])
+            text = None
+            # Nova: {"contentBlockDelta": {"delta": {"text": "..."}}}
+            if "contentBlockDelta" in body:
+                text = body["contentBlockDelta"].get("delta", {}).get("text")
+            # OpenAI-compatible (GPT-OSS-120B): {"choices": [{"delta": {"content": "..."}}]}
+            elif body.get("choices"):
+                text = body["choices"][0].get("delta", {}).get("content")
+            if text:
+                yield {"text": text}
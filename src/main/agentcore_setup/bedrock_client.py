@@ -0,0 +1,39 @@
+"""
+bedrock_client.py
+Shared, pooled bedrock-runtime clients.
+botocore clients are thread-safe and expensive to build, so one client per
+region (and retry policy) is created on first use and reused by every service
+in the process.
+"""
+import os
+from functools import lru_cache
+from typing import Optional
+
+import boto3
+from botocore.config import Config
+
+# Connections kept alive per client; botocore's default of 10 throttles
+# concurrent LLM/embedding calls made from worker threads
+MAX_POOL_CONNECTIONS = int(os.getenv("BEDROCK_MAX_POOL_CONNECTIONS", "64"))
+
+
+# botocore retry policies: its own adaptive retries, or one attempt for callers
+# that already retry throttles themselves (see src/main/utils/Retry.py)
+BOTOCORE_RETRIES = {"max_attempts": 3, "mode": "adaptive"}
+NO_BOTOCORE_RETRIES = {"total_max_attempts": 1, "mode": "standard"}
+
+
+@lru_cache(maxsize=8)
+def get_bedrock_client(region: Optional[str] = None, caller_retries: bool = False):
+    """
+    Return the process-wide bedrock-runtime client for ``region``.
+    None uses boto3's default region resolution (AWS_REGION, config files, ...).
+    With ``caller_retries`` the client makes a single attempt per call, so an
+    app-level retry loop is the only retry layer and a throttle is not multiplied.
+    """
+    config = Config(
+        max_pool_connections=MAX_POOL_CONNECTIONS,
+        retries=NO_BOTOCORE_RETRIES if caller_retries else BOTOCORE_RETRIES,
+        tcp_keepalive=True,
+    )
+    return boto3.client("bedrock-runtime", region_name=region, config=config)
@@ -11,13 +11,20 @@ from dotenv import load_dotenv
 load_dotenv()
 
 AGENTCORE_CLIENT = None
+# Separate runtime whose Bedrock client makes one attempt per call, for callers with their own retries
+AGENTCORE_CLIENT_CALLER_RETRIES = None
 
-def get_runtime():
+def get_runtime(caller_retries: bool = False):
     """
     Returns a singleton AgentCoreClient instance.
+    With caller_retries, returns the one whose Bedrock client does not retry.
     TODO: Inject config/model registry if SDK supports it in future.
     """
-    global AGENTCORE_CLIENT
+    global AGENTCORE_CLIENT, AGENTCORE_CLIENT_CALLER_RETRIES
+    if caller_retries:
+        if AGENTCORE_CLIENT_CALLER_RETRIES is None:
+            AGENTCORE_CLIENT_CALLER_RETRIES = AgentCoreClient(caller_retries=True)
+        return AGENTCORE_CLIENT_CALLER_RETRIES
     if AGENTCORE_CLIENT is None:
         AGENTCORE_CLIENT = AgentCoreClient()
     return AGENTCORE_CLIENT
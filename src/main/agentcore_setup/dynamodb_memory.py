@@ -3,7 +3,7 @@ dynamodb_memory.py
 DynamoDB-backed conversation memory for persistent chat history across sessions.
 Implements single-table design with PK/SK pattern for efficient queries.
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 import logging
@@ -148,6 +148,95 @@ class DynamoDBConversationMemory:
             logger.error(f"Failed to add message to DynamoDB: {e}")
             raise
     
+    def add_exchange(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_tokens: Optional[int] = None,
+        assistant_tokens: Optional[int] = None,
+        context_ids: Optional[List[str]] = None
+    ) -> None:
+        """
+        Add a user question and the assistant's answer in two requests.
+        
+        Both message items go out in one BatchWriteItem, and the metadata is
+        upserted with a single UpdateItem (if_not_exists creates it for a new
+        session), instead of the read-create-put-update sequence per message.
+        
+        Args:
+            session_id: Unique session identifier
+            user_content: The user's message
+            assistant_content: The assistant's reply
+            user_tokens: Optional token count for the user message
+            assistant_tokens: Optional token count for the assistant message
+            context_ids: Optional list of document IDs used for the reply
+        """
+        now = datetime.now(timezone.utc)
+        user_timestamp = now.isoformat()
+        # Distinct sort keys keep the pair ordered and stop the answer overwriting the question
+        assistant_timestamp = (now + timedelta(microseconds=1)).isoformat()
+        ttl = int((now + timedelta(days=self.ttl_days)).timestamp())
+        
+        user_item = {
+            'PK': f'SESSION#{session_id}',
+            'SK': f'MESSAGE#{user_timestamp}',
+            'role': 'user',
+            'content': user_content,
+            'timestamp': user_timestamp
+        }
+        if user_tokens is not None:
+            user_item['tokens'] = user_tokens
+        
+        assistant_item = {
+            'PK': f'SESSION#{session_id}',
+            'SK': f'MESSAGE#{assistant_timestamp}',
+            'role': 'assistant',
+            'content': assistant_content,
+            'timestamp': assistant_timestamp
+        }
+        if assistant_tokens is not None:
+            assistant_item['tokens'] = assistant_tokens
+        if context_ids is not None:
+            assistant_item['context_ids'] = context_ids
+        
+        try:
+            with self.table.batch_writer() as batch:
+                batch.put_item(Item=user_item)
+                batch.put_item(Item=assistant_item)
+            
+            self.table.update_item(
+                Key={
+                    'PK': f'SESSION#{session_id}',
+                    'SK': 'METADATA'
+                },
+                UpdateExpression=(
+                    'SET last_accessed = :la, '
+                    'created_at = if_not_exists(created_at, :la), '
+                    'pedagogy_mode = if_not_exists(pedagogy_mode, :mode), '
+                    'title = if_not_exists(title, :title), '
+                    '#ttl = if_not_exists(#ttl, :ttl), '
+                    'message_count = if_not_exists(message_count, :zero) + :inc, '
+                    'total_tokens = if_not_exists(total_tokens, :zero) + :tokens'
+                ),
+                ExpressionAttributeNames={'#ttl': 'ttl'},
+                ExpressionAttributeValues={
+                    ':la': assistant_timestamp,
+                    ':mode': 'explanatory',
+                    ':title': 'New Chat',
+                    ':ttl': ttl,
+                    ':zero': 0,
+                    ':inc': 2,
+                    ':tokens': (user_tokens or 0) + (assistant_tokens or 0)
+                }
+            )
+            
+            logger.debug(f"Added exchange to session {session_id[:8]}...")
+            
+        except ClientError as e:
+            logger.error(f"Failed to add exchange to DynamoDB: {e}")
+            raise
+    
     def get_history(
         self, 
         session_id: str, 
@@ -205,6 +294,66 @@ class DynamoDBConversationMemory:
             logger.error(f"Failed to get history from DynamoDB: {e}")
             return []
     
+    def get_session_history(
+        self,
+        session_id: str,
+        max_messages: Optional[int] = None
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Check a session exists and fetch its history in one query.
+        
+        The session's METADATA item sorts after its MESSAGE# items, so a
+        descending query on the partition returns metadata first followed by
+        the newest messages; max_messages becomes the query Limit.
+        
+        Args:
+            session_id: Unique session identifier
+            max_messages: Maximum number of recent messages to return (None = all)
+        
+        Returns:
+            (exists, history) - history is most recent last, empty when the session doesn't exist
+        """
+        query_kwargs = {
+            'KeyConditionExpression': 'PK = :pk',
+            'ExpressionAttributeValues': {':pk': f'SESSION#{session_id}'},
+            'ScanIndexForward': False  # METADATA, then newest message first
+        }
+        if max_messages is not None and max_messages > 0:
+            query_kwargs['Limit'] = max_messages + 1  # + METADATA item
+        
+        try:
+            response = self.table.query(**query_kwargs)
+        except ClientError as e:
+            logger.error(f"Failed to get session history from DynamoDB: {e}")
+            return False, []
+        
+        exists = False
+        messages = []
+        for item in response.get('Items', []):
+            if item['SK'] == 'METADATA':
+                exists = True
+                continue
+            message = {
+                'role': item['role'],
+                'content': item['content'],
+                'timestamp': item['timestamp']
+            }
+            
+            if 'tokens' in item:
+                message['tokens'] = int(item['tokens'])
+            
+            if 'context_ids' in item:
+                message['context_ids'] = item['context_ids']
+            
+            messages.append(message)
+        
+        messages.reverse()  # Oldest first
+        if messages:
+            self._update_last_accessed(session_id)
+        
+        logger.debug(f"Retrieved {len(messages)} messages from session {session_id[:8]}...")
+        return exists, messages
+    
     def get_formatted_history(
         self, 
         session_id: str, 
@@ -3,7 +3,7 @@ memory.py
 Conversation memory for managing chat history across sessions.
 Supports in-memory storage with extension points for Redis/persistent backends.
 """
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 import logging
 
@@ -76,6 +76,32 @@ class ConversationMemory:
         
         logger.debug(f"Added {role} message to session {session_id[:8]}... (total messages: {len(self.sessions[session_id]['messages'])})")
 
+    def add_exchange(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        user_tokens: Optional[int] = None,
+        assistant_tokens: Optional[int] = None,
+        context_ids: Optional[List[str]] = None
+    ) -> None:
+        """
+        Add a user question and the assistant's answer in one call.
+        
+        Persistent backends override this to write both messages in a single
+        round-trip; in memory it is simply two appends.
+        
+        Args:
+            session_id: Unique session identifier
+            user_content: The user's message
+            assistant_content: The assistant's reply
+            user_tokens: Optional token count for the user message
+            assistant_tokens: Optional token count for the assistant message
+            context_ids: Optional list of document IDs used for the reply
+        """
+        self.add_message(session_id, "user", user_content, tokens=user_tokens)
+        self.add_message(session_id, "assistant", assistant_content, tokens=assistant_tokens, context_ids=context_ids)
+
     def get_history(
         self, 
         session_id: str, 
@@ -102,6 +128,25 @@ class ConversationMemory:
         
         return list(messages)  # Return copy of all messages
 
+    def get_session_history(
+        self,
+        session_id: str,
+        max_messages: Optional[int] = None
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Check a session exists and fetch its history in one call.
+        
+        Args:
+            session_id: Unique session identifier
+            max_messages: Maximum number of recent messages to return (None = all)
+        
+        Returns:
+            (exists, history) - history is empty when the session doesn't exist
+        """
+        if session_id not in self.sessions:
+            return False, []
+        return True, self.get_history(session_id, max_messages)
+
     def get_formatted_history(
         self, 
         session_id: str, 
@@ -4,6 +4,7 @@ from __future__ import annotations
 from functools import lru_cache
 
 from fastapi import APIRouter, Body, Depends, UploadFile, File, Form, HTTPException
+from fastapi.responses import StreamingResponse
 
 from ..dtos.UploadRequest import UploadRequest
 from ..dtos.DeleteRequest import DeleteRequest
@@ -14,10 +15,12 @@ from src.main.dtos.ChatRequest import ChatRequest
 from src.main.dtos.ChatResponse import ChatResponse
 from src.main.dtos.ChatHistoryResponse import ChatHistoryResponse, ChatMessage
 from src.main.dtos.SessionListResponse import SessionListResponse, SessionInfo
+from src.main.converters.DtoFactory import build_dto
 from src.main.service.FileToTextService import FileToTextService
 
 # Add Deepgram Speech-to-Text import and tempfile/os
 import tempfile
+import json
 import os
 import logging
 from src.main.service.SpeechToTextService import DeepgramTranscribeService
@@ -79,12 +82,28 @@ def get_memory_service():
 # --- ChatService DI -----------------------------------------------------------
 from src.main.llm.AgentCoreProvider import AgentCoreProvider
 
+from src.main.service.SemanticCache import SemanticCache
+
 @lru_cache(maxsize=1)
 def _chat_service_singleton() -> ChatService:
     vector_service = _service_singleton()
     agent_client = AgentCoreProvider()
     memory = _memory_singleton()  # NEW: Inject memory
-    return ChatService(vector_service, agent_client, memory)
+    # Semantic answer cache is opt-in: USE_SEMANTIC_CACHE=true
+    semantic_cache = None
+    if os.getenv('USE_SEMANTIC_CACHE', 'false').lower() == 'true':
+        semantic_cache = SemanticCache(
+            max_entries=int(os.getenv('SEMANTIC_CACHE_MAX_ENTRIES', '256')),
+            threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+        )
+    # LLM throttling: CHAT_MAX_CONCURRENT_LLM in-flight calls, optional CHAT_LLM_RPM per minute
+    llm_rpm = os.getenv('CHAT_LLM_RPM')
+    return ChatService(
+        vector_service, agent_client, memory,
+        semantic_cache=semantic_cache,
+        max_concurrent_llm=int(os.getenv('CHAT_MAX_CONCURRENT_LLM', '16')),
+        llm_requests_per_minute=int(llm_rpm) if llm_rpm else None,
+    )
 
 def get_chat_service() -> ChatService:
     return _chat_service_singleton()
@@ -108,6 +127,16 @@ def get_evaluation_service() -> ResponseEvaluationService:
     return _evaluation_service_singleton()
 
 
+# --- DeepgramTranscribeService DI ---------------------------------------------
+@lru_cache(maxsize=1)
+def _transcribe_service_singleton() -> DeepgramTranscribeService:
+    # Reused so its HTTP session keeps the connection to Deepgram warm
+    return DeepgramTranscribeService()
+
+def get_transcribe_service() -> DeepgramTranscribeService:
+    return _transcribe_service_singleton()
+
+
 router = APIRouter(prefix="/internal/context", tags=["context"])
 chat_router = APIRouter(prefix="/internal/chat", tags=["chat"])
 questions_router = APIRouter(prefix="/internal/questions", tags=["questions"])
@@ -199,8 +228,8 @@ async def transcribe_uploaded_audio(
         tmp.close()
 
     try:
-        svc = DeepgramTranscribeService()
-        transcript = svc.transcribe(tmp_path)
+        svc = get_transcribe_service()
+        transcript = await svc.atranscribe(tmp_path)
         return {"documentTitle": DocumentTitle, "transcript": transcript}
     except Exception as e:
         return {"error": f"Transcription failed: {e}"}
@@ -216,22 +245,61 @@ async def transcribe_uploaded_audio(
 # (ChatRequest and ChatResponse now imported from DTOs)
 
 @chat_router.post("", response_model=ChatResponse)
-def chat_endpoint(request: ChatRequest = Body(...), svc: ChatService = Depends(get_chat_service)):
+async def chat_endpoint(request: ChatRequest = Body(...), svc: ChatService = Depends(get_chat_service)):
     try:
-        result = svc.chat(
+        result = await svc.achat(
             query=request.query, 
             top_k=request.top_k or 5, 
             session_id=request.session_id,
             include_history=request.include_history,
             pedagogy_mode=request.pedagogy_mode  # NEW: Pass pedagogy mode
         )
-        return ChatResponse(**result)
+        return build_dto(ChatResponse, result)
     except ChatServiceError as e:
         return {"error": str(e)}
     except Exception as e:
         return {"error": f"Unexpected error: {e}"}
 
 
+@chat_router.post("/stream")
+async def chat_stream_endpoint(request: ChatRequest = Body(...), svc: ChatService = Depends(get_chat_service)):
+    """
+    Stream a chat answer as newline-delimited JSON events.
+    
+    The first line carries the session metadata, followed by "delta" lines with
+    answer text as it is generated and a final "end" line with context ids and
+    usage. Failures before the first event return {"error": ...} like /chat.
+    """
+    events = svc.astream_chat(
+        query=request.query,
+        top_k=request.top_k or 5,
+        session_id=request.session_id,
+        include_history=request.include_history,
+        pedagogy_mode=request.pedagogy_mode
+    )
+    try:
+        first = await events.__anext__()
+    except ChatServiceError as e:
+        return {"error": str(e)}
+    except Exception as e:
+        return {"error": f"Unexpected error: {e}"}
+
+    async def ndjson():
+        yield json.dumps(first) + "\n"
+        try:
+            async for event in events:
+                yield json.dumps(event) + "\n"
+        except Exception as e:
+            logger.error(f"Chat stream failed: {e}")
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+
+    return StreamingResponse(
+        ndjson(),
+        media_type="application/x-ndjson",
+        headers={"X-Session-Id": first["session_id"]},
+    )
+
+
 # --- Conversation History Endpoints -------------------------------------------
 
 @chat_router.get("/history/{session_id}", response_model=ChatHistoryResponse)
@@ -259,16 +327,7 @@ def get_history_endpoint(
     stats = memory.get_session_stats(session_id)
     
     # Convert to ChatMessage DTOs
-    message_dtos = [
-        ChatMessage(
-            role=msg["role"],
-            content=msg["content"],
-            timestamp=msg["timestamp"],
-            tokens=msg.get("tokens"),
-            context_ids=msg.get("context_ids", [])
-        )
-        for msg in messages
-    ]
+    message_dtos = [build_dto(ChatMessage, msg) for msg in messages]
     
     return ChatHistoryResponse(
         session_id=session_id,
@@ -291,17 +350,7 @@ def list_sessions_endpoint(memory: ConversationMemory = Depends(get_memory_servi
     sessions = memory.list_sessions()
     
     # Convert to SessionInfo DTOs
-    session_dtos = [
-        SessionInfo(
-            session_id=s["session_id"],
-            message_count=s["message_count"],
-            created_at=s["created_at"],
-            last_accessed=s["last_accessed"],
-            total_tokens=s["total_tokens"],
-            title=s.get("title", "New Chat")
-        )
-        for s in sessions
-    ]
+    session_dtos = [build_dto(SessionInfo, s) for s in sessions]
     
     return SessionListResponse(
         sessions=session_dtos,
@@ -358,7 +407,7 @@ async def generate_questions_endpoint(
         student_code_content = (await student_submission.read()).decode('utf-8')
         
         # Generate questions
-        result = svc.generate_questions(
+        result = await svc.agenerate_questions(
             assignment_brief=assignment_content,
             student_code=student_code_content,
             student_name=student_name
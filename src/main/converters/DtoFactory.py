@@ -0,0 +1,98 @@
+"""
+DtoFactory.py
+Fast construction of response DTOs from trusted, service-produced dicts.
+
+Pydantic validates every field on ``Model(**data)``. For payloads that our own
+services build (chat results, memory records) that work is redundant, and the
+generic ``model_construct`` still walks every field per call. Instead we
+generate one small constructor per (model, key shape) at first use, with the
+field names and default handling baked in as straight-line code.
+"""
+from functools import lru_cache
+from typing import Any, Callable, Mapping, Tuple, Type
+import copy
+import logging
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+# Defaults of these types are shared safely between instances
+_IMMUTABLE_DEFAULTS = (type(None), bool, int, float, str, bytes, tuple, frozenset)
+
+
+def _supports_fast_build(model_cls: Type[BaseModel]) -> bool:
+    """Only plain models (no private attrs, no extra fields) are generated."""
+    if model_cls.__private_attributes__:
+        return False
+    return model_cls.model_config.get("extra") != "allow"
+
+
+@lru_cache(maxsize=None)
+def get_fast_builder(model_cls: Type[BaseModel], shape: Tuple[str, ...]) -> Callable[[Mapping[str, Any]], BaseModel]:
+    """
+    Return a constructor specialised for dicts with exactly the given keys.
+
+    Args:
+        model_cls: Pydantic model class to build
+        shape: Keys of the input dicts this builder will receive
+
+    Returns:
+        Callable taking the dict and returning a model instance
+    """
+    if not _supports_fast_build(model_cls):
+        return lambda data: model_cls.model_construct(**data)
+
+    fields = model_cls.model_fields
+    present = [name for name in fields if name in shape]
+    missing = [name for name in fields if name not in shape]
+
+    # A required field without a value must still raise ValidationError
+    if any(fields[name].is_required() for name in missing):
+        return lambda data: model_cls(**data)
+
+    namespace: dict = {
+        "_cls": model_cls,
+        "_new": object.__new__,
+        "_setattr": object.__setattr__,
+        "_copy": copy.deepcopy,
+    }
+    values = [f"{name!r}: data[{name!r}]" for name in present]
+    for name in missing:
+        field = fields[name]
+        if field.default_factory is not None:
+            namespace[f"_factory_{name}"] = field.default_factory
+            values.append(f"{name!r}: _factory_{name}()")
+        elif isinstance(field.default, _IMMUTABLE_DEFAULTS):
+            namespace[f"_default_{name}"] = field.default
+            values.append(f"{name!r}: _default_{name}")
+        else:
+            namespace[f"_default_{name}"] = field.default
+            values.append(f"{name!r}: _copy(_default_{name})")
+
+    source = (
+        f"def build_{model_cls.__name__}(data):\n"
+        f"    obj = _new(_cls)\n"
+        f"    _setattr(obj, '__dict__', {{{', '.join(values)}}})\n"
+        f"    _setattr(obj, '__pydantic_fields_set__', {set(present)!r})\n"
+        f"    _setattr(obj, '__pydantic_extra__', None)\n"
+        f"    _setattr(obj, '__pydantic_private__', None)\n"
+        f"    return obj\n"
+    )
+    exec(compile(source, f"<DtoFactory:{model_cls.__name__}>", "exec"), namespace)
+    logger.debug(f"Generated fast builder for {model_cls.__name__} with shape {shape}")
+    return namespace[f"build_{model_cls.__name__}"]
+
+
+def build_dto(model_cls: Type[BaseModel], data: Mapping[str, Any]) -> BaseModel:
+    """
+    Build a DTO from a trusted dict without re-running field validation.
+
+    Args:
+        model_cls: Pydantic model class to build
+        data: Field values produced by our own services
+
+    Returns:
+        Model instance equivalent to ``model_cls(**data)`` for valid input
+    """
+    return get_fast_builder(model_cls, tuple(data))(data)
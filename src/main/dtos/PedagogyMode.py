@@ -4,6 +4,7 @@ Enum defining available teaching modes for the AI tutor.
 Each mode represents a different pedagogical approach.
 """
 from enum import Enum
+from functools import lru_cache
 
 
 class PedagogyMode(str, Enum):
@@ -56,6 +57,7 @@ class PedagogyMode(str, Enum):
         return cls.EXPLANATORY
     
     @classmethod
+    @lru_cache(maxsize=64)  # bounded: the argument comes from request input
     def from_string(cls, mode_str: str) -> "PedagogyMode":
         """
         Convert a string to a PedagogyMode enum value.
@@ -68,6 +70,8 @@ class PedagogyMode(str, Enum):
         
         Raises:
             ValueError: If the mode string is not valid
+        
+        Results are memoised per input string; invalid strings still raise each time.
         """
         if mode_str is None:
             return cls.get_default()
@@ -81,6 +85,7 @@ class PedagogyMode(str, Enum):
                 f"Valid modes are: {valid_modes}"
             )
     
+    @lru_cache(maxsize=None)
     def get_prompt_filename(self) -> str:
         """
         Get the filename of the prompt file for this mode.
@@ -2,19 +2,42 @@
 AgentCoreProvider.py
 Implements LlmProvider using AgentCore runtime.
 """
-from typing import List, Dict, Union, Generator
+from typing import AsyncGenerator, List, Dict, Union, Generator
+import asyncio
+import threading
 from src.main.agentcore_setup.bootstrap import get_runtime
 from src.main.agentcore_setup.config import BEDROCK_MODEL_CHAT, BEDROCK_MODEL_EMBED, EMBEDDING_DIM
 from src.main.llm.LlmProvider import LlmProvider
+from src.main.utils.Retry import RETRYABLE_STATUSES
 import logging
 
 class LlmError(Exception): pass
-class LlmRateLimit(Exception): pass
-class LlmTimeout(Exception): pass
+class LlmRateLimit(LlmError): pass
+class LlmTimeout(LlmError): pass
+
+# Bedrock error codes that mean "try again later" rather than a bad request
+_THROTTLE_CODES = frozenset({
+    "ThrottlingException", "TooManyRequestsException",
+    "ServiceUnavailableException", "ModelNotReadyException",
+})
+
+
+def _classify_error(e: Exception) -> LlmError:
+    """Map a client exception onto LlmRateLimit/LlmTimeout when it is transient, else LlmError."""
+    response = getattr(e, "response", None) or {}
+    code = response.get("Error", {}).get("Code")
+    status = response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    if code in _THROTTLE_CODES or status in RETRYABLE_STATUSES:
+        return LlmRateLimit(str(e))
+    if code == "ModelTimeoutException" or type(e).__name__ in ("ReadTimeoutError", "ConnectTimeoutError"):
+        return LlmTimeout(str(e))
+    return LlmError(str(e))
 
 class AgentCoreProvider:
-    def __init__(self):
-        self.client = get_runtime()
+    def __init__(self, caller_retries: bool = False):
+        # caller_retries: the caller wraps calls in Retry.call_with_retry/acall_with_retry,
+        # so the Bedrock client underneath makes a single attempt
+        self.client = get_runtime(caller_retries)
         self.logger = logging.getLogger("AgentCoreProvider")
 
     def generate(self, prompt: str, **kwargs) -> Union[str, Generator[str, None, None]]:
@@ -27,7 +50,7 @@ class AgentCoreProvider:
             return result['text']
         except Exception as e:
             self.logger.error(f"generate error: {e}")
-            raise LlmError(str(e))
+            raise _classify_error(e) from e
 
     def chat(self, messages: List[Dict], **kwargs) -> Union[str, Generator[str, None, None]]:
         model_id = BEDROCK_MODEL_CHAT
@@ -39,7 +62,59 @@ class AgentCoreProvider:
             return result['text']
         except Exception as e:
             self.logger.error(f"chat error: {e}")
-            raise LlmError(str(e))
+            raise _classify_error(e) from e
+
+    async def achat(self, messages: List[Dict], **kwargs) -> str:
+        # boto3 has no async transport; run the blocking call off the event loop
+        return await asyncio.to_thread(self.chat, messages, **kwargs)
+
+    def chat_single(self, user_text: str, **kwargs) -> Union[str, Generator[str, None, None]]:
+        # Single-turn convenience: callers pass the prompt, the envelope is built here
+        return self.chat([{"role": "user", "content": user_text}], **kwargs)
+
+    async def achat_single(self, user_text: str, **kwargs) -> str:
+        return await asyncio.to_thread(self.chat_single, user_text, **kwargs)
+
+    async def astream_single(self, user_text: str, **kwargs) -> AsyncGenerator[str, None]:
+        # boto3's event stream blocks, so a worker thread pumps deltas onto the loop
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        done = object()
+
+        def pump():
+            item = done
+            try:
+                for delta in self._stream('chat', [{"role": "user", "content": user_text}], BEDROCK_MODEL_CHAT, **kwargs):
+                    if stop.is_set():
+                        break
+                    loop.call_soon_threadsafe(queue.put_nowait, delta)
+            except Exception as e:
+                item = e
+            finally:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        worker = loop.run_in_executor(None, pump)
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+            # Surfaces anything the worker raised outside its own handler
+            await worker
+        finally:
+            # Consumer went away early; let the worker stop at the next delta
+            stop.set()
+            if not worker.done():
+                worker.add_done_callback(self._log_worker_error)
+
+    def _log_worker_error(self, worker: asyncio.Future) -> None:
+        # Nobody awaits a worker left running by an abandoned stream; log its failure instead
+        if not worker.cancelled() and worker.exception() is not None:
+            self.logger.error(f"stream worker error: {worker.exception()}")
 
     def embed(self, texts: List[str]) -> List[List[float]]:
         model_id = BEDROCK_MODEL_EMBED
@@ -53,7 +128,7 @@ class AgentCoreProvider:
             return vectors
         except Exception as e:
             self.logger.error(f"embed error: {e}")
-            raise LlmError(str(e))
+            raise _classify_error(e) from e
 
     def _stream(self, mode, data, model_id, **kwargs) -> Generator[str, None, None]:
         # Streaming generator for AgentCore
@@ -66,6 +141,9 @@ class AgentCoreProvider:
                 raise LlmError(f"Unknown stream mode: {mode}")
             for delta in stream:
                 yield delta['text']
+        except LlmError:
+            raise
         except Exception as e:
             self.logger.error(f"stream error: {e}")
-            raise LlmError(str(e))
+            # Classified like the non-streaming calls, so throttles stay retryable
+            raise _classify_error(e) from e
@@ -4,7 +4,7 @@ Base class for LLM providers. Implements Amazon Bedrock Titan chat logic (MVP).
 """
 import logging
 import json
-import boto3
+from src.main.agentcore_setup.bedrock_client import get_bedrock_client
 
 class LlmProvider:
     """
@@ -13,7 +13,7 @@ class LlmProvider:
     """
     def __init__(self, model_id="amazon.nova-lite-v1:0", bedrock_client=None):
         self.model_id = model_id
-        self.bedrock_client = bedrock_client or boto3.client("bedrock-runtime")
+        self.bedrock_client = bedrock_client or get_bedrock_client()
         self.logger = logging.getLogger("LlmProvider")
         if not self.logger.hasHandlers():
             logging.basicConfig(level=logging.INFO)
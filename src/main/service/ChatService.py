@@ -3,16 +3,24 @@
 ChatService: Handles chat workflow for /chat endpoint.
 - Manages conversation history per session
 - Searches vector store for relevant context
+- Optionally answers repeated questions from a semantic cache
 - Builds prompt with history and context
 - Applies pedagogy mode-specific prompts
 - Calls agent client
 - Returns answer and metadata
+- achat() serves the same workflow from the event loop without blocking it
+- astream_chat() streams the answer as it is generated
+- Caps concurrent LLM calls and, optionally, calls per minute under load
 """
-from typing import Optional, List
-import uuid
+from typing import AsyncIterator, Optional, List, Tuple
+import asyncio
+import io
+import re
+import secrets
 import logging
 from src.main.dtos.PedagogyMode import PedagogyMode
 from src.main.service.PromptService import get_prompt_service
+from src.main.utils.RateLimiter import SlidingWindowRateLimiter
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +36,243 @@ DEFAULT_SYSTEM = (
     "When referencing previous conversation, be natural and helpful."
 )
 
+# Patterns for stripping model chain-of-thought from answers and titles
+_REASONING_RE = re.compile(r'<reasoning>.*?</reasoning>', re.IGNORECASE | re.DOTALL)
+_TAG_RE = re.compile(r'</?reasoning>', re.IGNORECASE)
+_WS_RE = re.compile(r'\n{3,}')
+
+# Old 5-mode system values mapped onto the current 3 modes
+_MODE_MIGRATION = {
+    'socratic': 'practice',      # Socratic -> Practice
+    'assessment': 'practice',     # Assessment -> Practice
+    'review': 'explanatory',      # Review -> Explanatory
+    # New modes pass through
+    'explanatory': 'explanatory',
+    'debugging': 'debugging',
+    'practice': 'practice'
+}
+
+_OPEN_TAG = "<reasoning>"
+_CLOSE_TAG = "</reasoning>"
+
+def _remove_reasoning_spans(text: str, lowered: str) -> str:
+    """
+    Drop <reasoning>...</reasoning> spans and stray tags in one left-to-right pass.
+    
+    Each opening tag is paired with the nearest closing tag after it, matching
+    the non-greedy regex; unpaired tags are removed on their own.
+    """
+    if len(lowered) != len(text):
+        # Case folding changed offsets (rare non-ASCII input); use the regexes
+        return _TAG_RE.sub('', _REASONING_RE.sub('', text))
+    
+    parts = []
+    keep_from = 0
+    i = lowered.find("<")
+    while i != -1:
+        if lowered.startswith(_OPEN_TAG, i):
+            close = lowered.find(_CLOSE_TAG, i + len(_OPEN_TAG))
+            parts.append(text[keep_from:i])
+            keep_from = i + len(_OPEN_TAG) if close == -1 else close + len(_CLOSE_TAG)
+            i = lowered.find("<", keep_from)
+        elif lowered.startswith(_CLOSE_TAG, i):
+            parts.append(text[keep_from:i])
+            keep_from = i + len(_CLOSE_TAG)
+            i = lowered.find("<", keep_from)
+        else:
+            i = lowered.find("<", i + 1)
+    parts.append(text[keep_from:])
+    cleaned = "".join(parts)
+    
+    # Removing a span can splice fragments into a new tag; defer to the regexes then
+    if "reasoning>" in cleaned.lower():
+        return _TAG_RE.sub('', _REASONING_RE.sub('', text))
+    return cleaned
+
+
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
+
+def _strip_reasoning(text: str) -> str:
+    """Body of ChatService._strip_reasoning_tags, shared with the stream filter."""
+    lowered = text.lower()
+    if "reasoning>" not in lowered:
+        cleaned = text
+    else:
+        cleaned = _remove_reasoning_spans(text, lowered)
+    # Clean up excessive whitespace
+    if "\n\n\n" in cleaned:
+        cleaned = _WS_RE.sub('\n\n', cleaned)
+    return cleaned.strip()
+
+
+class _ReasoningStreamFilter:
+    """
+    Incremental counterpart of _strip_reasoning for streamed answers.
+    
+    Text inside <reasoning>...</reasoning> is withheld until its closing tag
+    arrives (then dropped), and a trailing fragment that could still become a
+    tag is held back until the next chunk decides it. Trailing whitespace is
+    held back as well, so blank-line runs collapse and the end is stripped as
+    in the stored answer. flush() settles the remainder from the full raw text.
+    """
+    
+    def __init__(self):
+        self._raw = []
+        self._pending = ""
+        self._in_reasoning = False
+        self._held_ws = ""
+        self._shown = []
+    
+    @property
+    def text(self) -> str:
+        """Everything returned by feed() and flush() so far."""
+        return "".join(self._shown)
+    
+    def feed(self, chunk: str) -> str:
+        """Add a raw chunk and return the text that is now safe to show."""
+        self._raw.append(chunk)
+        self._pending += chunk
+        out = []
+        while self._pending:
+            # ASCII-only lowering keeps offsets aligned with the original text
+            lowered = self._pending.translate(_ASCII_LOWER)
+            if self._in_reasoning:
+                close = lowered.find(_CLOSE_TAG)
+                if close == -1:
+                    break
+                self._pending = self._pending[close + len(_CLOSE_TAG):]
+                self._in_reasoning = False
+                continue
+            i = lowered.find("<")
+            while i != -1:
+                tail = lowered[i:i + len(_CLOSE_TAG)]
+                if tail.startswith(_OPEN_TAG) or tail == _CLOSE_TAG:
+                    break
+                if _OPEN_TAG.startswith(tail) or _CLOSE_TAG.startswith(tail):
+                    break  # could still grow into a tag
+                i = lowered.find("<", i + 1)
+            if i == -1:
+                out.append(self._pending)
+                self._pending = ""
+                break
+            out.append(self._pending[:i])
+            if lowered.startswith(_OPEN_TAG, i):
+                self._pending = self._pending[i + len(_OPEN_TAG):]
+                self._in_reasoning = True
+            elif lowered.startswith(_CLOSE_TAG, i):
+                self._pending = self._pending[i + len(_CLOSE_TAG):]
+            else:
+                self._pending = self._pending[i:]
+                break
+        return self._emit("".join(out))
+    
+    def flush(self) -> str:
+        """Return the rest of the answer once the stream has ended."""
+        final = _strip_reasoning("".join(self._raw))
+        shown = self.text
+        if final.startswith(shown):
+            rest = final[len(shown):]
+        else:
+            # Only when dropping a span spliced already-shown text into a new tag
+            # (see _remove_reasoning_spans); the shown text cannot be taken back
+            logger.warning("Streamed answer diverged from the stripped answer; keeping the streamed text")
+            rest = self._pending
+            if self._in_reasoning:
+                # An unclosed tag only drops the tag itself
+                rest = _remove_reasoning_spans(rest, rest.lower())
+            rest = _WS_RE.sub('\n\n', self._held_ws + rest).rstrip()
+            if not shown:
+                rest = rest.lstrip()
+        self._pending, self._in_reasoning, self._held_ws = "", False, ""
+        self._shown.append(rest)
+        return rest
+    
+    def _emit(self, text: str) -> str:
+        if not text:
+            return ""
+        text = self._held_ws + text
+        if not self._shown:
+            text = text.lstrip()
+        body = text.rstrip()
+        self._held_ws = text[len(body):]
+        if not body:
+            return ""
+        # Each delta ends on non-whitespace, so a run of newlines never spans two deltas
+        if "\n\n\n" in body:
+            body = _WS_RE.sub('\n\n', body)
+        self._shown.append(body)
+        return body
+
+
+# Separator between retrieved chunks in the context block
+CONTEXT_SEPARATOR = "\n---\n"
+
+# Session title request; only the first message is interpolated per call
+_TITLE_PROMPT_TEMPLATE = """Generate a very short, concise title (2-3 words maximum) for a chat session based on this first message.
+
+First message: "{msg}"
+
+Examples:
+- "How do I print text in Python?" → "Print Function"
+- "Explain recursion to me" → "Recursion Basics"
+- "Help me debug this code" → "Debug Help"
+- "What are lists?" → "Python Lists"
+
+Provide only the title, nothing else. Keep it short and descriptive."""
+
+# Local title heuristic: messages opening with these need the LLM to rephrase them
+_QUESTION_WORDS = frozenset({
+    "what", "how", "why", "when", "where", "which", "who", "whom", "whose",
+    "is", "are", "can", "could", "should", "would", "do", "does", "did", "will",
+})
+# Filler skipped when picking title words
+_TITLE_STOPWORDS = frozenset({
+    "a", "an", "the", "and", "or", "but", "of", "to", "in", "on", "for", "with",
+    "about", "at", "by", "from", "into", "my", "me", "i", "i'm", "im", "you",
+    "your", "this", "that", "these", "those", "it", "its", "some", "any",
+    "please", "help", "explain", "tell", "show", "give", "need", "want",
+    "hi", "hello", "hey", "thanks", "using", "use", "get", "make",
+    "don't", "dont", "understand", "know", "learn", "stuck",
+})
+_TITLE_WORD_RE = re.compile(r"[A-Za-z][A-Za-z0-9+#'_-]*")
+_TITLE_MAX_SOURCE_WORDS = 12
+
+def _heuristic_title(message: str) -> Optional[str]:
+    """
+    Build a 2-3 word title from the message's leading keywords.
+    
+    Returns None when the message is ambiguous (a question, multi-line or long
+    input such as pasted code, or too few keywords) so the LLM titles it instead.
+    """
+    stripped = message.strip()
+    if not stripped or "\n" in stripped or stripped.endswith("?"):
+        return None
+    words = _TITLE_WORD_RE.findall(stripped)
+    if not words or len(words) > _TITLE_MAX_SOURCE_WORDS or words[0].lower() in _QUESTION_WORDS:
+        return None
+    keywords = [w for w in words if w.lower() not in _TITLE_STOPWORDS]
+    if len(keywords) < 2:
+        return None
+    title = " ".join(w[:1].upper() + w[1:] for w in keywords[:3])
+    return title if len(title) <= 30 else None
+
 class ChatService:
+    # One long-lived instance serves every request; fixed attributes, no __dict__
+    __slots__ = (
+        "vector_service",
+        "agent_client",
+        "memory",
+        "max_context_chars",
+        "max_history_messages",
+        "max_history_chars",
+        "system_preamble",
+        "prompt_service",
+        "semantic_cache",
+        "_llm_semaphore",
+        "_rate_limiter",
+        "_combined_system_by_mode",
+    )
+    
     def __init__(
         self,
         vector_service,
@@ -37,17 +281,40 @@ class ChatService:
         *,
         max_context_chars: int = 8000,
         max_history_messages: int = 10,
+        max_history_chars: Optional[int] = 2000,  # None = no cap on formatted history
         system_preamble: Optional[str] = None,
         prompt_service=None,  # PromptService for pedagogy modes
+        semantic_cache=None,  # Optional SemanticCache for repeated questions
+        max_concurrent_llm: int = 16,  # In-flight agent calls from achat()
+        llm_requests_per_minute: Optional[int] = None,  # None = no per-minute cap
     ):
         self.vector_service = vector_service
         self.agent_client = agent_client
         self.memory = memory
         self.max_context_chars = max_context_chars
         self.max_history_messages = max_history_messages
+        self.max_history_chars = max_history_chars
         self.system_preamble = system_preamble or DEFAULT_SYSTEM
         self.prompt_service = prompt_service or get_prompt_service()
-        logger.info(f"ChatService initialized with max_context_chars={max_context_chars}, max_history_messages={max_history_messages}")
+        self.semantic_cache = semantic_cache
+        # Keep bursts under the provider's limits instead of retrying its 429s
+        self._llm_semaphore = asyncio.Semaphore(max_concurrent_llm)
+        self._rate_limiter = (
+            SlidingWindowRateLimiter(llm_requests_per_minute, period=60.0)
+            if llm_requests_per_minute else None
+        )
+        # pedagogy mode -> (mode prompt it was built from, preamble + mode prompt),
+        # so requests skip the concatenation while the prompt is unchanged
+        self._combined_system_by_mode: dict[str, Tuple[str, str]] = {}
+        for mode in PedagogyMode:
+            try:
+                self._combined_system(mode.value)
+            except Exception as e:
+                logger.warning("Could not preload '%s' mode prompt: %s", mode.value, e)
+        logger.info(
+            "ChatService initialized with max_context_chars=%d, max_history_messages=%d, max_history_chars=%s",
+            max_context_chars, max_history_messages, max_history_chars
+        )
 
     def chat(
         self, 
@@ -71,70 +338,477 @@ class ChatService:
             dict with keys: answer, session_id, is_new_session, history_length, 
                            pedagogy_mode, context_ids, tokens_input, tokens_output, model_id
         """
-        # Step 1: Handle session ID (hybrid approach)
+        # Steps 1-2: Resolve session, pedagogy mode and conversation history
+        session_id, is_new_session, pedagogy_mode, history = self._begin_turn(
+            session_id, include_history, pedagogy_mode
+        )
+        
+        # Step 3: Serve repeated questions from the semantic cache, if enabled
+        query_embedding, cached = self._check_cache(query, history, pedagogy_mode)
+        
+        # Steps 4-6: Retrieve context, call the LLM and extract the answer
+        if cached is not None:
+            answer, tokens_input, tokens_output, model_id, context_ids = self._unpack_cached(cached)
+        else:
+            answer, tokens_input, tokens_output, model_id, context_ids = self._generate_answer(
+                query, top_k, history, pedagogy_mode, query_embedding
+            )
+            self._store_cache(query, query_embedding, pedagogy_mode, answer, model_id, context_ids)
+        
+        # Step 7: Store this conversation exchange in memory
+        self._store_exchange(session_id, query, answer, tokens_input, tokens_output, context_ids)
+        
+        # Step 7.5: Generate session title if this is the first message
+        if is_new_session:
+            self._store_session_title(session_id, self._generate_session_title(query))
+        
+        # Step 8: Return enhanced response
+        return {
+            "answer": answer,
+            "session_id": session_id,
+            "is_new_session": is_new_session,
+            "history_length": len(history),
+            "pedagogy_mode": pedagogy_mode,
+            "context_ids": context_ids,
+            "tokens_input": tokens_input,
+            "tokens_output": tokens_output,
+            "model_id": model_id,
+        }
+    
+    async def achat(
+        self, 
+        query: str, 
+        top_k: int = 5, 
+        session_id: Optional[str] = None,
+        include_history: bool = True,
+        pedagogy_mode: Optional[str] = None
+    ) -> dict:
+        """
+        Async variant of chat() for use from the event loop.
+        
+        Network calls are awaited instead of blocking the worker: async client
+        methods (achat / asemantic_search) are used when the clients provide
+        them, otherwise the sync calls run in a worker thread.
+        
+        Args and return value are identical to chat().
+        """
+        session_id, is_new_session, pedagogy_mode, history = await asyncio.to_thread(
+            self._begin_turn, session_id, include_history, pedagogy_mode
+        )
+        
+        # The title only depends on the query, so for new sessions it is
+        # generated concurrently with the answer rather than after it
+        title_task = None
+        if is_new_session:
+            title_task = asyncio.create_task(self._agenerate_session_title(query))
+        
+        try:
+            query_embedding, cached = await asyncio.to_thread(self._check_cache, query, history, pedagogy_mode)
+            if cached is not None:
+                answer, tokens_input, tokens_output, model_id, context_ids = self._unpack_cached(cached)
+            else:
+                answer, tokens_input, tokens_output, model_id, context_ids = await self._agenerate_answer(
+                    query, top_k, history, pedagogy_mode, query_embedding
+                )
+                self._store_cache(query, query_embedding, pedagogy_mode, answer, model_id, context_ids)
+        except BaseException:
+            if title_task is not None:
+                title_task.cancel()
+            raise
+        
+        await asyncio.to_thread(
+            self._store_exchange, session_id, query, answer, tokens_input, tokens_output, context_ids
+        )
+        
+        if title_task is not None:
+            title = await title_task
+            await asyncio.to_thread(self._store_session_title, session_id, title)
+        
+        return {
+            "answer": answer,
+            "session_id": session_id,
+            "is_new_session": is_new_session,
+            "history_length": len(history),
+            "pedagogy_mode": pedagogy_mode,
+            "context_ids": context_ids,
+            "tokens_input": tokens_input,
+            "tokens_output": tokens_output,
+            "model_id": model_id,
+        }
+    
+    async def astream_chat(
+        self,
+        query: str,
+        top_k: int = 5,
+        session_id: Optional[str] = None,
+        include_history: bool = True,
+        pedagogy_mode: Optional[str] = None
+    ) -> AsyncIterator[dict]:
+        """
+        Streaming variant of achat() yielding events as the answer is generated.
+        
+        Events, in order:
+            {"type": "start", "session_id", "is_new_session", "history_length", "pedagogy_mode"}
+            {"type": "delta", "text"} - zero or more answer fragments
+            {"type": "end", "context_ids", "tokens_input", "tokens_output", "model_id"}
+        
+        The session title is generated while the answer streams, and the
+        exchange is stored once the full answer is known.
+        
+        Raises:
+            ChatServiceError: If retrieval or the agent call fails
+        """
+        session_id, is_new_session, pedagogy_mode, history = await asyncio.to_thread(
+            self._begin_turn, session_id, include_history, pedagogy_mode
+        )
+        title_task = None
+        if is_new_session:
+            title_task = asyncio.create_task(self._agenerate_session_title(query))
+        
+        try:
+            query_embedding, cached = await asyncio.to_thread(self._check_cache, query, history, pedagogy_mode)
+            if cached is None:
+                context_ids, prompt = await self._aprepare_prompt(
+                    query, top_k, history, pedagogy_mode, query_embedding
+                )
+            
+            yield {
+                "type": "start",
+                "session_id": session_id,
+                "is_new_session": is_new_session,
+                "history_length": len(history),
+                "pedagogy_mode": pedagogy_mode,
+            }
+            
+            if cached is not None:
+                answer, tokens_input, tokens_output, model_id, context_ids = self._unpack_cached(cached)
+                yield {"type": "delta", "text": answer}
+            else:
+                visible = _ReasoningStreamFilter()
+                try:
+                    async for chunk in self._astream_agent(prompt):
+                        text = visible.feed(chunk)
+                        if text:
+                            yield {"type": "delta", "text": text}
+                except Exception as e:
+                    raise ChatServiceError(f"Agent call failed: {e}")
+                text = visible.flush()
+                if text:
+                    yield {"type": "delta", "text": text}
+                # What the deltas added up to: _strip_reasoning_tags of the raw answer
+                answer = visible.text
+                tokens_input = tokens_output = model_id = None
+                self._store_cache(query, query_embedding, pedagogy_mode, answer, model_id, context_ids)
+        except BaseException:
+            if title_task is not None:
+                title_task.cancel()
+            raise
+        
+        await asyncio.to_thread(
+            self._store_exchange, session_id, query, answer, tokens_input, tokens_output, context_ids
+        )
+        if title_task is not None:
+            title = await title_task
+            await asyncio.to_thread(self._store_session_title, session_id, title)
+        
+        yield {
+            "type": "end",
+            "context_ids": context_ids,
+            "tokens_input": tokens_input,
+            "tokens_output": tokens_output,
+            "model_id": model_id,
+        }
+    
+    def _generate_answer(
+        self,
+        query: str,
+        top_k: int,
+        history: List[dict],
+        pedagogy_mode: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[str, Optional[int], Optional[int], Optional[str], List[str]]:
+        """
+        Retrieve context, call the LLM and extract the answer.
+        
+        When the query was already embedded for the cache lookup, the
+        embedding is handed to the vector search so it is computed only once.
+        
+        Returns:
+            (answer, tokens_input, tokens_output, model_id, context_ids)
+        """
+        # Perform vector search for relevant context
+        try:
+            results = self._search(query, top_k, query_embedding)
+            logger.debug("Vector search returned %d results", len(results))
+        except Exception as e:
+            raise ChatServiceError(f"Vector search failed: {e}")
+        context_ids, context_str = self._format_context(results)
+        
+        # Build prompt with system prompt (including pedagogy mode), history, context, and query
+        prompt = self._build_prompt(query, context_str, history, pedagogy_mode)
+        
+        logger.info(
+            "[ChatService] query='%.50s...', top_k=%d, mode=%s, context_len=%d, history_len=%d",
+            query, top_k, pedagogy_mode, len(context_str), len(history)
+        )
+        
+        try:
+            result = self._call_agent(prompt)
+        except Exception as e:
+            raise ChatServiceError(f"Agent call failed: {e}")
+        
+        return (*self._parse_agent_result(result), context_ids)
+    
+    async def _agenerate_answer(
+        self,
+        query: str,
+        top_k: int,
+        history: List[dict],
+        pedagogy_mode: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[str, Optional[int], Optional[int], Optional[str], List[str]]:
+        """Async variant of _generate_answer()."""
+        context_ids, prompt = await self._aprepare_prompt(query, top_k, history, pedagogy_mode, query_embedding)
+        
+        try:
+            result = await self._acall_agent(prompt)
+        except Exception as e:
+            raise ChatServiceError(f"Agent call failed: {e}")
+        
+        return (*self._parse_agent_result(result), context_ids)
+    
+    async def _aprepare_prompt(
+        self,
+        query: str,
+        top_k: int,
+        history: List[dict],
+        pedagogy_mode: str,
+        query_embedding: Optional[List[float]] = None
+    ) -> Tuple[List[str], str]:
+        """
+        Retrieve context and build the agent prompt from the event loop.
+        
+        Returns:
+            (context_ids, prompt)
+        """
+        try:
+            asemantic_search = getattr(self.vector_service, "asemantic_search", None)
+            if asemantic_search is not None and query_embedding is None:
+                results = await asemantic_search(query=query, top_k=top_k)
+            else:
+                results = await asyncio.to_thread(self._search, query, top_k, query_embedding)
+            logger.debug("Vector search returned %d results", len(results))
+        except Exception as e:
+            raise ChatServiceError(f"Vector search failed: {e}")
+        context_ids, context_str = self._format_context(results)
+        
+        prompt = self._build_prompt(query, context_str, history, pedagogy_mode)
+        
+        logger.info(
+            "[ChatService] query='%.50s...', top_k=%d, mode=%s, context_len=%d, history_len=%d",
+            query, top_k, pedagogy_mode, len(context_str), len(history)
+        )
+        return context_ids, prompt
+    
+    def _search(self, query: str, top_k: int, query_embedding: Optional[List[float]]) -> List[dict]:
+        """Run the vector search, reusing the query embedding when one is available."""
+        if query_embedding is not None:
+            return self.vector_service.search_by_embedding(query_embedding, top_k=top_k)
+        return self.vector_service.semantic_search(query=query, top_k=top_k)
+    
+    def _check_cache(
+        self,
+        query: str,
+        history: List[dict],
+        pedagogy_mode: str
+    ) -> Tuple[Optional[List[float]], Optional[dict]]:
+        """
+        Look the query up in the semantic cache.
+        
+        Only history-free turns are cached: a follow-up's answer depends on the
+        conversation so far, not just on the question text.
+        
+        Returns:
+            (query_embedding, cached payload) - both None when the cache is not used
+        """
+        if self.semantic_cache is None or history:
+            return None, None
+        try:
+            query_embedding = self.vector_service.embed(query)
+        except Exception as e:
+            raise ChatServiceError(f"Vector search failed: {e}")
+        return query_embedding, self.semantic_cache.check(query, query_embedding, namespace=pedagogy_mode)
+    
+    def _store_cache(
+        self,
+        query: str,
+        query_embedding: Optional[List[float]],
+        pedagogy_mode: str,
+        answer: str,
+        model_id: Optional[str],
+        context_ids: List[str]
+    ) -> None:
+        """Remember a freshly generated answer for later near-duplicate questions."""
+        if query_embedding is None or not answer:
+            return
+        self.semantic_cache.store(
+            query,
+            query_embedding,
+            {"answer": answer, "model_id": model_id, "context_ids": list(context_ids)},
+            namespace=pedagogy_mode,
+        )
+    
+    def _unpack_cached(self, cached: dict) -> Tuple[str, None, None, Optional[str], List[str]]:
+        """Turn a cache payload into answer fields; a hit consumes no tokens."""
+        logger.info("Answer served from semantic cache")
+        return cached["answer"], None, None, cached.get("model_id"), list(cached["context_ids"])
+    
+    def _begin_turn(
+        self,
+        session_id: Optional[str],
+        include_history: bool,
+        pedagogy_mode: Optional[str]
+    ) -> Tuple[str, bool, str, List[dict]]:
+        """
+        Resolve session ID, pedagogy mode and prior history for a chat turn.
+        
+        Returns:
+            (session_id, is_new_session, pedagogy_mode, history)
+        """
+        # Step 1: Handle session ID (hybrid approach) and retrieve conversation
+        # history; existence and history come back from one memory call
+        history = []
         if session_id is None:
-            session_id = str(uuid.uuid4())
+            session_id = secrets.token_hex(16)
             is_new_session = True
-            logger.info(f"Generated new session ID: {session_id[:8]}...")
+            logger.info("Generated new session ID: %.8s...", session_id)
         else:
-            is_new_session = not self.memory.session_exists(session_id)
+            if include_history:
+                exists, history = self.memory.get_session_history(session_id, max_messages=self.max_history_messages)
+                logger.debug("Retrieved %d previous messages for session %.8s...", len(history), session_id)
+            else:
+                exists = self.memory.session_exists(session_id)
+            is_new_session = not exists
             if is_new_session:
-                logger.info(f"First message for session: {session_id[:8]}...")
+                logger.info("First message for session: %.8s...", session_id)
             else:
-                logger.debug(f"Continuing session: {session_id[:8]}...")
+                logger.debug("Continuing session: %.8s...", session_id)
         
         # Step 1.5: Determine and set pedagogy mode
         if pedagogy_mode is None:
             # Use session's existing mode or default
-            pedagogy_mode = self.memory.get_pedagogy_mode(session_id)
+            stored_mode = self.memory.get_pedagogy_mode(session_id)
             # Migrate old mode values to new 3-mode system
-            pedagogy_mode = self._migrate_old_mode(pedagogy_mode)
-            logger.debug(f"Using session pedagogy mode: {pedagogy_mode}")
+            pedagogy_mode = _MODE_MIGRATION.get(stored_mode, 'explanatory')
+            if pedagogy_mode != stored_mode:
+                logger.debug("Migrated old mode '%s' to '%s'", stored_mode, pedagogy_mode)
+            logger.debug("Using session pedagogy mode: %s", pedagogy_mode)
         else:
             # Validate and set new mode for session
             try:
                 mode_enum = self.prompt_service.validate_mode(pedagogy_mode)
                 pedagogy_mode = mode_enum.value
                 self.memory.set_pedagogy_mode(session_id, pedagogy_mode)
-                logger.info(f"Set pedagogy mode for session {session_id[:8]}... to '{pedagogy_mode}'")
+                logger.info("Set pedagogy mode for session %.8s... to '%s'", session_id, pedagogy_mode)
             except ValueError as e:
-                logger.warning(f"Invalid pedagogy mode '{pedagogy_mode}', using default: {e}")
+                logger.warning("Invalid pedagogy mode '%s', using default: %s", pedagogy_mode, e)
                 pedagogy_mode = "explanatory"
                 self.memory.set_pedagogy_mode(session_id, pedagogy_mode)
         
-        # Step 2: Retrieve conversation history
-        history = []
-        if include_history and not is_new_session:
-            history = self.memory.get_history(session_id, max_messages=self.max_history_messages)
-            logger.debug(f"Retrieved {len(history)} previous messages for session {session_id[:8]}...")
+        return session_id, is_new_session, pedagogy_mode, history
+    
+    def _format_context(self, results: List[dict]) -> Tuple[List[str], str]:
+        """
+        Join retrieved chunks into the context block, truncated to max_context_chars.
         
-        # Step 3: Perform vector search for relevant context
-        try:
-            results = self.vector_service.semantic_search(query=query, top_k=top_k)
-            logger.debug(f"Vector search returned {len(results)} results")
-        except Exception as e:
-            raise ChatServiceError(f"Vector search failed: {e}")
+        Chunks are appended only until the budget is used up, so large top_k
+        results never build a full concatenation just to slice it down.
         
-        context_chunks = [r["text"] for r in results]
+        Returns:
+            (context_ids, context_str)
+        """
         context_ids = [r["id"] for r in results]
-        context_str = "\n---\n".join(context_chunks)
+        parts = []
+        remaining = self.max_context_chars
+        truncated = False
+        for r in results:
+            if parts:
+                if remaining < len(CONTEXT_SEPARATOR):
+                    parts.append(CONTEXT_SEPARATOR[:remaining])
+                    truncated = True
+                    break
+                parts.append(CONTEXT_SEPARATOR)
+                remaining -= len(CONTEXT_SEPARATOR)
+            text = r["text"]
+            if len(text) > remaining:
+                parts.append(text[:remaining])
+                truncated = True
+                break
+            parts.append(text)
+            remaining -= len(text)
         
-        if len(context_str) > self.max_context_chars:
-            context_str = context_str[:self.max_context_chars]
-            logger.debug(f"Truncated context to {self.max_context_chars} chars")
+        if truncated:
+            logger.debug("Truncated context to %d chars", self.max_context_chars)
+        return context_ids, "".join(parts)
+    
+    def _call_agent(self, prompt: str):
+        """Send a single user prompt to the agent."""
+        if self._rate_limiter is not None:
+            self._rate_limiter.acquire_blocking()
+        return self._send_prompt(prompt)
+    
+    def _send_prompt(self, prompt: str):
+        """Dispatch the prompt, preferring the client's plain-text entry point."""
+        chat_single = getattr(self.agent_client, "chat_single", None)
+        if chat_single is not None:
+            return chat_single(prompt)
+        return self.agent_client.chat([{"role": "user", "content": prompt}])
+    
+    async def _acall_agent(self, prompt: str):
+        """
+        Send a single user prompt to the agent without blocking the event loop.
         
-        # Step 4: Build messages with system prompt (including pedagogy mode), history, context, and query
-        messages = self._build_messages(query, context_str, history, pedagogy_mode)
+        Waits for a rate limit slot, then for one of max_concurrent_llm permits.
+        """
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        async with self._llm_semaphore:
+            achat_single = getattr(self.agent_client, "achat_single", None)
+            if achat_single is not None:
+                return await achat_single(prompt)
+            achat = getattr(self.agent_client, "achat", None)
+            if achat is not None:
+                return await achat([{"role": "user", "content": prompt}])
+            return await asyncio.to_thread(self._send_prompt, prompt)
+    
+    async def _astream_agent(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Yield the agent's raw answer text as it is generated.
         
-        # Step 5: Call LLM
-        logger.info(f"[ChatService] query='{query[:50]}...', top_k={top_k}, mode={pedagogy_mode}, context_len={len(context_str)}, history_len={len(history)}")
+        Clients without astream_single are called normally and their whole
+        answer is yielded as a single chunk.
+        """
+        astream_single = getattr(self.agent_client, "astream_single", None)
+        if astream_single is None:
+            result = await self._acall_agent(prompt)
+            answer = self._parse_agent_result(result)[0]
+            if answer:
+                yield answer
+            return
         
-        try:
-            result = self.agent_client.chat(messages)
-        except Exception as e:
-            raise ChatServiceError(f"Agent call failed: {e}")
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire()
+        async with self._llm_semaphore:
+            async for delta in astream_single(prompt):
+                yield delta
+    
+    def _parse_agent_result(self, result) -> Tuple[str, Optional[int], Optional[int], Optional[str]]:
+        """
+        Extract the cleaned answer and usage metadata from an agent result.
         
-        # Step 6: Extract answer and metadata
+        Returns:
+            (answer, tokens_input, tokens_output, model_id)
+        """
         if isinstance(result, str):
             answer = result
             tokens_input = None
@@ -151,57 +825,48 @@ class ChatService:
             tokens_output = None
             model_id = None
         
-        # Step 6.5: Clean reasoning tags from model output
+        # Clean reasoning tags from model output
         answer = self._strip_reasoning_tags(answer)
-        
-        # Step 7: Store this conversation exchange in memory
-        self.memory.add_message(
-            session_id=session_id,
-            role="user",
-            content=query,
-            tokens=tokens_input
-        )
-        self.memory.add_message(
+        return answer, tokens_input, tokens_output, model_id
+    
+    def _store_exchange(
+        self,
+        session_id: str,
+        query: str,
+        answer: str,
+        tokens_input: Optional[int],
+        tokens_output: Optional[int],
+        context_ids: List[str]
+    ) -> None:
+        """Record the user question and assistant answer in memory."""
+        self.memory.add_exchange(
             session_id=session_id,
-            role="assistant",
-            content=answer,
-            tokens=tokens_output,
+            user_content=query,
+            assistant_content=answer,
+            user_tokens=tokens_input,
+            assistant_tokens=tokens_output,
             context_ids=context_ids
         )
         
-        logger.info(f"Stored conversation exchange in session {session_id[:8]}...")
-        
-        # Step 7.5: Generate session title if this is the first message
-        if is_new_session:
-            try:
-                title = self._generate_session_title(query)
-                self.memory.update_session_title(session_id, title)
-                logger.info(f"Generated title for session {session_id[:8]}...: '{title}'")
-            except Exception as e:
-                logger.warning(f"Failed to generate session title: {e}")
-        
-        # Step 8: Return enhanced response
-        return {
-            "answer": answer,
-            "session_id": session_id,
-            "is_new_session": is_new_session,
-            "history_length": len(history),
-            "pedagogy_mode": pedagogy_mode,
-            "context_ids": context_ids,
-            "tokens_input": tokens_input,
-            "tokens_output": tokens_output,
-            "model_id": model_id,
-        }
+        logger.info("Stored conversation exchange in session %.8s...", session_id)
+    
+    def _store_session_title(self, session_id: str, title: str) -> None:
+        """Persist a generated session title; failures are logged, not raised."""
+        try:
+            self.memory.update_session_title(session_id, title)
+            logger.info("Generated title for session %.8s...: '%s'", session_id, title)
+        except Exception as e:
+            logger.warning("Failed to generate session title: %s", e)
     
-    def _build_messages(
+    def _build_prompt(
         self, 
         query: str, 
         context_str: str, 
         history: List[dict],
         pedagogy_mode: str
-    ) -> List[dict]:
+    ) -> str:
         """
-        Build the messages array for the LLM with proper formatting.
+        Build the single user prompt for the LLM with proper formatting.
         
         Format:
         - Base system preamble
@@ -214,16 +879,10 @@ class ChatService:
         
         # 1. System preamble with pedagogy mode instructions
         try:
-            mode_enum = PedagogyMode.from_string(pedagogy_mode)
-            mode_prompt = self.prompt_service.get_mode_prompt(mode_enum)
-            
-            # Combine base system prompt with mode-specific instructions
-            combined_system = f"{self.system_preamble}\n\n---\n\n{mode_prompt}"
-            content_parts.append(combined_system)
-            logger.debug(f"Applied {pedagogy_mode} mode prompt ({len(mode_prompt)} chars)")
+            content_parts.append(self._combined_system(pedagogy_mode))
         except Exception as e:
             # Fallback to default system prompt if mode loading fails
-            logger.error(f"Error loading pedagogy mode prompt: {e}, using default")
+            logger.error("Error loading pedagogy mode prompt: %s, using default", e)
             content_parts.append(self.system_preamble)
         
         # 2. Add conversation history if present
@@ -241,121 +900,136 @@ class ChatService:
         # Flatten content parts into a single string for GPT-OSS and standard models
         # Models expect: {"role": "user", "content": "string"}
         # NOT: {"role": "user", "content": [{"text": "..."}, ...]}
-        content_string = "\n\n".join(content_parts)
+        return "\n\n".join(content_parts)
+    
+    def _combined_system(self, pedagogy_mode: str) -> str:
+        """
+        Return the system preamble combined with the mode-specific instructions.
+        
+        The mode prompt is always read through PromptService's cache, so a
+        clear_cache() and reload there reaches this service; the combined text
+        is rebuilt only when that prompt object changes.
         
-        return [
-            {"role": "user", "content": content_string}
-        ]
+        Raises:
+            ValueError / FileNotFoundError: If the mode or its prompt file is invalid
+        """
+        mode_prompt = self.prompt_service.get_mode_prompt(PedagogyMode.from_string(pedagogy_mode))
+        cached = self._combined_system_by_mode.get(pedagogy_mode)
+        if cached is not None and cached[0] is mode_prompt:
+            return cached[1]
+        # Combine base system prompt with mode-specific instructions
+        combined_system = f"{self.system_preamble}\n\n---\n\n{mode_prompt}"
+        self._combined_system_by_mode[pedagogy_mode] = (mode_prompt, combined_system)
+        logger.debug("Prepared %s mode prompt (%d chars)", pedagogy_mode, len(mode_prompt))
+        return combined_system
     
     def _format_history(self, history: List[dict]) -> str:
         """
         Format conversation history for inclusion in prompt.
+        
+        Newest messages are kept first; once max_history_chars is used up,
+        older messages are dropped so long sessions don't inflate input tokens.
         """
         if not history:
             return ""
         
-        lines = ["Previous conversation in this session:"]
-        for msg in history:
-            role_label = "Student" if msg["role"] == "user" else "Tutor"
+        # Select from newest to oldest until the budget is exhausted
+        selected = []
+        used = 0
+        for msg in reversed(history):
+            label = "Student: " if msg["role"] == "user" else "Tutor: "
             content = msg["content"]
             # Truncate very long messages to save tokens
             if len(content) > 500:
                 content = content[:500] + "..."
-            lines.append(f"{role_label}: {content}")
+            size = len(label) + len(content) + 1
+            if self.max_history_chars is not None and used + size > self.max_history_chars:
+                break
+            selected.append((label, content))
+            used += size
+        
+        if len(selected) < len(history):
+            logger.info("history_truncated=True kept=%d/%d messages (%d chars)", len(selected), len(history), used)
+        if not selected:
+            return ""
         
-        lines.append("")  # Blank line separator
-        return "\n".join(lines)
+        # Write straight into one buffer, oldest first
+        buf = io.StringIO()
+        write = buf.write
+        write("Previous conversation in this session:\n")
+        for label, content in reversed(selected):
+            write(label)
+            write(content)
+            write("\n")  # Trailing newline doubles as the blank line separator
+        return buf.getvalue()
     
     def _generate_session_title(self, first_message: str) -> str:
         """
         Generate a short 2-3 word title for a session based on the first user message.
         
+        Plain statements are titled locally from their keywords; questions and
+        other ambiguous messages fall back to an LLM call.
+        
         Args:
             first_message: The user's first message in the session
             
         Returns:
             A concise title (2-3 words)
         """
-        prompt = f"""Generate a very short, concise title (2-3 words maximum) for a chat session based on this first message.
-
-First message: "{first_message}"
-
-Examples:
-- "How do I print text in Python?" → "Print Function"
-- "Explain recursion to me" → "Recursion Basics"
-- "Help me debug this code" → "Debug Help"
-- "What are lists?" → "Python Lists"
-
-Provide only the title, nothing else. Keep it short and descriptive."""
-        
-        messages = [
-            {"role": "user", "content": prompt}
-        ]
-        
+        title = _heuristic_title(first_message)
+        if title is not None:
+            return title
         try:
-            result = self.agent_client.chat(messages)
-            
-            # Extract title from result
-            if isinstance(result, str):
-                title = result.strip()
-            elif isinstance(result, dict):
-                title = result.get("content", "New Chat").strip()
-            else:
-                title = "New Chat"
-            
-            # Strip reasoning tags if present
-            title = self._strip_reasoning_tags(title)
-            
-            # Clean up the title (remove quotes, limit length)
-            title = title.strip('"\'\'').strip()
-            
-            # Ensure it's not too long (max 30 chars)
-            if len(title) > 30:
-                title = title[:27] + "..."
-            
-            return title if title else "New Chat"
-            
+            result = self._call_agent(self._title_prompt(first_message))
+            return self._clean_title(result)
         except Exception as e:
-            logger.error(f"Error generating session title: {e}")
+            logger.error("Error generating session title: %s", e)
             return "New Chat"
     
-    def _migrate_old_mode(self, mode: str) -> str:
-        """
-        Migrate old 5-mode system values to new 3-mode system.
+    async def _agenerate_session_title(self, first_message: str) -> str:
+        """Async variant of _generate_session_title()."""
+        title = _heuristic_title(first_message)
+        if title is not None:
+            return title
+        try:
+            result = await self._acall_agent(self._title_prompt(first_message))
+            return self._clean_title(result)
+        except Exception as e:
+            logger.error("Error generating session title: %s", e)
+            return "New Chat"
+    
+    def _title_prompt(self, first_message: str) -> str:
+        """Build the prompt for the session title request."""
+        return _TITLE_PROMPT_TEMPLATE.format_map({"msg": first_message})
+    
+    def _clean_title(self, result) -> str:
+        """Extract a display title from the agent result."""
+        if isinstance(result, str):
+            title = result.strip()
+        elif isinstance(result, dict):
+            title = result.get("content", "New Chat").strip()
+        else:
+            title = "New Chat"
         
-        Args:
-            mode: Old or new mode value
-            
-        Returns:
-            Valid mode value from new 3-mode system
-        """
-        # Map old modes to new modes
-        mode_migration = {
-            'socratic': 'practice',      # Socratic -> Practice
-            'assessment': 'practice',     # Assessment -> Practice
-            'review': 'explanatory',      # Review -> Explanatory
-            # New modes pass through
-            'explanatory': 'explanatory',
-            'debugging': 'debugging',
-            'practice': 'practice'
-        }
+        # Strip reasoning tags if present
+        title = self._strip_reasoning_tags(title)
+        
+        # Clean up the title (remove quotes, limit length)
+        title = title.strip('"\'\'').strip()
         
-        migrated = mode_migration.get(mode, 'explanatory')
-        if migrated != mode:
-            logger.info(f"Migrated old mode '{mode}' to '{migrated}'")
-        return migrated
+        # Ensure it's not too long (max 30 chars)
+        if len(title) > 30:
+            title = title[:27] + "..."
+        
+        return title if title else "New Chat"
     
     def _strip_reasoning_tags(self, text: str) -> str:
         """
         Remove <reasoning>...</reasoning> tags and their content from model output.
         The model may use these tags for internal chain-of-thought reasoning,
         but we don't want to show this to end users.
+        
+        Most answers contain no tags at all, so that case skips the scan
+        entirely; otherwise a single pass over the text drops tagged spans.
         """
-        import re
-        # Remove reasoning tags and their content (case-insensitive)
-        cleaned = re.sub(r'<reasoning>.*?</reasoning>', '', text, flags=re.IGNORECASE | re.DOTALL)
-        # Remove any leftover standalone tags
-        cleaned = re.sub(r'</?reasoning>', '', cleaned, flags=re.IGNORECASE)
-        # Clean up excessive whitespace
-        cleaned = re.sub(r'\n{3,}', '\n\n', cleaned)
-        return cleaned.strip()
+        return _strip_reasoning(text)
@@ -1,15 +1,51 @@
 from __future__ import annotations
 
+import logging
 import os
+import threading
 
-import uuid
-from typing import List, Optional, Dict, Any
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
+from typing import TYPE_CHECKING, List, Optional, Dict, Any
 
-from neo4j import GraphDatabase, Driver
+import numpy as np
+
+try:
+    from scipy.linalg.blas import sgemv
+except ImportError:  # scipy is optional here; fall back to numpy's matmul
+    sgemv = None
 
 from src.main.utils.SplitByMd import split_by_markdown_heading
 from src.main.service.TextPreprocessingService import TextPreprocessingService
-from src.main.llm.AgentCoreProvider import AgentCoreProvider
+
+if TYPE_CHECKING:
+    from neo4j import Driver
+    from src.main.llm.AgentCoreProvider import AgentCoreProvider
+
+logger = logging.getLogger(__name__)
+
+# HNSW index over Document.embedding used for semantic search
+VECTOR_INDEX_NAME = "doc_embedding"
+# Composite index backing list_documents' scope filter and createdAt ordering
+SCOPE_INDEX_NAME = "doc_scope_created"
+# Most texts Cohere embed models on Bedrock accept per request
+EMBED_BATCH_SIZE = 96
+# Layout of the packed Document.embedding_f32 property (little-endian float32)
+EMBEDDING_BYTES_DTYPE = np.dtype("<f4")
+# Rows widened to int32 at a time when scoring the int8 matrix
+INT8_SCORE_BLOCK_ROWS = 4096
+
+
+def _quantize_int8(values: np.ndarray):
+    """
+    Symmetric per-row int8 quantisation: values ~= q * scale.
+    Returns (int8 array, float32 scale per row).
+    """
+    scales = np.abs(values).max(axis=-1, keepdims=True) / 127.0
+    scales[scales == 0] = 1.0
+    q = np.round(values / scales).astype(np.int8)
+    return q, scales.squeeze(-1).astype(np.float32)
 
 
 class ContextVectorService:
@@ -22,6 +58,8 @@ class ContextVectorService:
         embed_model_id: str | None = None,
         expected_embed_dim: Optional[int] = None,   # defaults to 1024 if None
         embed_max_chars: Optional[int] = None,      # max characters to send to embed API
+        max_concurrency: Optional[int] = None,      # parallel embed requests for multi-batch uploads
+        quantize_int8: Optional[bool] = None,       # int8 fallback-search matrix (4x less memory)
     ) -> None:
         self.neo4j_uri = neo4j_uri or os.getenv("NEO4J_URI")
         self.neo4j_user = neo4j_user or os.getenv("NEO4J_USERNAME")
@@ -33,15 +71,60 @@ class ContextVectorService:
         self.expected_embed_dim = expected_embed_dim or 1024
         # Embed max chars: provider limits (default 2048 based on observed error)
         self.embed_max_chars = embed_max_chars or int(os.getenv("EMBED_MAX_CHARS", "2048"))
+        # Batches are independent requests; bound how many are in flight per upload
+        self.max_concurrency = max_concurrency or int(os.getenv("EMBED_MAX_CONCURRENCY", "8"))
+        if quantize_int8 is None:
+            quantize_int8 = os.getenv("EMBED_QUANTIZE_INT8", "false").lower() == "true"
+        self.quantize_int8 = quantize_int8
 
-        # Neo4j driver
+        # Neo4j driver (imported here: the package is slow to load on a cold start)
+        from neo4j import GraphDatabase
         self.driver: Driver = GraphDatabase.driver(self.neo4j_uri, auth=(self.neo4j_user, self.neo4j_password))
-        self.preprocessor = TextPreprocessingService()
-        self.llm = AgentCoreProvider()
+        self.preprocessor = TextPreprocessingService.get_default()
+        self._vector_index_ready: Optional[bool] = None  # None = not checked yet
+        self._scope_index_ready = False
+        # Normalised embeddings for the brute-force fallback, reloaded after writes
+        self._emb_matrix: Optional[np.ndarray] = None
+        self._emb_scales: Optional[np.ndarray] = None  # per-row scales when quantised
+        self._emb_ids: List[str] = []
+        self._emb_texts: List[str] = []
+        self._emb_dirty = True
+        self._emb_lock = threading.Lock()
+
+    @cached_property
+    def llm(self) -> AgentCoreProvider:
+        """Embedding provider, built on first use so boto3 loads only when needed."""
+        from src.main.llm.AgentCoreProvider import AgentCoreProvider
+        return AgentCoreProvider()
 
     # ------------------------ core ops ------------------------
 
     def embed(self, text: str) -> List[float]:
+        return self._batch_embed([text])[0]
+
+    def _batch_embed(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed many texts with as few provider calls as possible.
+        Texts are sent in batches of up to EMBED_BATCH_SIZE (Cohere's per-request
+        cap on Bedrock); the character limit applies to each text, not the batch.
+        Multiple batches are requested concurrently, up to max_concurrency.
+        Returns one vector per input text, in input order.
+        """
+        prepared = [self._truncate_for_embed(t) for t in texts]
+        batches = [prepared[i:i + EMBED_BATCH_SIZE] for i in range(0, len(prepared), EMBED_BATCH_SIZE)]
+        if len(batches) <= 1 or self.max_concurrency <= 1:
+            results = [self.llm.embed(batch) for batch in batches]
+        else:
+            # botocore clients are thread-safe; map() keeps results in batch order
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as ex:
+                results = list(ex.map(self.llm.embed, batches))
+
+        vectors: List[List[float]] = []
+        for batch, result in zip(batches, results):
+            vectors.extend(self._validate_vectors(result, len(batch)))
+        return vectors
+
+    def _truncate_for_embed(self, text: str) -> str:
         # Defensive: ensure text is a string
         if not isinstance(text, str):
             text = str(text)
@@ -51,15 +134,19 @@ class ContextVectorService:
         if self.embed_max_chars and len(text) > self.embed_max_chars:
             print(f"[warn] input too long for embed API (len={len(text)}); truncating to {self.embed_max_chars} chars")
             text = text[: self.embed_max_chars]
+        return text
 
-        vectors = self.llm.embed([text])
+    def _validate_vectors(self, vectors, expected_count: int) -> List[List[float]]:
         if isinstance(vectors, dict) and "vectors" in vectors:
             vectors = vectors["vectors"]
         if not vectors or not isinstance(vectors, list) or not isinstance(vectors[0], list):
             raise ValueError(f"Embedding response malformed: {vectors}")
-        if len(vectors[0]) != self.expected_embed_dim:
-            raise ValueError(f"Embedding dim mismatch: expected {self.expected_embed_dim}, got {len(vectors[0])}")
-        return vectors[0]
+        if len(vectors) != expected_count:
+            raise ValueError(f"Embedding count mismatch: expected {expected_count}, got {len(vectors)}")
+        for v in vectors:
+            if len(v) != self.expected_embed_dim:
+                raise ValueError(f"Embedding dim mismatch: expected {self.expected_embed_dim}, got {len(v)}")
+        return vectors
 
     # ------------------------ public API for controller ------------------------
 
@@ -70,40 +157,53 @@ class ContextVectorService:
         edited_text = self.preprocessor.preprocess_to_markdown(text)
         print("edited text:", edited_text)
         chunks = split_by_markdown_heading(edited_text) or [edited_text]
-        document_id = uuid.uuid4().hex
+        document_id = secrets.token_hex(16)
+
+        # If chunk is a dict, use its 'content' field
+        chunk_texts = [ch["content"] if isinstance(ch, dict) and "content" in ch else str(ch) for ch in chunks]
+        embeddings = self._batch_embed(chunk_texts)
 
-        inserted = []
+        rows = [
+            {
+                "idx": i,
+                "text": chunk_text,
+                "embedding": embedding,
+                "embedding_f32": np.asarray(embedding, dtype=EMBEDDING_BYTES_DTYPE).tobytes(),
+            }
+            for i, (chunk_text, embedding) in enumerate(zip(chunk_texts, embeddings))
+        ]
+        # One round-trip for all chunks instead of one per chunk
         with self.driver.session() as s:
-            for i, ch in enumerate(chunks):
-                # If chunk is a dict, use its 'content' field
-                chunk_text = ch["content"] if isinstance(ch, dict) and "content" in ch else str(ch)
-                embedding = self.embed(chunk_text)
-                s.run(
-                    """
-                    MERGE (d:Document {id: $id, chunk_idx: $idx})
-                    SET d.title = $title,
-                        d.description = $description,
-                        d.text = $text,
-                        d.embedding = $embedding,
-                        d.scope = $scope,
-                        d.createdAt = datetime()
-                    """,
-                    id=document_id,
-                    title=document_name,
-                    description=description,
-                    text=chunk_text,
-                    embedding=embedding,
-                    idx=i,
-                    scope=scope,
-                )
-                inserted.append({
-                    "id": document_id,
-                    "title": document_name,
-                    "description": description,
-                    "chunk_idx": i,
-                    "scope": scope,
-                })
+            s.run(
+                """
+                UNWIND $rows AS row
+                MERGE (d:Document {id: $id, chunk_idx: row.idx})
+                SET d.title = $title,
+                    d.description = $description,
+                    d.text = row.text,
+                    d.embedding = row.embedding,
+                    d.embedding_f32 = row.embedding_f32,
+                    d.scope = $scope,
+                    d.createdAt = datetime()
+                """,
+                rows=rows,
+                id=document_id,
+                title=document_name,
+                description=description,
+                scope=scope,
+            )
 
+        inserted = [
+            {
+                "id": document_id,
+                "title": document_name,
+                "description": description,
+                "chunk_idx": i,
+                "scope": scope,
+            }
+            for i in range(len(rows))
+        ]
+        self._invalidate_embedding_cache()
         return {
             "document_id": document_id,
             "title": description,
@@ -127,6 +227,7 @@ class ContextVectorService:
                 """,
                 document_id=document_id,
             ).single()
+            self._invalidate_embedding_cache()
 
             if rec:
                 return {"documents_deleted": rec["documents_deleted"]}
@@ -134,58 +235,207 @@ class ContextVectorService:
                 return {"documents_deleted": 0}
 
     def list_documents(self, offset: int, limit: int, scope: str):
+        self._ensure_scope_index()
         query = (
             "MATCH (d:Document) "
-            "WHERE d.Scope = $scope "
+            "WHERE d.scope = $scope "
             "WITH d ORDER BY d.createdAt DESC "
             "SKIP $offset LIMIT $limit "
             "RETURN d.id AS document_id, d.title AS title, d.description AS description, d.scope AS scope, d.createdAt AS created_at "
         )
-        with self.driver.session() as s:
-            result = s.run(query, scope=scope, offset=offset, limit=limit)
-            docs = []
-            for record in result:
-                docs.append({
-                    "document_id": record["document_id"],
-                    "title": record["title"],
-                    "description": record["description"],
-                    "scope": record["scope"],
-                    "created_at": record["created_at"],
-                })
-            return docs
+        records = self._read(query, scope=scope, offset=offset, limit=limit)
+        docs = []
+        for record in records:
+            docs.append({
+                "document_id": record["document_id"],
+                "title": record["title"],
+                "description": record["description"],
+                "scope": record["scope"],
+                "created_at": record["created_at"],
+            })
+        return docs
 
     def semantic_search(self, query: str, top_k: int = 5) -> list[dict]:
         """
         Returns top_k most relevant document chunks for the query.
         Each result: {"id": str, "text": str, "score": float, ...}
         """
-        import math
-        def cosine_similarity(a, b):
-            dot = sum(x*y for x, y in zip(a, b))
-            norm_a = math.sqrt(sum(x*x for x in a))
-            norm_b = math.sqrt(sum(y*y for y in b))
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-            return dot / (norm_a * norm_b)
+        return self.search_by_embedding(self.embed(query), top_k=top_k)
 
-        query_embedding = self.embed(query)
-        with self.driver.session() as s:
-            # Fetch all chunks and their embeddings
-            results = s.run(
+    def search_by_embedding(self, query_embedding: List[float], top_k: int = 5) -> list[dict]:
+        """
+        Returns top_k chunks most similar to an already-computed query embedding.
+        Lets callers that embedded the query for other reasons (e.g. a cache
+        lookup) search without a second embed round-trip.
+        Neighbours come from the Neo4j vector index, so only the top_k
+        chunks are read instead of every stored embedding. Servers without
+        vector index support fall back to an exact in-process scan.
+        """
+        if not self._ensure_vector_index():
+            return self._brute_force_search(query_embedding, top_k)
+        records = self._read(
+            """
+            CALL db.index.vector.queryNodes($index_name, $top_k, $embedding)
+            YIELD node, score
+            RETURN node.id AS id, node.text AS text, score
+            """,
+            index_name=VECTOR_INDEX_NAME,
+            top_k=top_k,
+            embedding=query_embedding,
+        )
+        return [{"id": r["id"], "text": r["text"], "score": r["score"]} for r in records]
+
+    def _brute_force_search(self, query_embedding: List[float], top_k: int) -> list[dict]:
+        """
+        Exact cosine search over every stored embedding, scored with one
+        matrix-vector product instead of a Python loop per document.
+        """
+        matrix, scales, ids, texts = self._load_embedding_matrix()
+        if matrix is None or top_k <= 0 or len(query_embedding) != matrix.shape[1]:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        query_norm = np.linalg.norm(query)
+        if query_norm == 0:
+            scores = np.zeros(len(ids), dtype=np.float32)
+        elif scales is None:
+            scores = self._float_scores(matrix, query / query_norm)
+        else:
+            scores = self._int8_scores(matrix, scales, query / query_norm)
+
+        k = min(top_k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [{"id": ids[i], "text": texts[i], "score": float(scores[i])} for i in top]
+
+    @staticmethod
+    def _float_scores(matrix: np.ndarray, unit_query: np.ndarray) -> np.ndarray:
+        """
+        Cosine scores against the normalised float32 matrix via BLAS SGEMV.
+        matrix.T is Fortran-ordered, so trans=1 scores the C-ordered matrix
+        without the copy f2py would otherwise make.
+        """
+        if sgemv is None:
+            return matrix @ unit_query
+        return sgemv(1.0, matrix.T, unit_query, trans=1)
+
+    @staticmethod
+    def _int8_scores(matrix: np.ndarray, scales: np.ndarray, unit_query: np.ndarray) -> np.ndarray:
+        """
+        Approximate cosine scores against the int8 matrix.
+        Integer dot products are exact in int32; rows are widened a block at a
+        time so scoring never materialises a full-size int32 copy.
+        """
+        q, q_scale = _quantize_int8(unit_query)
+        q = q.astype(np.int32)
+        dots = np.empty(matrix.shape[0], dtype=np.int32)
+        for start in range(0, matrix.shape[0], INT8_SCORE_BLOCK_ROWS):
+            block = matrix[start:start + INT8_SCORE_BLOCK_ROWS]
+            dots[start:start + len(block)] = block.astype(np.int32) @ q
+        return dots * (scales * q_scale)
+
+    def _load_embedding_matrix(self):
+        """
+        Return (normalised matrix, row scales, ids, texts) for all stored chunks.
+        Scales are None unless the matrix is int8-quantised.
+        The corpus is fetched from Neo4j only after this process uploads or
+        deletes documents; otherwise the cached matrix is reused.
+        """
+        with self._emb_lock:
+            if not self._emb_dirty:
+                return self._emb_matrix, self._emb_scales, self._emb_ids, self._emb_texts
+
+            # Packed float32 bytes when present; the float list only for older chunks
+            records = self._read(
                 """
                 MATCH (d:Document)
-                RETURN d.id AS id, d.text AS text, d.embedding AS embedding
+                WHERE d.embedding IS NOT NULL OR d.embedding_f32 IS NOT NULL
+                RETURN d.id AS id, d.text AS text, d.embedding_f32 AS embedding_f32,
+                       CASE WHEN d.embedding_f32 IS NULL THEN d.embedding END AS embedding
                 """
             )
-            scored = []
-            for r in results:
-                emb = r["embedding"]
-                if not emb or len(emb) != len(query_embedding):
-                    continue  # skip invalid
-                score = cosine_similarity(query_embedding, emb)
-                scored.append({"id": r["id"], "text": r["text"], "score": score})
-            scored.sort(key=lambda x: x["score"], reverse=True)
-            return scored[:top_k]
+            rows, vectors = [], []
+            for r in records:
+                packed = r.get("embedding_f32")
+                if packed is not None:
+                    vec = np.frombuffer(packed, dtype=EMBEDDING_BYTES_DTYPE)
+                elif r.get("embedding"):
+                    vec = np.asarray(r["embedding"], dtype=np.float32)
+                else:
+                    continue
+                if len(vec) == self.expected_embed_dim:
+                    rows.append(r)
+                    vectors.append(vec)
+
+            matrix, scales = None, None
+            if rows:
+                matrix = np.stack(vectors).astype(np.float32)
+                norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+                norms[norms == 0] = 1.0  # zero vectors score 0 rather than NaN
+                matrix /= norms
+                if self.quantize_int8:
+                    matrix, scales = _quantize_int8(matrix)
+            self._emb_matrix = matrix
+            self._emb_scales = scales
+            self._emb_ids = [r["id"] for r in rows]
+            self._emb_texts = [r["text"] for r in rows]
+            self._emb_dirty = False
+            return self._emb_matrix, self._emb_scales, self._emb_ids, self._emb_texts
+
+    def _read(self, query: str, **params) -> list:
+        """Run a read-only query through the driver's managed execute_query path."""
+        from neo4j import RoutingControl
+        records, _, _ = self.driver.execute_query(query, routing_=RoutingControl.READ, **params)
+        return records
+
+    def _invalidate_embedding_cache(self) -> None:
+        with self._emb_lock:
+            self._emb_dirty = True
+
+    def _ensure_vector_index(self) -> bool:
+        """
+        Create the cosine vector index on Document.embedding if it is missing.
+        Runs once per process, on the first search rather than at construction,
+        so building the service never needs a live database.
+        Returns False when the server does not support vector indexes.
+        """
+        if self._vector_index_ready is not None:
+            return self._vector_index_ready
+        from neo4j.exceptions import ClientError
+        try:
+            with self.driver.session() as s:
+                s.run(
+                    f"""
+                    CREATE VECTOR INDEX {VECTOR_INDEX_NAME} IF NOT EXISTS
+                    FOR (d:Document) ON (d.embedding)
+                    OPTIONS {{ indexConfig: {{
+                        `vector.dimensions`: {int(self.expected_embed_dim)},
+                        `vector.similarity_function`: 'cosine'
+                    }} }}
+                    """
+                ).consume()  # surface server errors here, not on a later query
+            self._vector_index_ready = True
+        except ClientError as e:
+            logger.warning(f"Vector index unavailable, using brute-force search: {e}")
+            self._vector_index_ready = False
+        return self._vector_index_ready
+
+    def _ensure_scope_index(self) -> None:
+        """
+        Create the (scope, createdAt) index used by list_documents, once per process.
+        Lets the scope filter and ORDER BY createdAt run off the index instead
+        of a label scan plus sort.
+        """
+        if self._scope_index_ready:
+            return
+        with self.driver.session() as s:
+            s.run(
+                f"""
+                CREATE INDEX {SCOPE_INDEX_NAME} IF NOT EXISTS
+                FOR (d:Document) ON (d.scope, d.createdAt)
+                """
+            ).consume()
+        self._scope_index_ready = True
 
     def close(self) -> None:
         self.driver.close()
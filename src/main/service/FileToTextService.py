@@ -3,10 +3,32 @@ FileToTextService.py
 Service for extracting text from PDF files (MVP).
 """
 import os
-from PyPDF2 import PdfReader
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
 from fastapi import UploadFile
 import tempfile
 
+# Page count above which extraction is spread across worker processes;
+# smaller files finish before a process pool would even start
+PARALLEL_PAGE_THRESHOLD = 32
+# Fewest pages handed to one worker, so each process amortises its startup
+MIN_PAGES_PER_WORKER = 8
+
+
+def _extract_page_range(pdf_path: str, start: int, stop: int) -> str:
+    """Extract text from pages [start, stop) in a worker process."""
+    from PyPDF2 import PdfReader
+    reader = PdfReader(pdf_path)
+    return "".join(reader.pages[i].extract_text() or "" for i in range(start, stop))
+
+
+@lru_cache(maxsize=1)
+def _process_pool() -> ProcessPoolExecutor:
+    """Process-wide extraction pool, started on first use and reused by every request."""
+    return ProcessPoolExecutor(max_workers=os.cpu_count() or 1)
+
+
 class FileToTextService:
     """
     Extracts text from a PDF file.
@@ -21,16 +43,40 @@ class FileToTextService:
         """
         if not os.path.isfile(pdf_path):
             raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+        # Imported on first use to keep PyPDF2 off the app's cold-start path
+        from PyPDF2 import PdfReader
         try:
             reader = PdfReader(pdf_path)
-            text = ""
+            page_count = len(reader.pages)
+            if page_count > PARALLEL_PAGE_THRESHOLD:
+                return self._parallel_extract(pdf_path, page_count)
+            parts = []
             for page in reader.pages:
-                text += page.extract_text() or ""
-            return text
+                parts.append(page.extract_text() or "")
+            return "".join(parts)
         except Exception as e:
             # TODO: Handle encrypted/image-only PDFs, log error if needed
             return ""
 
+    def _parallel_extract(self, pdf_path: str, page_count: int) -> str:
+        """
+        Extract text from contiguous page ranges in parallel processes.
+        PyPDF2 is pure Python, so threads would serialise on the GIL.
+        """
+        workers = max(1, min(os.cpu_count() or 1, page_count // MIN_PAGES_PER_WORKER))
+        if workers == 1:
+            return _extract_page_range(pdf_path, 0, page_count)
+        step = -(-page_count // workers)  # ceil division
+        starts = list(range(0, page_count, step))
+        stops = [min(start + step, page_count) for start in starts]
+        try:
+            parts = _process_pool().map(_extract_page_range, [pdf_path] * len(starts), starts, stops)
+            return "".join(parts)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool for the next request
+            _process_pool.cache_clear()
+            raise
+
     def extract_text_from_uploadfile(self, file: UploadFile) -> str:
         """
         Accepts a FastAPI UploadFile (PDF), saves to temp, extracts text, and cleans up.
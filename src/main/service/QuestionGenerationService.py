@@ -3,14 +3,18 @@ QuestionGenerationService: Generates oral exam questions from assignment briefs
 - Loads question generation prompt template
 - Calls LLM to generate questions in JSON format
 - Saves output as both JSON and CSV files
+- agenerate_questions() serves the endpoint without blocking the event loop
 """
-import json
+import asyncio
 import csv
 import os
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+import orjson
+
 from src.main.llm.AgentCoreProvider import AgentCoreProvider
+from src.main.utils.ExtractJson import extract_json_block
 from src.main.utils.ReadPrompt import read_prompt
 
 
@@ -64,12 +68,61 @@ class QuestionGenerationService:
         """
         print(f"[QuestionGenerationService] Generating questions for student: {student_name}")
         
+        # Call the LLM
+        try:
+            result = self.agent_client.chat(self._build_messages(assignment_brief, student_code))
+        except Exception as e:
+            raise QuestionGenerationError(f"LLM call failed: {e}")
+        questions, tokens_used = self._extract_questions(result)
+        
+        # Save to files
+        json_path = self._save_json(questions, student_name)
+        csv_path = self._save_csv(questions, student_name)
+        
+        return self._build_result(questions, json_path, csv_path, tokens_used)
+
+    async def agenerate_questions(
+        self,
+        assignment_brief: str,
+        student_code: str,
+        student_name: str
+    ) -> Dict[str, Any]:
+        """
+        Async variant of generate_questions() for use from the event loop.
+        
+        The LLM call is awaited (in a worker thread if the client has no
+        achat), and the independent JSON and CSV writes run concurrently.
+        
+        Args and return value are identical to generate_questions().
+        """
+        print(f"[QuestionGenerationService] Generating questions for student: {student_name}")
+        
+        messages = self._build_messages(assignment_brief, student_code)
+        try:
+            achat = getattr(self.agent_client, "achat", None)
+            if achat is not None:
+                result = await achat(messages)
+            else:
+                result = await asyncio.to_thread(self.agent_client.chat, messages)
+        except Exception as e:
+            raise QuestionGenerationError(f"LLM call failed: {e}")
+        questions, tokens_used = self._extract_questions(result)
+        
+        json_path, csv_path = await asyncio.gather(
+            asyncio.to_thread(self._save_json, questions, student_name),
+            asyncio.to_thread(self._save_csv, questions, student_name),
+        )
+        
+        return self._build_result(questions, json_path, csv_path, tokens_used)
+
+    def _build_messages(self, assignment_brief: str, student_code: str) -> List[Dict[str, Any]]:
+        """Build the LLM messages from the prompt template, assignment and code."""
         # Build the complete prompt
         system_prompt = self._build_system_prompt()
         user_prompt = self._build_user_prompt(assignment_brief, student_code)
         
         # Prepare messages for the LLM
-        messages = [
+        return [
             {
                 "role": "user",
                 "content": [
@@ -78,13 +131,9 @@ class QuestionGenerationService:
                 ]
             }
         ]
-        
-        # Call the LLM
-        try:
-            result = self.agent_client.chat(messages)
-        except Exception as e:
-            raise QuestionGenerationError(f"LLM call failed: {e}")
-        
+
+    def _extract_questions(self, result) -> tuple[List[Dict[str, Any]], Optional[int]]:
+        """Extract the parsed questions and token usage from an LLM result."""
         # Extract the response text
         if isinstance(result, dict):
             response_text = result.get("text") or result.get("content") or result.get("answer") or ""
@@ -94,12 +143,15 @@ class QuestionGenerationService:
             tokens_used = None
         
         # Parse JSON from response
-        questions = self._parse_json_response(response_text)
-        
-        # Save to files
-        json_path = self._save_json(questions, student_name)
-        csv_path = self._save_csv(questions, student_name)
-        
+        return self._parse_json_response(response_text), tokens_used
+
+    def _build_result(
+        self,
+        questions: List[Dict[str, Any]],
+        json_path: Path,
+        csv_path: Path,
+        tokens_used: Optional[int]
+    ) -> Dict[str, Any]:
         print(f"[QuestionGenerationService] Generated {len(questions)} questions")
         print(f"[QuestionGenerationService] Saved to: {json_path} and {csv_path}")
         
@@ -177,22 +229,13 @@ Generate the questions in JSON format as specified.
         Returns:
             List of question dictionaries
         """
-        # Try to find JSON in markdown code blocks
-        if "```json" in response_text:
-            start = response_text.find("```json") + 7
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        elif "```" in response_text:
-            start = response_text.find("```") + 3
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        else:
-            json_str = response_text.strip()
+        # Prefer a ```json block, else a bare ``` block, else the whole text
+        json_str = extract_json_block(response_text)
         
         # Parse JSON
         try:
-            questions = json.loads(json_str)
-        except json.JSONDecodeError as e:
+            questions = orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
             raise QuestionGenerationError(f"Failed to parse JSON response: {e}\nResponse: {response_text[:500]}")
         
         # Validate it's a list
@@ -206,8 +249,9 @@ Generate the questions in JSON format as specified.
         filename = f"{student_name}_questions.json"
         filepath = self.output_dir / filename
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(questions, f, indent=2, ensure_ascii=False)
+        # orjson writes UTF-8 directly (the ensure_ascii=False equivalent)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(questions, option=orjson.OPT_INDENT_2))
         
         return filepath
 
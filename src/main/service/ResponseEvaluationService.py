@@ -3,18 +3,97 @@ ResponseEvaluationService: Evaluates student responses to programming questions.
 - Loads student response CSV
 - Evaluates each response using AI
 - Generates detailed reports and scores
-- Supports async job processing
+- Supports async job processing on a bounded worker pool; finished jobs expire after a TTL
+- Evaluates a job's questions concurrently, bounded by max_concurrency
+- Packs batch_size questions into each LLM call, retrying singly on a bad batch
+- Optionally reuses earlier evaluations of identical prompts from an on-disk cache
 """
-import json
+import asyncio
 import csv
 import os
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterable, Iterator
 from datetime import datetime
 
-from src.main.llm.AgentCoreProvider import AgentCoreProvider
+import numpy as np
+import orjson
+
+from src.main.llm.AgentCoreProvider import AgentCoreProvider, LlmRateLimit, LlmTimeout
+from src.main.utils.ExtractJson import extract_json_block
 from src.main.utils.ReadPrompt import read_prompt
+from src.main.utils.RateLimiter import SlidingWindowRateLimiter, TokenBucketRateLimiter
+from src.main.utils.ResponseCache import ResponseCache
+from src.main.utils.Retry import acall_with_retry
+
+
+# Markdown report layout; filled with str.format so each section is built in one call
+_REPORT_HEADER_TEMPLATE = """# Oral Exam Evaluation Report
+
+**Student:** {student_name}
+
+**Date:** {date}
+
+**Overall Grade:** {grade} ({percentage:.1f}%)
+
+---
+
+## Summary
+
+- **Total Questions:** {question_count}
+- **Total Score:** {total_score:.1f}/{max_score}
+- **Percentage:** {percentage:.1f}%
+- **Average Correctness:** {correctness_avg:.2f}/5
+- **Average Understanding:** {understanding_avg:.2f}/5
+
+---
+
+## Question-by-Question Results
+
+"""
+
+_REPORT_QUESTION_TEMPLATE = """### Question {q_num} ({q_type}) - {total}/10 ({total_pct}%)
+
+**Question:** {question}
+
+**Score Breakdown:**
+- Correctness: {correctness}/5
+- Understanding: {understanding}/5
+- **Total: {total}/10**
+
+{strengths}{weaknesses}{feedback}{suggestions}---
+
+"""
+
+_REPORT_FOOTER_TEMPLATE = """## Overall Performance
+
+You scored {total_score:.1f} out of {max_score} points ({percentage:.1f}%), earning a grade of **{grade}**.
+
+{closing}
+"""
+
+
+@dataclass(slots=True)
+class ResponseRow:
+    """One student answer from the responses CSV (missing columns read as empty)."""
+    question_number: str = ""
+    question_type: str = ""
+    question: str = ""
+    code_reference: str = ""
+    transcript: str = ""
+
+
+_RESPONSE_COLUMNS = tuple(f.name for f in fields(ResponseRow))
+
+
+def _bullet_section(title: str, items: List[Any]) -> str:
+    """Render a bold heading and bullet list, or nothing when there are no items."""
+    if not items:
+        return ""
+    return f"**{title}:**\n" + "".join(f"- {item}\n" for item in items) + "\n"
 
 
 class ResponseEvaluationError(Exception):
@@ -27,7 +106,14 @@ class ResponseEvaluationService:
         self,
         agent_client: Optional[AgentCoreProvider] = None,
         base_output_dir: str = "test_outputs/evaluations",
-        responses_dir: str = "test_outputs/questions"
+        responses_dir: str = "test_outputs/questions",
+        max_concurrency: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        max_jobs: Optional[int] = None,
+        job_ttl_seconds: Optional[float] = None,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None
     ):
         """
         Initialize the response evaluation service.
@@ -36,18 +122,51 @@ class ResponseEvaluationService:
             agent_client: LLM provider (defaults to AgentCoreProvider)
             base_output_dir: Base directory for evaluation outputs
             responses_dir: Directory where response CSV files are located
+            max_concurrency: LLM calls in flight per job (env EVAL_MAX_CONCURRENCY, default 8)
+            batch_size: Questions evaluated per LLM call (env EVAL_BATCH_SIZE, default 5; 1 disables batching)
+            use_cache: Reuse evaluations of identical prompts across runs (env EVAL_CACHE=1)
+            max_jobs: Jobs evaluated at once; later jobs queue (env EVAL_MAX_JOBS, default 4)
+            job_ttl_seconds: How long finished jobs stay queryable (env EVAL_JOB_TTL_SECONDS, default 6h)
+            requests_per_minute: LLM calls started per minute across all jobs (env EVAL_RPM, default 60; 0 disables)
+            tokens_per_minute: Estimated prompt tokens per minute across all jobs (env EVAL_TPM, default 0 = no cap)
         """
-        self.agent_client = agent_client or AgentCoreProvider()
+        # Calls are retried by _achat_with_retry, so the default client skips botocore's own retries
+        self.agent_client = agent_client or AgentCoreProvider(caller_retries=True)
         self.base_output_dir = Path(base_output_dir)
         self.base_output_dir.mkdir(parents=True, exist_ok=True)
         self.responses_dir = Path(responses_dir)
+        self.max_concurrency = max_concurrency or int(os.getenv("EVAL_MAX_CONCURRENCY", "8"))
+        self.batch_size = max(1, batch_size or int(os.getenv("EVAL_BATCH_SIZE", "5")))
+        
+        # Shared by every job, so concurrent jobs stay under the provider's RPM/TPM together
+        rpm = requests_per_minute if requests_per_minute is not None else int(os.getenv("EVAL_RPM", "60"))
+        tpm = tokens_per_minute if tokens_per_minute is not None else int(os.getenv("EVAL_TPM", "0"))
+        self._rpm_limiter = SlidingWindowRateLimiter(rpm, period=60.0) if rpm > 0 else None
+        self._tpm_limiter = TokenBucketRateLimiter(tpm, period=60.0) if tpm > 0 else None
         
         # In-memory job store
         self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._jobs_lock = threading.Lock()
+        self.job_ttl_seconds = job_ttl_seconds or float(os.getenv("EVAL_JOB_TTL_SECONDS", "21600"))
+        
+        # Shared workers for background jobs, instead of a new thread per job
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_jobs or int(os.getenv("EVAL_MAX_JOBS", "4")),
+            thread_name_prefix="eval"
+        )
         
         # Load evaluation prompt
         prompt_file = Path(__file__).resolve().parents[3] / "prompts" / "response_evaluation_prompt.md"
         self.evaluation_prompt = read_prompt(prompt_file)
+        # Built once and shared by every request; the client never mutates it
+        self._rubric_message = {"role": "system", "content": [{"text": self.evaluation_prompt}]}
+        
+        # Evaluations keyed by rubric + question prompt; survives restarts and re-runs
+        if use_cache is None:
+            use_cache = os.getenv("EVAL_CACHE", "0").lower() in ("1", "true")
+        self.cache: Optional[ResponseCache] = (
+            ResponseCache(self.base_output_dir / ".cache" / "evaluations.sqlite3") if use_cache else None
+        )
         
         print(f"[ResponseEvaluationService] Initialized with output dir: {self.base_output_dir}")
         print(f"[ResponseEvaluationService] Reading responses from: {self.responses_dir}")
@@ -67,21 +186,23 @@ class ResponseEvaluationService:
         Returns:
             Dictionary with job_id and initial status
         """
+        self._evict_expired_jobs()
+        
         # Build full path to responses file
         responses_path = self.responses_dir / responses_file_name
         
         if not responses_path.exists():
             raise ResponseEvaluationError(f"Responses file not found: {responses_path}")
         
-        # Read CSV to get total questions
-        total_questions = self._count_questions(responses_path)
+        # Cheap estimate for the response; the job corrects it once the CSV is read
+        total_questions = self._estimate_question_count(responses_path)
         
         # Generate job ID
-        timestamp = int(datetime.now().timestamp())
-        job_id = f"eval_{student_name}_{timestamp}"
+        started = datetime.now()
+        job_id = f"eval_{student_name}_{int(started.timestamp())}"
         
         # Initialize job
-        self.jobs[job_id] = {
+        job = {
             "status": "processing",
             "student_name": student_name,
             "total_questions": total_questions,
@@ -92,16 +213,19 @@ class ResponseEvaluationService:
             },
             "result": None,
             "error": None,
-            "started_at": datetime.now().isoformat()
+            "started_at": started.isoformat(),
+            "finished_at": None,  # monotonic time, set when the job completes or fails
+            # Guards status/progress/result so get_job_status never sees a half-written update
+            "_lock": threading.Lock(),
+            "_inv_total": 1.0 / max(total_questions, 1)
         }
+        with self._jobs_lock:
+            self.jobs[job_id] = job
         
-        # Start background thread
-        thread = threading.Thread(
-            target=self._evaluate_responses_async,
-            args=(job_id, student_name, str(responses_path))
+        # Queue on the shared pool; runs as soon as a worker is free
+        job["future"] = self._executor.submit(
+            self._evaluate_responses_async, job_id, student_name, str(responses_path)
         )
-        thread.daemon = True
-        thread.start()
         
         print(f"[ResponseEvaluationService] Started evaluation job: {job_id}")
         
@@ -123,31 +247,60 @@ class ResponseEvaluationService:
         Returns:
             Dictionary with job status and results
         """
-        if job_id not in self.jobs:
+        with self._jobs_lock:
+            job = self.jobs.get(job_id)
+        if job is None:
             raise ResponseEvaluationError(f"Job not found: {job_id}")
         
-        job = self.jobs[job_id]
-        
-        response = {
-            "job_id": job_id,
-            "status": job["status"],
-            "message": self._get_status_message(job)
-        }
-        
-        if job["status"] == "processing":
-            response["progress"] = job["progress"]
-        elif job["status"] == "completed":
-            response["result"] = job["result"]
-        elif job["status"] == "failed":
-            response["error"] = job["error"]
+        with job["_lock"]:
+            # Safety net: a worker that died outside the job's own error handling
+            future = job.get("future")
+            if job["status"] == "processing" and future is not None and future.done() and future.exception():
+                job["status"] = "failed"
+                job["error"] = str(future.exception())
+                job["finished_at"] = time.monotonic()
+            
+            response = {
+                "job_id": job_id,
+                "status": job["status"],
+                "message": self._get_status_message(job)
+            }
+            
+            if job["status"] == "processing":
+                response["progress"] = job["progress"]
+            elif job["status"] == "completed":
+                response["result"] = job["result"]
+            elif job["status"] == "failed":
+                response["error"] = job["error"]
         
         return response
 
-    def _count_questions(self, csv_path: Path) -> int:
-        """Count number of questions in CSV file."""
-        with open(csv_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            return sum(1 for _ in reader)
+    def _evict_expired_jobs(self) -> None:
+        """Drop finished jobs older than job_ttl_seconds so the job store stays bounded."""
+        cutoff = time.monotonic() - self.job_ttl_seconds
+        with self._jobs_lock:
+            expired = [
+                job_id for job_id, job in self.jobs.items()
+                if job["finished_at"] is not None and job["finished_at"] < cutoff
+            ]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    def _estimate_question_count(self, csv_path: Path) -> int:
+        """
+        Estimate the number of questions from the CSV's line count, without parsing it.
+        
+        Exact for one row per line; quoted fields spanning lines make it an overestimate.
+        """
+        lines = 0
+        last = b"\n"
+        with open(csv_path, 'rb') as f:
+            while chunk := f.read(1 << 20):
+                lines += chunk.count(b"\n")
+                last = chunk[-1:]
+        if last != b"\n":
+            lines += 1  # final line without a trailing newline
+        return max(lines - 1, 0)  # minus the header
 
     def _evaluate_responses_async(
         self,
@@ -166,52 +319,20 @@ class ResponseEvaluationService:
         try:
             print(f"[Job {job_id}] Starting evaluation for {student_name}")
             
-            # Read responses CSV
-            responses = self._read_responses_csv(responses_file_path)
-            total_questions = len(responses)
+            # Stream the CSV straight into evaluation; results keep CSV order
+            responses = self._iter_responses_csv(responses_file_path)
+            evaluations = asyncio.run(self._evaluate_all(job_id, responses))
+            total_questions = len(evaluations)
             
-            # Evaluate each question
-            evaluations = []
-            total_correctness = 0.0
-            total_understanding = 0.0
-            total_score = 0.0
-            
-            for i, response in enumerate(responses):
-                try:
-                    print(f"[Job {job_id}] Evaluating question {i + 1}/{total_questions}")
-                    
-                    evaluation = self._evaluate_single_question(response)
-                    evaluations.append(evaluation)
-                    
-                    total_correctness += evaluation["correctness_score"]
-                    total_understanding += evaluation["understanding_score"]
-                    total_score += evaluation["total_score"]
-                    
-                    # Update progress
-                    self.jobs[job_id]["progress"] = {
-                        "questions_evaluated": i + 1,
-                        "total_questions": total_questions,
-                        "percentage": round((i + 1) / total_questions * 100, 1)
-                    }
-                    
-                except Exception as e:
-                    print(f"[Job {job_id}] Error evaluating question {i + 1}: {e}")
-                    # Add failed evaluation
-                    evaluations.append({
-                        "question_number": response.get("question_number", i + 1),
-                        "correctness_score": 0,
-                        "understanding_score": 0,
-                        "total_score": 0,
-                        "strengths": [],
-                        "weaknesses": ["Evaluation failed"],
-                        "feedback": f"Evaluation failed: {str(e)}",
-                        "suggested_improvements": [],
-                        "error": str(e)
-                    })
+            # One vectorised reduction per score column
+            scores = self._score_column(evaluations, "total_score")
+            correctness = self._score_column(evaluations, "correctness_score")
+            understanding = self._score_column(evaluations, "understanding_score")
+            total_score = float(scores.sum())
             
             # Calculate averages
-            correctness_avg = total_correctness / total_questions if total_questions > 0 else 0
-            understanding_avg = total_understanding / total_questions if total_questions > 0 else 0
+            correctness_avg = float(correctness.mean()) if total_questions > 0 else 0
+            understanding_avg = float(understanding.mean()) if total_questions > 0 else 0
             max_score = total_questions * 10
             percentage = (total_score / max_score * 100) if max_score > 0 else 0
             
@@ -222,17 +343,18 @@ class ResponseEvaluationService:
             output_dir = self.base_output_dir / student_name
             output_dir.mkdir(parents=True, exist_ok=True)
             
-            json_path = self._save_detailed_json(output_dir, student_name, evaluations, responses)
-            csv_path = self._save_summary_csv(output_dir, evaluations)
+            # One timestamp for every output file of this run
+            evaluated_at = datetime.now()
+            json_path = self._save_detailed_json(output_dir, student_name, evaluations, evaluated_at)
+            csv_path = self._save_summary_csv(output_dir, evaluations, scores)
             report_path = self._save_report(
                 output_dir, student_name, evaluations, 
                 total_score, max_score, percentage, grade,
-                correctness_avg, understanding_avg
+                correctness_avg, understanding_avg, evaluated_at
             )
             
             # Mark job as completed
-            self.jobs[job_id]["status"] = "completed"
-            self.jobs[job_id]["result"] = {
+            result = {
                 "ok": True,
                 "student_name": student_name,
                 "total_questions": total_questions,
@@ -247,29 +369,153 @@ class ResponseEvaluationService:
                 "understanding_avg": round(understanding_avg, 2),
                 "tokens_used": None  # Could track this
             }
+            job = self.jobs[job_id]
+            with job["_lock"]:
+                job["result"] = result
+                job["finished_at"] = time.monotonic()
+                job["status"] = "completed"
             
             print(f"[Job {job_id}] Evaluation completed. Score: {total_score}/{max_score} ({percentage:.1f}%)")
             
         except Exception as e:
             print(f"[Job {job_id}] Evaluation failed: {e}")
-            self.jobs[job_id]["status"] = "failed"
-            self.jobs[job_id]["error"] = str(e)
+            job = self.jobs[job_id]
+            with job["_lock"]:
+                job["error"] = str(e)
+                job["finished_at"] = time.monotonic()
+                job["status"] = "failed"
+
+    async def _evaluate_all(
+        self,
+        job_id: str,
+        responses: Iterable[ResponseRow]
+    ) -> List[Dict[str, Any]]:
+        """
+        Evaluate every response with at most max_concurrency LLM calls in flight.
+        
+        Questions are sent batch_size at a time, so the shared rubric prompt and
+        the round-trip are paid once per batch rather than once per question.
+        Batches are independent LLM calls and overlap up to the concurrency cap.
+        A batch whose reply fails validation is retried one question per call;
+        a question that still fails yields a zero-score placeholder instead of
+        failing the job.
+        
+        Rows are consumed lazily: each batch is dispatched as soon as it has been
+        read, so the first LLM call starts before the whole CSV is parsed. Progress
+        uses the job's estimated total until the last row has been read.
+        
+        Args:
+            job_id: Job identifier (progress is updated as questions finish)
+            responses: Response rows, e.g. straight from the CSV reader
+            
+        Returns:
+            One evaluation per response, in input order
+        """
+        job = self.jobs[job_id]
+        total_questions = job["total_questions"]
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        completed = 0
+        
+        def advance(count: int) -> None:
+            # Swap in a whole new progress dict under the job lock; readers see old or new, never a mix
+            nonlocal completed
+            with job["_lock"]:
+                completed += count
+                job["progress"] = {
+                    "questions_evaluated": completed,
+                    "total_questions": total_questions,
+                    "percentage": round(min(completed * job["_inv_total"], 1.0) * 100, 1)
+                }
+        
+        async def evaluate_one(i: int, response: ResponseRow) -> Dict[str, Any]:
+            async with semaphore:
+                print(f"[Job {job_id}] Evaluating question {i + 1}/{total_questions}")
+                try:
+                    evaluation = await self._evaluate_single_question(response)
+                except Exception as e:
+                    print(f"[Job {job_id}] Error evaluating question {i + 1}: {e}")
+                    evaluation = {
+                        "question_number": response.question_number or i + 1,
+                        "correctness_score": 0,
+                        "understanding_score": 0,
+                        "total_score": 0,
+                        "strengths": [],
+                        "weaknesses": ["Evaluation failed"],
+                        "feedback": f"Evaluation failed: {str(e)}",
+                        "suggested_improvements": [],
+                        "error": str(e)
+                    }
+            advance(1)
+            return evaluation
+        
+        async def evaluate_batch(start: int, batch: List[ResponseRow]) -> List[Dict[str, Any]]:
+            if len(batch) == 1:
+                return [await evaluate_one(start, batch[0])]
+            async with semaphore:
+                print(f"[Job {job_id}] Evaluating questions {start + 1}-{start + len(batch)}/{total_questions}")
+                try:
+                    evaluations = await self._evaluate_question_batch(batch)
+                except Exception as e:
+                    print(f"[Job {job_id}] Batch {start + 1}-{start + len(batch)} failed, retrying individually: {e}")
+                    evaluations = None
+            # Retry outside the semaphore: each single call takes its own slot
+            if evaluations is None:
+                return await asyncio.gather(*(evaluate_one(start + j, r) for j, r in enumerate(batch)))
+            advance(len(batch))
+            return evaluations
+        
+        tasks = []
+        batch: List[ResponseRow] = []
+        start = 0
+        for response in responses:
+            batch.append(response)
+            if len(batch) == self.batch_size:
+                tasks.append(asyncio.create_task(evaluate_batch(start, batch)))
+                start += len(batch)
+                batch = []
+                await asyncio.sleep(0)  # let the batch start its LLM call while parsing continues
+        if batch:
+            tasks.append(asyncio.create_task(evaluate_batch(start, batch)))
+        
+        # The CSV is fully read: replace the estimate with the real count
+        total_questions = start + len(batch)
+        with job["_lock"]:
+            job["total_questions"] = total_questions
+            job["_inv_total"] = 1.0 / max(total_questions, 1)
+        if completed:
+            advance(0)
+        
+        batches = await asyncio.gather(*tasks)
+        return [evaluation for batch in batches for evaluation in batch]
 
-    def _read_responses_csv(self, file_path: str) -> List[Dict[str, str]]:
-        """Read student responses from CSV file."""
-        responses = []
+    def _iter_responses_csv(self, file_path: str) -> Iterator[ResponseRow]:
+        """
+        Yield student responses from CSV file one row at a time.
+        
+        Columns are resolved to positions once from the header, so each row is
+        a plain csv.reader list unpacked into a slotted ResponseRow, not a dict.
+        """
         with open(file_path, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                responses.append(row)
-        return responses
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            positions = [header.index(name) if name in header else None for name in _RESPONSE_COLUMNS]
+            for values in reader:
+                if not values:
+                    continue  # blank line, skipped as DictReader does
+                width = len(values)
+                yield ResponseRow(*(
+                    values[pos] if pos is not None and pos < width else ""
+                    for pos in positions
+                ))
 
-    def _evaluate_single_question(self, response_data: Dict[str, str]) -> Dict[str, Any]:
+    async def _evaluate_single_question(self, response_data: ResponseRow) -> Dict[str, Any]:
         """
         Evaluate a single question response.
         
         Args:
-            response_data: Dictionary with question and response data
+            response_data: Question and response data from the CSV
             
         Returns:
             Evaluation result dictionary
@@ -277,40 +523,147 @@ class ResponseEvaluationService:
         # Build evaluation prompt
         user_prompt = self._build_evaluation_prompt(response_data)
         
-        messages = [
-            {
-                "role": "user",
-                "content": [
-                    {"text": self.evaluation_prompt},
-                    {"text": user_prompt}
-                ]
-            }
-        ]
+        cached = self._cache_lookup(user_prompt)
+        if cached is not None:
+            return self._add_question_metadata(cached, response_data)
+        
+        # The rubric goes in a system message so the provider can cache the shared prefix
+        messages = [self._rubric_message, {"role": "user", "content": [{"text": user_prompt}]}]
         
         # Call LLM
         try:
-            result = self.agent_client.chat(messages)
+            result = await self._achat_with_retry(messages)
             response_text = result if isinstance(result, str) else result.get("text", "")
             
             # Parse JSON response
             evaluation = self._parse_evaluation_response(response_text)
+            self._cache_store(user_prompt, evaluation)
             
-            # Add question metadata
-            evaluation["question_number"] = int(response_data.get("question_number", 0))
-            evaluation["question"] = response_data.get("question", "")
-            evaluation["question_type"] = response_data.get("question_type", "")
-            
-            return evaluation
+            return self._add_question_metadata(evaluation, response_data)
             
         except Exception as e:
             raise ResponseEvaluationError(f"Failed to evaluate question: {e}")
 
-    def _build_evaluation_prompt(self, response_data: Dict[str, str]) -> str:
+    async def _evaluate_question_batch(self, batch: List[ResponseRow]) -> List[Dict[str, Any]]:
+        """
+        Evaluate several question responses with one LLM call.
+        
+        Args:
+            batch: Response rows to evaluate together
+            
+        Returns:
+            Evaluation result dictionaries, in batch order
+            
+        Raises:
+            ResponseEvaluationError: If the reply does not hold a valid evaluation for every question
+        """
+        # Only questions without a cached evaluation go to the LLM
+        user_prompts = [self._build_evaluation_prompt(r) for r in batch]
+        cached = [self._cache_lookup(p) for p in user_prompts]
+        pending = [r for r, c in zip(batch, cached) if c is None]
+        if len(pending) < len(batch):
+            fresh = iter(await self._evaluate_question_batch(pending) if pending else [])
+            return [
+                self._add_question_metadata(c, r) if c is not None else next(fresh)
+                for r, c in zip(batch, cached)
+            ]
+        
+        messages = [
+            self._rubric_message,
+            {"role": "user", "content": [{"text": self._build_batched_prompt(batch)}]}
+        ]
+        
+        result = await self._achat_with_retry(messages)
+        response_text = result if isinstance(result, str) else result.get("text", "")
+        
+        parsed = self._load_json(response_text)
+        items = parsed.get("evaluations") if isinstance(parsed, dict) else parsed
+        if not isinstance(items, list):
+            raise ResponseEvaluationError("Batched response has no evaluations array")
+        
+        # Questions are numbered 1..len(batch) in the prompt; map replies back by that number
+        by_number = {}
+        for item in items:
+            if isinstance(item, dict):
+                try:
+                    by_number[int(item.get("question_number"))] = item
+                except (TypeError, ValueError):
+                    continue
+        
+        evaluations = []
+        for number, response_data in enumerate(batch, start=1):
+            evaluation = by_number.get(number)
+            if evaluation is None:
+                raise ResponseEvaluationError(f"Batched response is missing question {number}")
+            self._validate_evaluation(evaluation)
+            evaluations.append(evaluation)
+        
+        for user_prompt, evaluation in zip(user_prompts, evaluations):
+            self._cache_store(user_prompt, evaluation)
+        return [self._add_question_metadata(e, r) for e, r in zip(evaluations, batch)]
+
+    def _cache_lookup(self, user_prompt: str) -> Optional[Dict[str, Any]]:
+        """Return a cached evaluation for this question prompt, if caching is enabled."""
+        if self.cache is None:
+            return None
+        return self.cache.get(ResponseCache.make_key(self.evaluation_prompt, user_prompt))
+
+    def _cache_store(self, user_prompt: str, evaluation: Dict[str, Any]) -> None:
+        """Remember a validated evaluation for this question prompt, if caching is enabled."""
+        if self.cache is not None:
+            self.cache.set(ResponseCache.make_key(self.evaluation_prompt, user_prompt), evaluation)
+
+    async def _achat_with_retry(self, messages: List[Dict[str, Any]]) -> Any:
+        """Call the LLM, retrying with backoff only when the provider throttles or times out."""
+        return await acall_with_retry(
+            self._achat_limited, messages, retry_on=(LlmRateLimit, LlmTimeout)
+        )
+
+    async def _achat_limited(self, messages: List[Dict[str, Any]]) -> Any:
+        """One LLM call, started only once the RPM and TPM budgets allow it (retries are charged too)."""
+        if self._rpm_limiter is not None:
+            await self._rpm_limiter.acquire()
+        if self._tpm_limiter is not None:
+            # ~4 characters per token is close enough for budgeting input size
+            chars = sum(len(part.get("text", "")) for m in messages for part in m["content"])
+            await self._tpm_limiter.acquire(chars // 4)
+        return await self.agent_client.achat(messages)
+
+    def _add_question_metadata(self, evaluation: Dict[str, Any], response_data: ResponseRow) -> Dict[str, Any]:
+        """Copy the question's number, text and type from the CSV row onto its evaluation."""
+        evaluation["question_number"] = int(response_data.question_number or 0)
+        evaluation["question"] = response_data.question
+        evaluation["question_type"] = response_data.question_type
+        return evaluation
+
+    def _build_evaluation_prompt(self, response_data: ResponseRow) -> str:
         """Build the evaluation prompt for a single question."""
-        question_type = response_data.get("question_type", "general")
-        question = response_data.get("question", "")
-        code_ref = response_data.get("code_reference", "")
-        transcript = response_data.get("transcript", "")
+        return self._build_question_block(response_data) + """
+---
+
+Evaluate this response and provide your assessment in JSON format as specified.
+"""
+
+    def _build_batched_prompt(self, batch: List[ResponseRow]) -> str:
+        """Build one prompt asking for an evaluation of each question in the batch."""
+        blocks = [
+            f"\n## Question {number}\n" + self._build_question_block(response_data)
+            for number, response_data in enumerate(batch, start=1)
+        ]
+        return "".join(blocks) + f"""
+---
+
+Evaluate each of the {len(batch)} responses above independently, using the same criteria as for a single response.
+Return ONLY a JSON object of the form {{"evaluations": [...]}} containing one evaluation per question,
+each in the JSON format specified and with an added "question_number" field (1 to {len(batch)}) matching the question heading.
+"""
+
+    def _build_question_block(self, response_data: ResponseRow) -> str:
+        """Format one question, its code reference and the student's answer."""
+        question_type = response_data.question_type or "general"
+        question = response_data.question
+        code_ref = response_data.code_reference
+        transcript = response_data.transcript
         
         prompt = f"""
 **Question Type:** {question_type}
@@ -330,40 +683,34 @@ class ResponseEvaluationService:
         prompt += f"""
 **Student's Answer (Transcribed):**
 {transcript}
-
----
-
-Evaluate this response and provide your assessment in JSON format as specified.
 """
         
         return prompt
 
     def _parse_evaluation_response(self, response_text: str) -> Dict[str, Any]:
         """Parse JSON evaluation from LLM response."""
-        # Try to find JSON in response
-        if "```json" in response_text:
-            start = response_text.find("```json") + 7
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        elif "```" in response_text:
-            start = response_text.find("```") + 3
-            end = response_text.find("```", start)
-            json_str = response_text[start:end].strip()
-        else:
-            json_str = response_text.strip()
+        evaluation = self._load_json(response_text)
+        self._validate_evaluation(evaluation)
+        return evaluation
+
+    def _load_json(self, response_text: str) -> Any:
+        """Parse the JSON payload of an LLM response, unwrapping a markdown code block if present."""
+        # Prefer a ```json block, else a bare ``` block, else the whole text
+        json_str = extract_json_block(response_text)
         
         try:
-            evaluation = json.loads(json_str)
-        except json.JSONDecodeError as e:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError as e:
             raise ResponseEvaluationError(f"Failed to parse JSON response: {e}\nResponse: {response_text[:500]}")
-        
-        # Validate required fields
+
+    def _validate_evaluation(self, evaluation: Any) -> None:
+        """Raise if an evaluation lacks any required field."""
+        if not isinstance(evaluation, dict):
+            raise ResponseEvaluationError(f"Expected JSON object, got: {type(evaluation)}")
         required_fields = ["correctness_score", "understanding_score", "total_score", "feedback"]
         for field in required_fields:
             if field not in evaluation:
                 raise ResponseEvaluationError(f"Missing required field: {field}")
-        
-        return evaluation
 
     def _calculate_grade(self, percentage: float) -> str:
         """Calculate letter grade from percentage."""
@@ -381,27 +728,42 @@ Evaluate this response and provide your assessment in JSON format as specified.
         output_dir: Path,
         student_name: str,
         evaluations: List[Dict[str, Any]],
-        responses: List[Dict[str, str]]
+        evaluated_at: Optional[datetime] = None
     ) -> Path:
         """Save detailed evaluation results as JSON."""
         filepath = output_dir / "evaluation.json"
         
         data = {
             "student_name": student_name,
-            "evaluation_date": datetime.now().isoformat(),
+            "evaluation_date": (evaluated_at or datetime.now()).isoformat(),
             "total_questions": len(evaluations),
             "evaluations": evaluations
         }
         
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        # orjson writes UTF-8 directly (the ensure_ascii=False equivalent)
+        with open(filepath, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
         
         return filepath
 
-    def _save_summary_csv(self, output_dir: Path, evaluations: List[Dict[str, Any]]) -> Path:
+    def _score_column(self, evaluations: List[Dict[str, Any]], field: str) -> np.ndarray:
+        """Collect one numeric field from every evaluation into a float64 array (missing = 0)."""
+        return np.fromiter((e.get(field, 0) for e in evaluations), dtype=np.float64, count=len(evaluations))
+
+    def _save_summary_csv(
+        self,
+        output_dir: Path,
+        evaluations: List[Dict[str, Any]],
+        scores: Optional[np.ndarray] = None
+    ) -> Path:
         """Save summary scores as CSV."""
         filepath = output_dir / "scores.csv"
         
+        # Percentage column in one vectorised step
+        if scores is None:
+            scores = self._score_column(evaluations, "total_score")
+        percentages = (scores * 10).round(1).tolist()
+        
         fieldnames = [
             'question_number', 'question_type', 'correctness_score', 
             'understanding_score', 'total_score', 'percentage', 'feedback_summary'
@@ -410,17 +772,18 @@ Evaluate this response and provide your assessment in JSON format as specified.
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.DictWriter(f, fieldnames=fieldnames)
             writer.writeheader()
-            
-            for eval_data in evaluations:
-                writer.writerow({
+            writer.writerows(
+                {
                     'question_number': eval_data.get('question_number', ''),
                     'question_type': eval_data.get('question_type', ''),
                     'correctness_score': eval_data.get('correctness_score', 0),
                     'understanding_score': eval_data.get('understanding_score', 0),
                     'total_score': eval_data.get('total_score', 0),
-                    'percentage': round(eval_data.get('total_score', 0) * 10, 1),
+                    'percentage': percentage,
                     'feedback_summary': eval_data.get('feedback', '')
-                })
+                }
+                for eval_data, percentage in zip(evaluations, percentages)
+            )
         
         return filepath
 
@@ -434,90 +797,61 @@ Evaluate this response and provide your assessment in JSON format as specified.
         percentage: float,
         grade: str,
         correctness_avg: float,
-        understanding_avg: float
+        understanding_avg: float,
+        evaluated_at: Optional[datetime] = None
     ) -> Path:
         """Save human-readable markdown report."""
         filepath = output_dir / "report.md"
         
+        parts: List[str] = [_REPORT_HEADER_TEMPLATE.format(
+            student_name=student_name,
+            date=(evaluated_at or datetime.now()).strftime('%Y-%m-%d %H:%M:%S'),
+            grade=grade,
+            percentage=percentage,
+            question_count=len(evaluations),
+            total_score=total_score,
+            max_score=max_score,
+            correctness_avg=correctness_avg,
+            understanding_avg=understanding_avg
+        )]
+        
+        # Question-by-question: one template fill per question
+        for eval_data in evaluations:
+            total = eval_data.get('total_score', 0)
+            feedback = eval_data.get('feedback', '')
+            parts.append(_REPORT_QUESTION_TEMPLATE.format(
+                q_num=eval_data.get('question_number', '?'),
+                q_type=eval_data.get('question_type', 'unknown').capitalize(),
+                question=eval_data.get('question', ''),
+                correctness=eval_data.get('correctness_score', 0),
+                understanding=eval_data.get('understanding_score', 0),
+                total=total,
+                total_pct=total * 10,
+                strengths=_bullet_section("Strengths", eval_data.get('strengths', [])),
+                weaknesses=_bullet_section("Areas for Improvement", eval_data.get('weaknesses', [])),
+                feedback=f"**Feedback:** {feedback}\n\n" if feedback else "",
+                suggestions=_bullet_section("Suggested Improvements", eval_data.get('suggested_improvements', []))
+            ))
+        
+        # Overall feedback
+        if percentage >= 80:
+            closing = "Excellent work! You demonstrated strong technical knowledge and clear understanding."
+        elif percentage >= 60:
+            closing = "Good job! You showed competent understanding with room for deepening your knowledge."
+        elif percentage >= 40:
+            closing = "Your responses show developing understanding. Focus on the suggested improvements."
+        else:
+            closing = "Your responses indicate areas needing significant improvement. Review the feedback carefully."
+        parts.append(_REPORT_FOOTER_TEMPLATE.format(
+            total_score=total_score,
+            max_score=max_score,
+            percentage=percentage,
+            grade=grade,
+            closing=closing
+        ))
+        
         with open(filepath, 'w', encoding='utf-8') as f:
-            # Header
-            f.write(f"# Oral Exam Evaluation Report\n\n")
-            f.write(f"**Student:** {student_name}\n\n")
-            f.write(f"**Date:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n")
-            f.write(f"**Overall Grade:** {grade} ({percentage:.1f}%)\n\n")
-            f.write("---\n\n")
-            
-            # Summary
-            f.write("## Summary\n\n")
-            f.write(f"- **Total Questions:** {len(evaluations)}\n")
-            f.write(f"- **Total Score:** {total_score:.1f}/{max_score}\n")
-            f.write(f"- **Percentage:** {percentage:.1f}%\n")
-            f.write(f"- **Average Correctness:** {correctness_avg:.2f}/5\n")
-            f.write(f"- **Average Understanding:** {understanding_avg:.2f}/5\n\n")
-            f.write("---\n\n")
-            
-            # Question-by-question
-            f.write("## Question-by-Question Results\n\n")
-            
-            for eval_data in evaluations:
-                q_num = eval_data.get('question_number', '?')
-                q_type = eval_data.get('question_type', 'unknown')
-                question = eval_data.get('question', '')
-                correctness = eval_data.get('correctness_score', 0)
-                understanding = eval_data.get('understanding_score', 0)
-                total = eval_data.get('total_score', 0)
-                
-                f.write(f"### Question {q_num} ({q_type.capitalize()}) - {total}/10 ({total * 10}%)\n\n")
-                f.write(f"**Question:** {question}\n\n")
-                f.write(f"**Score Breakdown:**\n")
-                f.write(f"- Correctness: {correctness}/5\n")
-                f.write(f"- Understanding: {understanding}/5\n")
-                f.write(f"- **Total: {total}/10**\n\n")
-                
-                # Strengths
-                strengths = eval_data.get('strengths', [])
-                if strengths:
-                    f.write("**Strengths:**\n")
-                    for strength in strengths:
-                        f.write(f"- {strength}\n")
-                    f.write("\n")
-                
-                # Weaknesses
-                weaknesses = eval_data.get('weaknesses', [])
-                if weaknesses:
-                    f.write("**Areas for Improvement:**\n")
-                    for weakness in weaknesses:
-                        f.write(f"- {weakness}\n")
-                    f.write("\n")
-                
-                # Feedback
-                feedback = eval_data.get('feedback', '')
-                if feedback:
-                    f.write(f"**Feedback:** {feedback}\n\n")
-                
-                # Suggestions
-                suggestions = eval_data.get('suggested_improvements', [])
-                if suggestions:
-                    f.write("**Suggested Improvements:**\n")
-                    for suggestion in suggestions:
-                        f.write(f"- {suggestion}\n")
-                    f.write("\n")
-                
-                f.write("---\n\n")
-            
-            # Overall feedback
-            f.write("## Overall Performance\n\n")
-            f.write(f"You scored {total_score:.1f} out of {max_score} points ({percentage:.1f}%), ")
-            f.write(f"earning a grade of **{grade}**.\n\n")
-            
-            if percentage >= 80:
-                f.write("Excellent work! You demonstrated strong technical knowledge and clear understanding.\n")
-            elif percentage >= 60:
-                f.write("Good job! You showed competent understanding with room for deepening your knowledge.\n")
-            elif percentage >= 40:
-                f.write("Your responses show developing understanding. Focus on the suggested improvements.\n")
-            else:
-                f.write("Your responses indicate areas needing significant improvement. Review the feedback carefully.\n")
+            f.write("".join(parts))
         
         return filepath
 
@@ -0,0 +1,133 @@
+"""
+SemanticCache.py
+In-process cache of chat answers keyed by query embedding.
+- Exact repeats (after whitespace/case normalisation) hit a dict lookup
+- Near-duplicates hit when cosine similarity to a cached query >= threshold,
+  scored with one matrix-vector product outside the lock
+- Bounded LRU with a TTL so stale course material answers age out
+"""
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+import threading
+import time
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class SemanticCache:
+    """
+    LRU cache of answers, looked up by normalised query text then by embedding.
+
+    Entries are partitioned by namespace (e.g. pedagogy mode) so the same
+    question asked in different teaching modes never shares an answer.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        threshold: float = 0.95,
+        ttl_seconds: Optional[float] = 3600,
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_entries: Maximum cached answers before evicting least recently used
+            threshold: Minimum cosine similarity for a near-duplicate hit
+            ttl_seconds: Seconds before an entry expires (None = never)
+        """
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        # (namespace, normalised query) -> (unit embedding, payload, stored_at)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[np.ndarray, Dict[str, Any], float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        logger.info(f"SemanticCache initialized with max_entries={max_entries}, threshold={threshold}")
+
+    def check(self, query: str, embedding: List[float], namespace: str = "") -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached answer for the query.
+
+        Args:
+            query: User's question
+            embedding: Embedding of the question
+            namespace: Partition to search (e.g. pedagogy mode)
+
+        Returns:
+            Cached payload dict, or None on a miss
+        """
+        key = (namespace, self._normalise(query))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and not self._expired(entry[2], now):
+                self._entries.move_to_end(key)
+                logger.debug(f"Semantic cache exact hit for '{query[:50]}'")
+                return entry[1]
+
+            # Only the candidate list is built under the lock; scoring happens outside it
+            unit = self._unit(embedding)
+            candidates = [
+                (cached_key, cached_unit, payload)
+                for cached_key, (cached_unit, payload, stored_at) in self._entries.items()
+                if cached_key[0] == namespace
+                and len(cached_unit) == len(unit)
+                and not self._expired(stored_at, now)
+            ]
+
+        if not candidates:
+            return None
+        scores = np.stack([c[1] for c in candidates]) @ unit
+        # Last maximum, so ties go to the most recently used entry
+        best = len(scores) - 1 - int(np.argmax(scores[::-1]))
+        if scores[best] < self.threshold:
+            return None
+
+        best_key, _, payload = candidates[best]
+        with self._lock:
+            if best_key in self._entries:
+                self._entries.move_to_end(best_key)
+        logger.debug(f"Semantic cache hit for '{query[:50]}' (similarity={scores[best]:.3f})")
+        return payload
+
+    def store(self, query: str, embedding: List[float], payload: Dict[str, Any], namespace: str = "") -> None:
+        """
+        Cache an answer for the query.
+
+        Args:
+            query: User's question
+            embedding: Embedding of the question
+            payload: Data returned on later hits (answer, context_ids, model_id)
+            namespace: Partition to store under (e.g. pedagogy mode)
+        """
+        key = (namespace, self._normalise(query))
+        with self._lock:
+            self._entries[key] = (self._unit(embedding), payload, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop all cached answers (e.g. after course material changes)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now - stored_at > self.ttl_seconds
+
+    @staticmethod
+    def _normalise(query: str) -> str:
+        return " ".join(query.lower().split())
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> np.ndarray:
+        """Scale to unit length so similarity is a plain dot product."""
+        unit = np.asarray(embedding, dtype=np.float64)
+        norm = np.linalg.norm(unit)
+        return unit / norm if norm else unit
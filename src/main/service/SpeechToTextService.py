@@ -11,13 +11,28 @@ Usage:
     svc = DeepgramTranscribeService()
     text = svc.transcribe("/path/to/audio.wav", language="en-US")
 """
+from pathlib import Path
 from typing import Optional
+import asyncio
 import os
-import json
 import requests
+import orjson
+
+from src.main.utils.Retry import RETRYABLE_STATUSES, call_with_retry, parse_retry_after
 
 # removed openai import and Whisper class; we now use Deepgram for ASR
-import boto3
+from src.main.agentcore_setup.bedrock_client import get_bedrock_client
+
+# Uploads up to this size are read into memory in one call; larger files are streamed
+SMALL_AUDIO_BYTES = 8 * 1024 * 1024
+
+
+class DeepgramTransientError(Exception):
+    """A Deepgram failure worth retrying (429/5xx or a dropped connection)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class DeepgramTranscribeService:
@@ -26,6 +41,7 @@ class DeepgramTranscribeService:
 
     - Reads DEEPGRAM_SECRET_KEY from environment by default (or accept api_key in constructor).
     - Performs a simple POST of the binary audio to Deepgram's /v1/listen endpoint and returns the transcript string.
+    - Keeps one HTTP session, so repeat transcriptions reuse the open TLS connection.
 
     Usage:
         svc = DeepgramTranscribeService()
@@ -45,6 +61,9 @@ class DeepgramTranscribeService:
         self.base_url = base_url
         self.model = model
         self.timeout = timeout
+        # Persistent keep-alive connection pool; saves a TCP+TLS handshake per request
+        self._session = requests.Session()
+        self._session.headers["Authorization"] = f"Token {self.api_key}"
 
     def transcribe(self, audio_path: str, language: Optional[str] = None) -> str:
         """
@@ -64,16 +83,20 @@ class DeepgramTranscribeService:
         if language:
             params["language"] = language
 
+        size = os.path.getsize(audio_path)
         headers = {
-            "Authorization": f"Token {self.api_key}",
-            # Let requests set content-length; Deepgram accepts application/octet-stream for raw bytes
+            # Deepgram accepts application/octet-stream for raw bytes
             "Content-Type": "application/octet-stream",
+            # Explicit length: large files are streamed in blocks, never buffered whole or chunk-encoded
+            "Content-Length": str(size),
         }
+        # Short answers (the common case) are read once and re-sent as-is on retry
+        payload = Path(audio_path).read_bytes() if size <= SMALL_AUDIO_BYTES else None
 
         try:
-            with open(audio_path, "rb") as f:
-                resp = requests.post(self.base_url, params=params, headers=headers, data=f, timeout=self.timeout)
-                resp.raise_for_status()
+            resp = call_with_retry(
+                self._post_audio, audio_path, params, headers, payload, retry_on=(DeepgramTransientError,)
+            )
         except Exception as e:
             raise Exception(f"Deepgram request failed: {e}") from e
 
@@ -99,10 +122,43 @@ class DeepgramTranscribeService:
                 return transcripts[0].get("transcript", "") or ""
 
             # As a last resort, stringify the JSON response
-            return json.dumps(data)
+            return orjson.dumps(data).decode("utf-8")
         except Exception as e:
             raise Exception(f"Failed to parse Deepgram response: {e}") from e
 
+    def _post_audio(
+        self, audio_path: str, params: dict, headers: dict, payload: Optional[bytes] = None
+    ) -> requests.Response:
+        """
+        One upload attempt. Posts ``payload`` when the file was read up front,
+        otherwise streams the file. Rate limits, 5xx and connection drops raise
+        DeepgramTransientError (with any Retry-After) so the caller can retry;
+        other HTTP errors raise immediately.
+        """
+        try:
+            if payload is not None:
+                resp = self._session.post(self.base_url, params=params, headers=headers, data=payload, timeout=self.timeout)
+            else:
+                # Reopened per attempt so a retry streams the file from the start
+                with open(audio_path, "rb") as f:
+                    resp = self._session.post(self.base_url, params=params, headers=headers, data=f, timeout=self.timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            raise DeepgramTransientError(str(e)) from e
+        if resp.status_code in RETRYABLE_STATUSES:
+            raise DeepgramTransientError(
+                f"HTTP {resp.status_code}: {resp.text[:200]}",
+                retry_after=parse_retry_after(resp.headers.get("Retry-After")),
+            )
+        resp.raise_for_status()
+        return resp
+
+    async def atranscribe(self, audio_path: str, language: Optional[str] = None) -> str:
+        """
+        Async variant of transcribe; runs the blocking upload in a worker thread
+        so the event loop keeps serving (and several files can be gathered).
+        """
+        return await asyncio.to_thread(self.transcribe, audio_path, language)
+
 
 class BedrockPostProcessor:
     """
@@ -128,8 +184,8 @@ class BedrockPostProcessor:
             raise EnvironmentError("BEDROCK_MODEL_CHAT not set in env and no model_id provided")
 
         self.region = region or os.getenv("AWS_DEFAULT_REGION") or os.getenv("AWS_REGION")
-        # create a bedrock-runtime client; some SDKs call this 'bedrock-runtime' or 'bedrock'
-        self.client = client or boto3.client("bedrock-runtime", region_name=self.region)
+        # shared bedrock-runtime client, built once per region and pooled across instances
+        self.client = client or get_bedrock_client(self.region)
 
     def process(self, transcript: str, instructions: Optional[str] = None, max_tokens: int = 2048) -> str:
         """
@@ -164,7 +220,7 @@ Transcript:
                 modelId=self.model_id,
                 contentType="application/json",
                 accept="application/json",
-                body=json.dumps(payload).encode("utf-8"),
+                body=orjson.dumps(payload),
             )
         except Exception as e:
             raise Exception(f"Bedrock invoke_model failed: {e}") from e
@@ -176,12 +232,11 @@ Transcript:
                 raw = body.read()
             else:
                 raw = body
-            if isinstance(raw, bytes):
-                raw = raw.decode("utf-8")
 
             # Try to parse JSON first; many model containers return JSON with 'output' or similar.
+            # orjson parses the bytes directly, so JSON bodies are not decoded to str first.
             try:
-                parsed = json.loads(raw)
+                parsed = orjson.loads(raw)
                 # Common shapes vary by model; attempt common fallbacks
                 if isinstance(parsed, dict):
                     # look for 'output' or 'generated_text' or 'results' keys
@@ -192,11 +247,11 @@ Transcript:
                                 return "\n".join(map(str, val))
                             return str(val)
                     # fallback to joining stringified values
-                    return json.dumps(parsed)
+                    return orjson.dumps(parsed).decode("utf-8")
                 return str(parsed)
             except ValueError:
                 # Not JSON; return raw text
-                return str(raw)
+                return raw.decode("utf-8") if isinstance(raw, bytes) else str(raw)
         except Exception as e:
             raise Exception(f"Failed to read Bedrock response body: {e}") from e
 
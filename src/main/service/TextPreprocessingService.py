@@ -1,13 +1,83 @@
 # src/main/service/MarkdownService.py
 from __future__ import annotations
 
+import asyncio
 import json
 import os
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
 from pathlib import Path
-
-from src.main.llm.AgentCoreProvider import AgentCoreProvider
+from collections.abc import Iterator as IteratorABC
+from typing import Any, Iterable, Iterator, Protocol, Union
 
 from ..utils.ReadPrompt import read_prompt
+from ..utils.ResponseCache import ResponseCache
+
+_WORD_RE = re.compile(r"\S+")
+# Same on UTF-8 bytes; ASCII whitespace never occurs inside a multi-byte character
+_WORD_BYTES_RE = re.compile(rb"\S+")
+
+
+class ChatModel(Protocol):
+    """What this service needs from its LLM: a full reply, or an iterator of text deltas."""
+
+    def chat(self, messages: list[dict[str, Any]], **kwargs: Any) -> Union[str, Iterator[str]]: ...
+
+    async def achat(self, messages: list[dict[str, Any]], **kwargs: Any) -> str: ...
+
+
+@dataclass(frozen=True, slots=True)
+class _Config:
+    """Environment settings, read once instead of on every request."""
+
+    max_input_chars: int
+    max_input_bytes: int  # 0 = no byte budget
+    max_concurrency: int
+    cache_size: int
+
+
+@lru_cache(maxsize=1)
+def _load_config() -> _Config:
+    """Parse the env once; a malformed value fails here instead of mid-request. Tests use cache_clear()."""
+    return _Config(
+        max_input_chars=int(os.getenv("BEDROCK_MAX_INPUT_CHARS", "2048")),
+        max_input_bytes=int(os.getenv("BEDROCK_MAX_INPUT_BYTES", "0") or 0),
+        max_concurrency=int(os.getenv("BEDROCK_MAX_CONCURRENCY", "5")),
+        cache_size=int(os.getenv("PREPROCESS_CACHE_SIZE", "256")),
+    )
+
+
+@lru_cache(maxsize=8)
+def _header_for(instructions: str) -> tuple[str, int]:
+    """Header/preamble sent ahead of the input, and its UTF-8 length."""
+    header = f"{instructions.strip()}\n\n"
+    return header, len(header.encode("utf-8"))
+
+
+@dataclass(slots=True)
+class _MarkdownPlan:
+    """How one input is sent: in a single call (spans is None) or as chunk spans of `source`."""
+
+    header: str
+    system_message: dict[str, Any]
+    source: str | bytes
+    spans: list[tuple[int, int]] | None
+
+    def messages(self, user_text: str) -> list[dict[str, Any]]:
+        return [self.system_message, {"role": "user", "content": [{"text": user_text}]}]
+
+    def chunk_prompt(self, idx: int) -> str:
+        """User text for chunk `idx` (1-based), with a marker to help model consistency."""
+        start, end = self.spans[idx - 1]
+        body = self.source[start:end]
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        return f"[Chunk {idx}/{len(self.spans)}]\n" + body
+
 
 class TextPreprocessingService:
     def __init__(
@@ -15,97 +85,267 @@ class TextPreprocessingService:
         region: str | None = None,
         model_id: str | None = None,
         prompt_path: str | None = None,
+        max_concurrency: int | None = None,  # parallel chat calls when the input is chunked
+        cache_size: int | None = None,  # remembered prompt -> markdown results (0 disables)
     ) -> None:
         self.region = region or os.getenv("AWS_REGION", "ap-southeast-2")
         self.model_id = model_id or os.getenv("CHAT_MODEL", "amazon.nova-lite-v1:0")
         self.prompt_path = Path(prompt_path or os.getenv("PROMPT_MD", "prompts/vector_store_prompt.md")).resolve()
-        self.llm = AgentCoreProvider()
+        # Kept small so a long document does not trip Bedrock throttling
+        self._cfg = _load_config()
+        self.max_concurrency = max_concurrency or self._cfg.max_concurrency
+        # Identical prompts (re-runs, repeated boilerplate chunks) reuse the earlier output
+        self.cache_size = cache_size if cache_size is not None else self._cfg.cache_size
+        self._cache: OrderedDict[bytes, str] = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def get_default(
+        cls,
+        region: str | None = None,
+        model_id: str | None = None,
+        prompt_path: str | None = None,
+    ) -> "TextPreprocessingService":
+        """
+        Process-wide instance for these settings, so callers share one provider,
+        output memo and Bedrock connection pool. Safe to use from several threads:
+        the memo is locked and the provider keeps no per-call state.
+        """
+        return _default_service(cls, region, model_id, str(prompt_path) if prompt_path else None)
+
+    @cached_property
+    def llm(self) -> ChatModel:
+        """LLM provider, built on first use so boto3 loads only when needed."""
+        from src.main.llm.AgentCoreProvider import AgentCoreProvider
+        return AgentCoreProvider()
 
     def _split_text_into_chunks(self, header: str, text: str, max_chars: int) -> list[str]:
         """Split `text` into chunks so that header + chunk length <= max_chars.
 
-        Splitting is word-based (greedy). Returns list of chunk strings.
+        Splitting is word-based (greedy) and never breaks inside a word; each chunk is
+        a slice of `text`, so its original whitespace is kept. Returns list of chunk strings.
+        """
+        return [text[a:b] for a, b in self._chunk_spans(len(header), text, max_chars)]
+
+    def _chunk_spans(self, header_len: int, text: str | bytes, max_len: int) -> list[tuple[int, int]]:
+        """
+        (start, end) offsets of each chunk in `text`; see _split_text_into_chunks.
+        Lengths are in the units of `text`: characters for str, UTF-8 bytes for bytes.
         """
-        # Compute available chars per chunk for the text body
+        # Compute available length per chunk for the text body
         tail_reserved = 64  # small buffer for any trailing characters
-        available = max_chars - len(header) - tail_reserved
+        available = max_len - header_len - tail_reserved
         if available <= 100:
             # header too large; fall back to a conservative chunk size
-            available = max(256, max_chars - 200)
-
-        words = text.split()
-        chunks: list[str] = []
-        cur_words: list[str] = []
-        cur_len = 0
-        for w in words:
-            wlen = len(w) + 1
-            if cur_len + wlen > available and cur_words:
-                chunks.append(" ".join(cur_words))
-                cur_words = [w]
-                cur_len = wlen
-            else:
-                cur_words.append(w)
-                cur_len += wlen
-        if cur_words:
-            chunks.append(" ".join(cur_words))
-        return chunks
+            available = max(256, max_len - 200)
+
+        # Walk word offsets only; chunk strings are sliced when they are sent
+        spans: list[tuple[int, int]] = []
+        chunk_start = last_end = -1
+        word_re = _WORD_BYTES_RE if isinstance(text, bytes) else _WORD_RE
+        for m in word_re.finditer(text):
+            if chunk_start < 0:
+                chunk_start = m.start()
+            elif m.end() - chunk_start > available:
+                spans.append((chunk_start, last_end))
+                chunk_start = m.start()
+            last_end = m.end()
+        if chunk_start >= 0:
+            spans.append((chunk_start, last_end))
+        return spans
+
+    def _cache_key(self, kwargs: dict[str, Any], *prompt_parts: str) -> bytes:
+        options = repr(sorted((k, v) for k, v in kwargs.items() if k != "stream"))
+        return ResponseCache.make_key(self.model_id, options, *prompt_parts)
+
+    def _cache_get(self, key: bytes) -> str | None:
+        with self._cache_lock:
+            output = self._cache.get(key)
+            if output is not None:
+                self._cache.move_to_end(key)
+            return output
+
+    def _cache_put(self, key: bytes, output: str) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = output
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
 
     def preprocess_to_markdown(self, text: str, **kwargs) -> str:
         """
         Apply your prompt (from prompt.md) to the input text via Bedrock Nova Chat,
         returning the model's markdown output as a string.
 
-        If the assembled prompt exceeds BEDROCK_MAX_INPUT_CHARS, the text is split into
-        multiple chunks; each chunk is sent in a separate chat call and the responses are concatenated.
+        The single-call case makes one non-streaming chat call; oversized input is
+        chunked as described in stream_markdown().
+        """
+        return "".join(self._markdown_parts(text, False, kwargs))
+
+    def stream_markdown(self, text: str, **kwargs) -> Iterator[str]:
         """
-        instructions = read_prompt(prompt_path=self.prompt_path)
-        # Build header/preamble that will be prepended to each chunk
-        header = f"{instructions.strip()}\n\n"
-
-        # Determine max characters allowed for input; default 2048
-        try:
-            max_input_chars = int(os.getenv("BEDROCK_MAX_INPUT_CHARS", "2048"))
-        except Exception:
-            max_input_chars = 2048
-
-        assembled = header + text
-        # If assembled prompt fits, do single call
-        if len(assembled) <= max_input_chars:
-            prompt = assembled
-            result = self.llm.chat([
-                {"role": "user", "content": [{"text": prompt}]}
-            ], **kwargs)
+        Apply your prompt to the input text and yield the markdown as it is generated.
+
+        If the prompt fits BEDROCK_MAX_INPUT_CHARS (or BEDROCK_MAX_INPUT_BYTES, when set,
+        counted in UTF-8 bytes), the model's text deltas
+        are yielded as they arrive. Otherwise the text is split into chunks that are
+        sent in concurrent chat calls (up to max_concurrency); each chunk's response is
+        yielded, in chunk order and separated by "---", as soon as it and all earlier
+        chunks are done.
+        """
+        return self._markdown_parts(text, True, kwargs)
+
+    def _markdown_parts(self, text: str, stream: bool, kwargs: dict[str, Any]) -> Iterator[str]:
+        """Yield the markdown for `text`; only the single-call case streams, and only when asked."""
+        plan = self._plan(text)
+
+        # If the whole prompt fits, do a single call
+        if plan.spans is None:
+            key = self._cache_key(kwargs, plan.header, text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                yield cached
+                return
+            result = self.llm.chat(plan.messages(text), **({"stream": True, **kwargs} if stream else kwargs))
             if isinstance(result, str):
-                return result
-            elif hasattr(result, '__iter__') and not isinstance(result, str):
-                return "".join(chunk for chunk in result)
+                parts = [result]
+                yield result
+            elif isinstance(result, IteratorABC):
+                parts = []
+                for delta in result:
+                    parts.append(delta)
+                    yield delta
             else:
                 raise TypeError(f"Unexpected chat return type: {type(result)}")
+            # Only a fully consumed stream is cached
+            self._cache_put(key, "".join(parts))
+            return
 
-        # Otherwise split text into chunks and call the model for each chunk
-        chunks = self._split_text_into_chunks(header, text, max_input_chars)
-        outputs: list[str] = []
-        total = len(chunks)
-        # Iterate and call llm.chat for each chunk
-        for idx, chunk_body in enumerate(chunks, start=1):
-            # include a small chunk marker to help model consistency
-            chunk_prompt = header + f"[Chunk {idx}/{total}]\n" + chunk_body
+        total = len(plan.spans)
+
+        def run_chunk(idx: int) -> str:
+            chunk_prompt = plan.chunk_prompt(idx)
+            key = self._cache_key(kwargs, plan.header, chunk_prompt)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
             try:
-                resp = self.llm.chat([
-                    {"role": "user", "content": [{"text": chunk_prompt}]}
-                ], **kwargs)
+                resp = self.llm.chat(plan.messages(chunk_prompt), **kwargs)
             except Exception as e:
                 # If one chunk fails, raise with context
                 raise RuntimeError(f"LLM chat failed on chunk {idx}/{total}: {e}") from e
 
             if isinstance(resp, str):
-                outputs.append(resp)
-            elif hasattr(resp, '__iter__') and not isinstance(resp, str):
-                outputs.append("".join(chunk for chunk in resp))
+                output = resp
+            elif isinstance(resp, IteratorABC):
+                output = "".join(resp)
             else:
                 raise TypeError(f"Unexpected chat return type on chunk {idx}: {type(resp)}")
+            self._cache_put(key, output)
+            return output
+
+        indices = range(1, total + 1)
+        if total <= 1 or self.max_concurrency <= 1:
+            yield from self._join_chunks(map(run_chunk, indices))
+        else:
+            workers = min(self.max_concurrency, total)
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                yield from self._join_chunks(self._ordered_results(ex, run_chunk, indices, 2 * workers))
+
+    async def apreprocess_to_markdown(self, text: str, **kwargs) -> str:
+        """
+        Async variant of preprocess_to_markdown for callers on an event loop.
+
+        Chunks fan out with asyncio.gather, at most max_concurrency at a time, and
+        the joined output matches the sync method.
+        """
+        plan = self._plan(text)
+
+        if plan.spans is None:
+            key = self._cache_key(kwargs, plan.header, text)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+            output = await self.llm.achat(plan.messages(text), **kwargs)
+            self._cache_put(key, output)
+            return output
+
+        total = len(plan.spans)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def run_chunk(idx: int) -> str:
+            chunk_prompt = plan.chunk_prompt(idx)
+            key = self._cache_key(kwargs, plan.header, chunk_prompt)
+            cached = self._cache_get(key)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                try:
+                    output = await self.llm.achat(plan.messages(chunk_prompt), **kwargs)
+                except Exception as e:
+                    raise RuntimeError(f"LLM chat failed on chunk {idx}/{total}: {e}") from e
+            if not isinstance(output, str):
+                raise TypeError(f"Unexpected chat return type on chunk {idx}: {type(output)}")
+            self._cache_put(key, output)
+            return output
+
+        outputs = await asyncio.gather(*(run_chunk(idx) for idx in range(1, total + 1)))
+        return "".join(self._join_chunks(outputs))
+
+    def _plan(self, text: str) -> _MarkdownPlan:
+        """Load the instructions and decide between one call and chunk spans for `text`."""
+        # read_prompt returns the same cached str until the file changes, so this is a lookup
+        header, header_bytes = _header_for(read_prompt(prompt_path=self.prompt_path))
+
+        # Optional UTF-8 byte budget, for backends that measure input in bytes;
+        # ASCII text is one byte per char, so only non-ASCII input is encoded
+        cfg = self._cfg
+        if cfg.max_input_bytes > 0:
+            limit, header_len = cfg.max_input_bytes, header_bytes
+            # At most 4 UTF-8 bytes per char, so short text can skip the encode too
+            fits_any_encoding = header_len + 4 * len(text) <= limit
+            source: str | bytes = text if fits_any_encoding or text.isascii() else text.encode("utf-8")
+        else:
+            limit, header_len, source = cfg.max_input_chars, len(header), text
+
+        # Only the offsets are computed up front (the markers need the total);
+        # each chunk's prompt is built when it is sent.
+        spans = None if header_len + len(source) <= limit else self._chunk_spans(header_len, source, limit)
+        return _MarkdownPlan(
+            header=header,
+            # The instructions travel as one shared system message rather than being
+            # copied into every chunk's prompt; Bedrock can cache that common prefix
+            system_message={"role": "system", "content": [{"text": header}]},
+            source=source,
+            spans=spans,
+        )
+
+    @staticmethod
+    def _ordered_results(ex: ThreadPoolExecutor, fn, items: Iterable[Any], window: int) -> Iterator[Any]:
+        """
+        Yield fn(item) for each item in order, with at most `window` calls submitted
+        but not yet consumed, so pending prompts and outputs stay bounded.
+        A failure is raised when its result is reached, as with Executor.map.
+        """
+        pending: deque = deque()
+        for item in items:
+            pending.append(ex.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    @staticmethod
+    def _join_chunks(outputs: Iterable[str]) -> Iterator[str]:
+        """Yield chunk outputs with separators between them to preserve boundaries."""
+        for i, output in enumerate(outputs):
+            if i:
+                yield "\n\n---\n\n"
+            yield output
 
-        # Concatenate chunk outputs with separators to preserve boundaries
-        joined = "\n\n---\n\n".join(outputs)
-        return joined
 
+@lru_cache(maxsize=None)
+def _default_service(cls, region, model_id, prompt_path) -> TextPreprocessingService:
+    return cls(region=region, model_id=model_id, prompt_path=prompt_path)
@@ -0,0 +1,28 @@
+"""
+ExtractJson.py
+Pull the JSON payload out of an LLM reply that may wrap it in markdown code fences.
+- A ```json fence (any case) wins wherever it appears
+- Otherwise the first fence without a language tag, else the whole reply
+"""
+import re
+
+# Fences pair up in order: finditer resumes after each closing ```, so a closing
+# fence is never mistaken for an opening one. An unclosed fence runs to the end.
+_FENCE_RE = re.compile(r"```([\w+-]*)(.*?)(?:```|\Z)", re.S)
+
+
+def extract_json_block(text: str) -> str:
+    """
+    Return the text of the JSON payload in an LLM reply, stripped.
+
+    Replies often quote code (e.g. a ```python block) before the JSON, so a
+    fence tagged json is preferred over an earlier untagged or other-language one.
+    """
+    bare = None
+    for m in _FENCE_RE.finditer(text):
+        lang = m.group(1).lower()
+        if lang == "json":
+            return m.group(2).strip()
+        if not lang and bare is None:
+            bare = m.group(2)
+    return (bare if bare is not None else text).strip()
@@ -0,0 +1,124 @@
+"""
+RateLimiter.py
+Client-side throttling for calls to the LLM provider.
+- Sliding 60s window of call start times, as providers count requests per minute
+- Token bucket for per-minute token budgets (TPM), refilled continuously
+- Callers reserve a slot up front, so concurrent waiters never overshoot the limit
+- Async acquire() for the event loop, acquire_blocking() for worker threads
+"""
+from collections import deque
+from typing import Deque
+import asyncio
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class SlidingWindowRateLimiter:
+    """
+    Allow at most ``max_calls`` call starts in any ``period`` seconds.
+
+    Each acquire reserves the earliest start time that keeps the window under
+    the limit and then waits until it arrives, so bursts are spread out
+    instead of being rejected by the provider with 429s.
+    """
+
+    def __init__(self, max_calls: int, period: float = 60.0):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            max_calls: Maximum call starts allowed per window
+            period: Window length in seconds
+        """
+        if max_calls < 1:
+            raise ValueError("max_calls must be at least 1")
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.max_calls = max_calls
+        self.period = period
+        # Reserved start times (monotonic), oldest first
+        self._calls: Deque[float] = deque()
+        self._lock = threading.Lock()
+
+    async def acquire(self) -> None:
+        """Wait on the event loop until a call may start."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug("Rate limit reached, delaying LLM call by %.2fs", delay)
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self) -> None:
+        """Block the current thread until a call may start."""
+        delay = self._reserve()
+        if delay > 0:
+            logger.debug("Rate limit reached, delaying LLM call by %.2fs", delay)
+            time.sleep(delay)
+
+    def _reserve(self) -> float:
+        """Reserve the next free start time and return seconds until it."""
+        with self._lock:
+            now = time.monotonic()
+            while self._calls and self._calls[0] <= now - self.period:
+                self._calls.popleft()
+            start = now
+            if len(self._calls) >= self.max_calls:
+                # The call max_calls back must have left the window first
+                start = max(now, self._calls[-self.max_calls] + self.period)
+            self._calls.append(start)
+            return start - now
+
+
+class TokenBucketRateLimiter:
+    """
+    Allow at most ``capacity`` units (e.g. prompt tokens) per ``period`` seconds.
+
+    The bucket refills continuously. A request for more units than are
+    available reserves them anyway (the balance goes negative) and waits for
+    the refill, so concurrent waiters queue in arrival order rather than racing.
+    """
+
+    def __init__(self, capacity: int, period: float = 60.0):
+        """
+        Initialize the token bucket, starting full.
+
+        Args:
+            capacity: Units allowed per window (also the largest burst)
+            period: Window length in seconds
+        """
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if period <= 0:
+            raise ValueError("period must be positive")
+        self.capacity = capacity
+        self.period = period
+        self._rate = capacity / period
+        self._available = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, amount: int = 1) -> None:
+        """Wait on the event loop until ``amount`` units may be spent."""
+        delay = self._reserve(amount)
+        if delay > 0:
+            logger.debug("Token budget reached, delaying LLM call by %.2fs", delay)
+            await asyncio.sleep(delay)
+
+    def acquire_blocking(self, amount: int = 1) -> None:
+        """Block the current thread until ``amount`` units may be spent."""
+        delay = self._reserve(amount)
+        if delay > 0:
+            logger.debug("Token budget reached, delaying LLM call by %.2fs", delay)
+            time.sleep(delay)
+
+    def _reserve(self, amount: int) -> float:
+        """Take ``amount`` units (capped at capacity) and return seconds until they are covered."""
+        amount = min(max(amount, 0), self.capacity)
+        with self._lock:
+            now = time.monotonic()
+            self._available = min(self.capacity, self._available + (now - self._updated) * self._rate)
+            self._updated = now
+            self._available -= amount
+            return -self._available / self._rate if self._available < 0 else 0.0
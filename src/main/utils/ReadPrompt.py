@@ -1,23 +1,54 @@
+import os
+from functools import lru_cache
 from pathlib import Path
 
+# Fixed fallback location, resolved once rather than on every lookup
+_REPO_PROMPTS_DIR = str(Path(__file__).resolve().parents[3] / "prompts")
+
+
+@lru_cache(maxsize=16)
+def _read_cached(path_str: str, mtime_ns: int) -> str:
+    """Read a prompt file; the mtime in the key makes an edited file a cache miss."""
+    return Path(path_str).read_text(encoding="utf-8")
+
+
+@lru_cache(maxsize=64)
+def _resolve(abs_path: str, cwd: str) -> Path:
+    """
+    Find the prompt file: as given, then under ./prompts, then under the repo's prompts/.
+    Keyed by the absolute path and working directory, so a chdir cannot reuse a stale answer.
+    """
+    if os.path.isfile(abs_path):
+        return Path(abs_path)
+    name = os.path.basename(abs_path)
+    for base in (os.path.join(cwd, "prompts"), _REPO_PROMPTS_DIR):
+        candidate = os.path.join(base, name)
+        if os.path.isfile(candidate):
+            return Path(candidate)
+    raise FileNotFoundError(
+        f"Prompt file not found. Looked at: {abs_path}"
+    )
+
+
+def clear_prompt_cache() -> None:
+    """Forget resolved locations and cached contents (e.g. after moving prompt files)."""
+    _resolve.cache_clear()
+    _read_cached.cache_clear()
+
+
 def read_prompt(prompt_path) -> str:
     """
     Loads prompt text from the specified path. Raises a clear error if not found.
+    Contents are cached in memory until the file's mtime changes.
     """
-    if not prompt_path.is_file():
-        candidates = [
-            prompt_path,
-            Path.cwd() / "prompts" / prompt_path.name,
-            Path(__file__).resolve().parents[3] / "prompts" / prompt_path.name,
-        ]
-        for c in candidates:
-            if c.is_file():
-                prompt_path = c
-                break
-
-    if not prompt_path.is_file():
-        raise FileNotFoundError(
-            f"Prompt file not found. Looked at: {prompt_path}"
-        )
-
-    return prompt_path.read_text(encoding="utf-8")
+    cwd = os.getcwd()
+    abs_path = os.path.normpath(os.path.join(cwd, prompt_path))
+    resolved = _resolve(abs_path, cwd)
+    try:
+        mtime_ns = resolved.stat().st_mtime_ns
+    except FileNotFoundError:
+        # The file moved since it was resolved; look again
+        _resolve.cache_clear()
+        resolved = _resolve(abs_path, cwd)
+        mtime_ns = resolved.stat().st_mtime_ns
+    return _read_cached(str(resolved), mtime_ns)
@@ -0,0 +1,74 @@
+"""
+ResponseCache.py
+Persistent exact-match cache for LLM responses.
+- Keys are a BLAKE2b digest of the prompt parts, so any prompt change is a miss
+- Values are orjson-encoded UTF-8 bytes stored in a single SQLite table
+- One connection guarded by a lock, shared by the event loop and worker threads
+"""
+from pathlib import Path
+from typing import Any, Optional, Union
+import hashlib
+import sqlite3
+import threading
+import logging
+
+import orjson
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    Map prompts to previously parsed LLM results, on disk.
+
+    Replays of the same prompt (re-runs after a crash, regrading, duplicate
+    answers) return the stored result instead of paying for another LLM call.
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file; parent directories are created as needed
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    @staticmethod
+    def make_key(*parts: str) -> bytes:
+        """Digest the prompt parts into a 16-byte key (parts are length-prefixed, so splits differ)."""
+        h = hashlib.blake2b(digest_size=16)
+        for part in parts:
+            data = part.encode("utf-8")
+            h.update(len(data).to_bytes(8, "little"))
+            h.update(data)
+        return h.digest()
+
+    def get(self, key: bytes) -> Optional[Any]:
+        """Return the cached value for ``key``, or None on a miss."""
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return orjson.loads(row[0])
+        except orjson.JSONDecodeError:
+            logger.warning("Discarding corrupt cache entry in %s", self.path)
+            return None
+
+    def set(self, key: bytes, value: Any) -> None:
+        """Store ``value`` (JSON-serialisable) under ``key``, replacing any previous entry."""
+        encoded = orjson.dumps(value)  # bytes, stored as a BLOB without a text round-trip
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, encoded))
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,94 @@
+"""
+Retry.py
+Targeted retries for transient provider failures (rate limits, 5xx, timeouts).
+- Only exceptions the caller marks as retryable are retried; anything else fails fast
+- A server-supplied Retry-After is honoured exactly; otherwise full-jitter exponential backoff
+- call_with_retry() for worker threads, acall_with_retry() for the event loop
+"""
+from typing import Any, Awaitable, Callable, Optional, Tuple, Type, TypeVar
+import asyncio
+import random
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# HTTP statuses worth retrying: rate limited or a transient server-side failure
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+DEFAULT_ATTEMPTS = 5
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a Retry-After header given as delta-seconds; None if absent or an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    exc: BaseException,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+) -> float:
+    """
+    Delay before retry number ``attempt`` (0-based).
+    Uses the exception's ``retry_after`` attribute when the server sent one,
+    else a uniform draw from [0, min(max_delay, base_delay * 2**attempt)].
+    """
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        return min(float(retry_after), max_delay)
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def call_with_retry(
+    fn: Callable[..., T],
+    *args: Any,
+    retry_on: Tuple[Type[BaseException], ...],
+    attempts: int = DEFAULT_ATTEMPTS,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    **kwargs: Any,
+) -> T:
+    """Call ``fn`` and retry it (sleeping) on ``retry_on`` exceptions, up to ``attempts`` calls in total."""
+    for attempt in range(attempts):
+        try:
+            return fn(*args, **kwargs)
+        except retry_on as e:
+            if attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e, base_delay, max_delay)
+            logger.warning(f"Transient failure ({e}); retry {attempt + 1}/{attempts - 1} in {delay:.2f}s")
+            time.sleep(delay)
+    raise ValueError("attempts must be at least 1")
+
+
+async def acall_with_retry(
+    fn: Callable[..., Awaitable[T]],
+    *args: Any,
+    retry_on: Tuple[Type[BaseException], ...],
+    attempts: int = DEFAULT_ATTEMPTS,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    **kwargs: Any,
+) -> T:
+    """Async variant of call_with_retry; waits with asyncio.sleep so other tasks keep running."""
+    for attempt in range(attempts):
+        try:
+            return await fn(*args, **kwargs)
+        except retry_on as e:
+            if attempt == attempts - 1:
+                raise
+            delay = backoff_delay(attempt, e, base_delay, max_delay)
+            logger.warning(f"Transient failure ({e}); retry {attempt + 1}/{attempts - 1} in {delay:.2f}s")
+            await asyncio.sleep(delay)
+    raise ValueError("attempts must be at least 1")
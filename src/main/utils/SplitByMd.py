@@ -1,23 +1,57 @@
-import re
-from typing import List, Dict
+from typing import Iterator, List, Dict, Optional, Tuple
+
+
+def _iter_h2_headings(text: str) -> Iterator[Tuple[int, int, str]]:
+    """
+    Yield (line_start, line_end, title) for each '## Title' line.
+
+    Jumps between candidate lines with str.find('\\n##'), so only lines that
+    start with '##' are examined in Python; '### ...' and '##' without a title
+    are skipped.
+    """
+    pos: int = 0 if text.startswith("##") else text.find("\n##")
+    if pos > 0:
+        pos += 1
+    while pos >= 0:
+        line_end = text.find("\n", pos)
+        if line_end < 0:
+            line_end = len(text)
+        rest = text[pos + 2:line_end]
+        # '##', then at least one whitespace char, then at least one more char
+        if len(rest) >= 2 and rest[0].isspace():
+            title = rest.strip()
+            yield pos, line_end, title
+        pos = text.find("\n##", line_end)
+        if pos >= 0:
+            pos += 1
+
+
+def iter_markdown_sections(text: str) -> Iterator[Dict[str, str]]:
+    """
+    Yield {'title', 'content'} for each '##' section as soon as the next heading
+    (or the end of the text) closes it. Text without headings yields one section
+    with an empty title, or nothing if it is blank.
+    """
+    prev: Optional[Tuple[int, str]] = None  # (end of heading line, title)
+    # Each heading closes the section opened by the one before it
+    for start, end, title in _iter_h2_headings(text):
+        if prev is not None:
+            yield {"title": prev[1], "content": text[prev[0]:start].strip()}
+        prev = (end, title)
+
+    if prev is None:
+        # No headings, treat all as one chunk with empty title
+        if text.strip():
+            yield {"title": "", "content": text.strip()}
+        return
+
+    yield {"title": prev[1], "content": text[prev[0]:].strip()}
 
 
 def split_by_markdown_heading(text: str) -> List[Dict[str, str]]:
     """
     Splits markdown text by '##' headings and returns a list of dicts with 'title' and 'content'.
     """
-    heading_iter = list(re.finditer(r"(?m)^##\s+(.+)$", text))
-    if not heading_iter:
-        # No headings, treat all as one chunk with empty title
-        return [{"title": "", "content": text.strip()}] if text.strip() else []
-
-    sections: List[Dict[str, str]] = []
-    for i, m in enumerate(heading_iter):
-        title = m.group(1).strip()
-        start = m.end()
-        end = heading_iter[i + 1].start() if i + 1 < len(heading_iter) else len(text)
-        content = text[start:end].strip()
-        sections.append({"title": title, "content": content})
-    return sections
+    return list(iter_markdown_sections(text))
 
 # NOTE: Does not handle nested headings or '#' top-level titles. TODO: Add support if needed.
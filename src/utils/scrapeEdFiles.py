@@ -7,6 +7,7 @@ Usage:
 
 Requirements:
   pip install requests reportlab
+  (optional) pip install lxml   # faster slide XML parsing
 """
 
 from __future__ import annotations
@@ -19,12 +20,16 @@ import re
 import sys
 import tempfile
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
 from reportlab.lib.units import cm
@@ -32,11 +37,56 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak,
 from PyPDF2 import PdfMerger
 from reportlab.lib.enums import TA_LEFT
 from reportlab.lib import colors
-import xml.etree.ElementTree as ET
+try:
+    from lxml import etree as ET  # libxml2-backed; same Element API for what is used here
+    _XML_PARSER = ET.XMLParser(remove_comments=True, remove_pis=True, resolve_entities=False)
+except ImportError:  # lxml is optional here; fall back to the stdlib parser
+    import xml.etree.ElementTree as ET
+    _XML_PARSER = None
+try:
+    import orjson  # serialises straight to UTF-8 bytes; much faster for large lessons
+except ImportError:  # optional; fall back to the stdlib encoder
+    orjson = None
 import io
 
 ED_BASE = "https://edstem.org/api"
 DEFAULT_COURSE_ID = 16645
+# Lesson detail requests in flight at once
+DETAIL_WORKERS = 8
+# Slide file downloads in flight at once, per lesson
+DOWNLOAD_WORKERS = 8
+
+
+def make_session() -> requests.Session:
+    """
+    One pooled keep-alive session for every Ed API call and file download, so
+    repeat requests to the same host skip the DNS/TCP/TLS handshake.
+    Retries are handled by req_with_retries, not the adapter.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+SESSION = make_session()
+
+# strip_markup patterns, compiled once instead of looked up per slide
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"[ \t\r\f\v]+")
+_NL_RE = re.compile(r"\n{3,}")
+
+
+def api_headers(token: str) -> Dict[str, str]:
+    """
+    Headers for Ed API calls. Kept per request rather than on SESSION, so the
+    bearer token is never sent with image/PDF downloads from other hosts.
+    """
+    return {
+        "Authorization": f"Bearer {token}",
+        "Accept": "application/json",
+    }
 
 
 # ----------------------------
@@ -103,6 +153,13 @@ def req_with_retries(
     raise RuntimeError(f"Failed to call {url} after {max_attempts} attempts.")
 
 
+def dump_json(data: Any) -> bytes:
+    """Serialise `data` as indented UTF-8 JSON bytes (orjson when installed, else json)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode("utf-8")
+
+
 def strip_markup(ed_content: str, max_chars: int = 4000) -> str:
     """
     The lesson 'content' comes back as escaped <document> XML-ish markup.
@@ -113,81 +170,65 @@ def strip_markup(ed_content: str, max_chars: int = 4000) -> str:
     """
     unescaped = html.unescape(ed_content or "")
     # strip tags like <paragraph>...</paragraph>
-    no_tags = re.sub(r"<[^>]+>", "", unescaped)
+    no_tags = _TAG_RE.sub("", unescaped)
     # normalise whitespace
-    text = re.sub(r"[ \t\r\f\v]+", " ", no_tags)
-    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = _WS_RE.sub(" ", no_tags)
+    text = _NL_RE.sub("\n\n", text)
     text = text.strip()
     if len(text) > max_chars:
         text = text[: max_chars - 1].rstrip() + "…"
     return text
 
 
-def ed_xml_to_reportlab_markup(node):
+def _join_mixed_content(node, render, include_text: bool = True) -> str:
     """
-    Recursively convert Edstem XML node to ReportLab markup string for inline tags,
-    and return a tuple (markup, is_block) where is_block is True for block elements.
+    Escaped node.text, then each rendered child followed by its escaped tail,
+    collected in a list and joined once (no repeated string concatenation).
     """
-    tag = node.tag.lower()
-    # Inline tags
-    if tag in ('bold', 'b'):
-        return (f"<b>{''.join(ed_xml_to_reportlab_markup(child)[0] for child in node)}</b>" if list(node) else f"<b>{node.text or ''}</b>", False)
-    if tag in ('i', 'italic'):
-        return (f"<i>{''.join(ed_xml_to_reportlab_markup(child)[0] for child in node)}</i>" if list(node) else f"<i>{node.text or ''}</i>", False)
-    if tag == 'code':
-        return (f"<font face='Courier'>{''.join(ed_xml_to_reportlab_markup(child)[0] for child in node)}</font>" if list(node) else f"<font face='Courier'>{node.text or ''}</font>", False)
-    # Block tags
-    if tag == 'pre':
-        # Preformatted block
-        return (node.text or '', 'pre')
-    if tag == 'heading':
-        # Heading block
-        level = int(node.attrib.get('level', 2))
-        return (''.join(ed_xml_to_reportlab_markup(child)[0] for child in node) if list(node) else (node.text or ''), f'heading{level}')
-    if tag == 'image':
-        return (node.attrib, 'image')
-    if tag == 'list':
-        # List block
-        items = []
-        for item in node.findall('list-item'):
-            # Each list-item may have paragraphs or inline
-            item_content = []
-            for child in item:
-                markup, blocktype = ed_xml_to_reportlab_markup(child)
-                if blocktype is False:
-                    item_content.append(markup)
-                elif blocktype == 'pre':
-                    item_content.append(f'<font face="Courier">{markup}</font>')
-                else:
-                    item_content.append(markup)
-            items.append(''.join(item_content))
-        return (items, 'list')
-    if tag == 'paragraph':
-        # Paragraph block
-        markup = ''
-        if node.text:
-            markup += html.escape(node.text)
-        for child in node:
-            child_markup, blocktype = ed_xml_to_reportlab_markup(child)
-            markup += child_markup
-            if child.tail:
-                markup += html.escape(child.tail)
-        return (markup, 'paragraph')
-    # Fallback: treat as inline
-    markup = ''
-    if node.text:
-        markup += html.escape(node.text)
+    parts = [html.escape(node.text)] if include_text and node.text else []
     for child in node:
-        child_markup, blocktype = ed_xml_to_reportlab_markup(child)
-        markup += child_markup
+        parts.append(render(child))
         if child.tail:
-            markup += html.escape(child.tail)
-    return (markup, False)
+            parts.append(html.escape(child.tail))
+    return "".join(parts)
+
+
+@lru_cache(maxsize=512)
+def _parse_content(content: str) -> ET.Element:
+    """
+    Parse slide XML once per distinct content string; repeated boilerplate
+    blocks and re-exports reuse the tree. Callers must not mutate it.
+    """
+    data = content.encode("utf-8")
+    if _XML_PARSER is not None:
+        return ET.fromstring(data, _XML_PARSER)
+    return ET.fromstring(data)
+
+
+def _ensure_custom_code(styles) -> ParagraphStyle:
+    """Register the 'CustomCode' style for <pre> blocks on `styles` (once) and return it."""
+    if 'CustomCode' not in styles:
+        styles.add(ParagraphStyle(
+            "CustomCode",
+            parent=styles["Code"] if "Code" in styles else styles["BodyText"],
+            fontName="Courier",
+            fontSize=9,
+            leading=11,
+            textColor=colors.darkblue,
+            leftIndent=12,
+            borderPadding=2,
+            backColor=colors.whitesmoke,
+            alignment=TA_LEFT,
+        ))
+    return styles['CustomCode']
+
 
 def ed_content_to_flowables(content, styles, out_dir):
+    code_style = _ensure_custom_code(styles)
+
     def fetch_image(url):
         try:
-            resp = requests.get(url, timeout=10)
+            resp = SESSION.get(url, timeout=10)
             if resp.status_code == 200:
                 return io.BytesIO(resp.content)
         except Exception:
@@ -197,65 +238,28 @@ def ed_content_to_flowables(content, styles, out_dir):
     def inline_markup(node):
         tag = node.tag.lower()
         if tag in ('bold', 'b'):
-            return f"<b>{''.join(inline_markup(child) for child in node) if list(node) else (node.text or '')}</b>"
+            return f"<b>{''.join(inline_markup(child) for child in node) if len(node) else (node.text or '')}</b>"
         if tag in ('i', 'italic'):
-            return f"<i>{''.join(inline_markup(child) for child in node) if list(node) else (node.text or '')}</i>"
+            return f"<i>{''.join(inline_markup(child) for child in node) if len(node) else (node.text or '')}</i>"
         if tag == 'code':
-            return f"<font face='Courier'>{''.join(inline_markup(child) for child in node) if list(node) else (node.text or '')}</font>"
+            return f"<font face='Courier'>{''.join(inline_markup(child) for child in node) if len(node) else (node.text or '')}</font>"
         # Fallback: text and children
-        text = html.escape(node.text) if node.text else ''
-        for child in node:
-            text += inline_markup(child)
-            if child.tail:
-                text += html.escape(child.tail)
-        return text
+        return _join_mixed_content(node, inline_markup)
 
     def block_to_flowable(node):
         tag = node.tag.lower()
         if tag == 'paragraph':
-            markup = ''
-            if node.text:
-                markup += html.escape(node.text)
-            for child in node:
-                markup += inline_markup(child)
-                if child.tail:
-                    markup += html.escape(child.tail)
-            return [Paragraph(markup, styles['BodyText'])]
+            return [Paragraph(_join_mixed_content(node, inline_markup), styles['BodyText'])]
         if tag == 'pre':
-            if 'CustomCode' not in styles:
-                custom_code = ParagraphStyle(
-                    "CustomCode",
-                    parent=styles["Code"] if "Code" in styles else styles["BodyText"],
-                    fontName="Courier",
-                    fontSize=9,
-                    leading=11,
-                    textColor=colors.darkblue,
-                    leftIndent=12,
-                    borderPadding=2,
-                    backColor=colors.whitesmoke,
-                    alignment=TA_LEFT,
-                )
-                styles.add(custom_code)
-            return [Preformatted(node.text or '', styles['CustomCode'])]
+            return [Preformatted(node.text or '', code_style)]
         if tag == 'heading':
             level = int(node.attrib.get('level', 2))
             style = styles.get(f'Heading{level}', styles['Heading2'])
-            markup = ''
-            if node.text:
-                markup += html.escape(node.text)
-            for child in node:
-                markup += inline_markup(child)
-                if child.tail:
-                    markup += html.escape(child.tail)
-            return [Paragraph(markup, style)]
+            return [Paragraph(_join_mixed_content(node, inline_markup), style)]
         if tag == 'list':
             items = []
             for item in node.findall('list-item'):
-                item_markup = ''
-                for child in item:
-                    item_markup += inline_markup(child)
-                    if child.tail:
-                        item_markup += html.escape(child.tail)
+                item_markup = _join_mixed_content(item, inline_markup, include_text=False)
                 items.append(ListItem([Paragraph(item_markup, styles['BodyText'])]))
             return [ListFlowable(items, bulletType='bullet', leftIndent=12)]
         if tag == 'image':
@@ -271,7 +275,7 @@ def ed_content_to_flowables(content, styles, out_dir):
         return [Paragraph(inline_markup(node), styles['BodyText'])]
 
     try:
-        root = ET.fromstring(content)
+        root = _parse_content(content)
         flow = []
         for node in root:
             flow.extend(block_to_flowable(node))
@@ -311,36 +315,30 @@ class LessonSummary:
 # ----------------------------
 # API calls
 # ----------------------------
-def fetch_lessons_list(course_id: int, token: str) -> List[Dict[str, Any]]:
+def fetch_lessons_list(
+    course_id: int, headers: Dict[str, str], session: requests.Session = SESSION
+) -> List[Dict[str, Any]]:
     url = f"{ED_BASE}/courses/{course_id}/lessons"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-    }
-    with requests.Session() as s:
-        resp = req_with_retries("GET", url, s, headers)
-        if resp.status_code == 401:
-            raise PermissionError("Unauthorised (401). Check your Bearer token.")
-        if not resp.ok:
-            raise RuntimeError(f"Failed to fetch lessons list: {resp.status_code} {resp.text}")
-        data = resp.json()
+    resp = req_with_retries("GET", url, session, headers)
+    if resp.status_code == 401:
+        raise PermissionError("Unauthorised (401). Check your Bearer token.")
+    if not resp.ok:
+        raise RuntimeError(f"Failed to fetch lessons list: {resp.status_code} {resp.text}")
+    data = resp.json()
     lessons = data.get("lessons", []) or []
     return lessons
 
 
-def fetch_lesson_detail(lesson_id: int, token: str) -> Dict[str, Any]:
+def fetch_lesson_detail(
+    lesson_id: int, headers: Dict[str, str], session: requests.Session = SESSION
+) -> Dict[str, Any]:
     url = f"{ED_BASE}/lessons/{lesson_id}"
-    headers = {
-        "Authorization": f"Bearer {token}",
-        "Accept": "application/json",
-    }
-    with requests.Session() as s:
-        resp = req_with_retries("GET", url, s, headers)
-        if resp.status_code == 401:
-            raise PermissionError("Unauthorised (401). Check your Bearer token.")
-        if not resp.ok:
-            raise RuntimeError(f"Failed to fetch lesson {lesson_id}: {resp.status_code} {resp.text}")
-        return resp.json().get("lesson", {})
+    resp = req_with_retries("GET", url, session, headers)
+    if resp.status_code == 401:
+        raise PermissionError("Unauthorised (401). Check your Bearer token.")
+    if not resp.ok:
+        raise RuntimeError(f"Failed to fetch lesson {lesson_id}: {resp.status_code} {resp.text}")
+    return resp.json().get("lesson", {})
 
 
 # ----------------------------
@@ -400,21 +398,7 @@ def export_pdf(lessons: List[LessonSummary], out_path: Path) -> None:
         leading=14,
         spaceAfter=6,
     )
-    # Only add 'CustomCode' if not already present
-    if 'CustomCode' not in styles:
-        custom_code = ParagraphStyle(
-            "CustomCode",
-            parent=styles["Code"] if "Code" in styles else styles["BodyText"],
-            fontName="Courier",
-            fontSize=9,
-            leading=11,
-            textColor=colors.darkblue,
-            leftIndent=12,
-            borderPadding=2,
-            backColor=colors.whitesmoke,
-            alignment=TA_LEFT,
-        )
-        styles.add(custom_code)
+    _ensure_custom_code(styles)
     meta = ParagraphStyle(
         "meta",
         parent=styles["BodyText"],
@@ -487,9 +471,10 @@ def main() -> None:
     except Exception as e:
         print(f"[ERROR] {e}", file=sys.stderr)
         sys.exit(1)
+    headers = api_headers(token)
 
     try:
-        lessons_list = fetch_lessons_list(args.course, token)
+        lessons_list = fetch_lessons_list(args.course, headers)
     except Exception as e:
         print(f"[ERROR] Failed to fetch lessons list: {e}", file=sys.stderr)
         sys.exit(2)
@@ -509,37 +494,43 @@ def main() -> None:
 
     def download_pdf(url: str, dest_path: Path) -> bool:
         try:
-            resp = requests.get(url, timeout=30)
-            if resp.status_code == 200:
-                # Write content to file
-                dest_path.write_bytes(resp.content)
-                # Check Content-Type header
+            # Streamed in blocks straight to disk; the PDF is never held whole in memory
+            with SESSION.get(url, timeout=30, stream=True) as resp:
+                if resp.status_code != 200:
+                    print(f"[WARN] Skipping failed download: {url}", file=sys.stderr)
+                    return False
+                chunks = resp.iter_content(chunk_size=64 * 1024)
+                first = next(chunks, b"")
+                # Trust the Content-Type header, else check the file signature
                 content_type = resp.headers.get('content-type', '').lower()
-                if 'application/pdf' in content_type:
-                    return True
-                # If not, check file signature
-                with open(dest_path, 'rb') as f:
-                    start = f.read(5)
-                    if start == b'%PDF-':
-                        return True
-                print(f"[WARN] Skipping non-PDF file (not detected as PDF): {url}", file=sys.stderr)
-                dest_path.unlink(missing_ok=True)
-                return False
-            else:
-                print(f"[WARN] Skipping failed download: {url}", file=sys.stderr)
-                return False
+                if 'application/pdf' not in content_type and not first.startswith(b'%PDF-'):
+                    print(f"[WARN] Skipping non-PDF file (not detected as PDF): {url}", file=sys.stderr)
+                    return False
+                with open(dest_path, 'wb') as f:
+                    f.write(first)
+                    for chunk in chunks:
+                        f.write(chunk)
+                return True
         except Exception as e:
             print(f"[WARN] Failed to download {url}: {e}", file=sys.stderr)
+            dest_path.unlink(missing_ok=True)
             return False
 
-    for item in lessons_list:
-        lid = item.get("id")
-        if not lid:
-            continue
+    def fetch_detail_or_error(lid: int) -> Tuple[int, Optional[Dict[str, Any]], Optional[Exception]]:
         try:
-            detail = fetch_lesson_detail(int(lid), token)
+            return lid, fetch_lesson_detail(lid, headers), None
         except Exception as e:
-            print(f"[WARN] Skipping lesson {lid}: {e}", file=sys.stderr)
+            return lid, None, e
+
+    # Detail requests are independent round-trips: fetch them concurrently over
+    # the shared session, then export in the original lesson order
+    lesson_ids = [int(item["id"]) for item in lessons_list if item.get("id")]
+    with ThreadPoolExecutor(max_workers=DETAIL_WORKERS) as executor:
+        fetched = list(executor.map(fetch_detail_or_error, lesson_ids))
+
+    for lid, detail, error in fetched:
+        if error is not None:
+            print(f"[WARN] Skipping lesson {lid}: {error}", file=sys.stderr)
             continue
 
         raw_dump["lessons"].append(detail)
@@ -560,14 +551,23 @@ def main() -> None:
                     file_urls.append(file_url)
             if file_urls:
                 with tempfile.TemporaryDirectory() as tmpdir:
-                    merger = PdfMerger()
-                    merger.append(str(pdf_path))
-                    for idx, url in enumerate(file_urls):
-                        tmp_pdf = Path(tmpdir) / f"slidefile_{idx}.pdf"
-                        if download_pdf(url, tmp_pdf):
-                            merger.append(str(tmp_pdf))
-                    merger.write(str(pdf_path))
-                    merger.close()
+                    tmp_pdfs = [Path(tmpdir) / f"slidefile_{idx}.pdf" for idx in range(len(file_urls))]
+                    # Downloads are independent; map() returns the results in slide order
+                    with ThreadPoolExecutor(max_workers=min(DOWNLOAD_WORKERS, len(file_urls))) as executor:
+                        downloaded = list(executor.map(download_pdf, file_urls, tmp_pdfs))
+                    # Hand the merger open file handles so each PDF is opened once; the
+                    # sources stay open until the merged file is written beside them
+                    merged_path = pdf_path.with_suffix(".pdf.tmp")
+                    with ExitStack() as stack:
+                        merger = PdfMerger()
+                        stack.callback(merger.close)
+                        merger.append(stack.enter_context(open(pdf_path, "rb")))
+                        for tmp_pdf, ok in zip(tmp_pdfs, downloaded):
+                            if ok:
+                                merger.append(stack.enter_context(open(tmp_pdf, "rb")))
+                        with open(merged_path, "wb") as out:
+                            merger.write(out)
+                    os.replace(merged_path, pdf_path)
             print(f"[OK] Wrote PDF for lesson {lid} as {pdf_path}")
         except Exception as e:
             print(f"[ERROR] Failed to generate PDF for lesson {lid}: {e}", file=sys.stderr)
@@ -575,7 +575,7 @@ def main() -> None:
         # Optionally, write per-lesson JSON
         json_path = out_dir / f"{safe_title}.json"
         try:
-            json_path.write_text(json.dumps(detail, indent=2, ensure_ascii=False), encoding="utf-8")
+            json_path.write_bytes(dump_json(detail))
         except Exception as e:
             print(f"[WARN] Could not write JSON for lesson {lid}: {e}", file=sys.stderr)
 
@@ -2,6 +2,7 @@
 test_agentcore_client.py
 Unit tests for AgentCoreClient (Bedrock chat/embed logic, error handling).
 """
+import json
 import pytest
 from unittest.mock import MagicMock
 from main.agentcore_setup.AgentCoreClient import AgentCoreClient
@@ -39,3 +40,29 @@ def test_embed_error_handling(client):
     with pytest.raises(Exception):
         client.embed(["fail"], model_id="cohere.embed-english-v3")
 
+
+def test_chat_stream_yields_deltas(client):
+    events = [
+        {"chunk": {"bytes": b'{"messageStart": {"role": "assistant"}}'}},
+        {"chunk": {"bytes": b'{"contentBlockDelta": {"delta": {"text": "Hel"}}}'}},
+        {"chunk": {"bytes": b'{"contentBlockDelta": {"delta": {"text": "lo"}}}'}},
+        {"chunk": {"bytes": b'{"choices": [{"delta": {"content": "!"}}]}'}},
+    ]
+    client.bedrock_client.invoke_model_with_response_stream.return_value = {"body": events}
+    messages = [{"role": "user", "content": [{"text": "hello"}]}]
+    deltas = list(client.chat_stream(messages, model_id="amazon.nova-lite-v1:0"))
+    assert deltas == [{"text": "Hel"}, {"text": "lo"}, {"text": "!"}]
+
+
+def test_chat_nova_hoists_system_messages(client):
+    client.bedrock_client.invoke_model.return_value = {
+        "body": MagicMock(read=lambda: b'{"output": {"message": {"content": [{"text": "ok"}], "role": "assistant"}}}')
+    }
+    messages = [
+        {"role": "system", "content": [{"text": "rubric"}]},
+        {"role": "user", "content": [{"text": "answer"}]},
+    ]
+    client.chat(messages, model_id="amazon.nova-lite-v1:0")
+    payload = json.loads(client.bedrock_client.invoke_model.call_args.kwargs["body"])
+    assert payload["messages"] == [{"role": "user", "content": [{"text": "answer"}]}]
+    assert payload["system"] == [{"text": "rubric"}, {"cachePoint": {"type": "default"}}]
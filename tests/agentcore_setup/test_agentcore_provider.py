@@ -2,9 +2,10 @@
 test_agentcore_provider.py
 Unit tests for AgentCoreProvider (chat/embed integration, error handling).
 """
+import asyncio
 import pytest
 from unittest.mock import MagicMock
-from src.main.llm.AgentCoreProvider import AgentCoreProvider
+from src.main.llm.AgentCoreProvider import AgentCoreProvider, LlmError
 
 @pytest.fixture
 def provider():
@@ -33,3 +34,71 @@ def test_embed_error(provider):
     provider.client.embed.side_effect = Exception("fail")
     with pytest.raises(Exception):
         provider.embed(["fail"])
+
+def test_astream_single_yields_text(provider):
+    provider.client.chat_stream.return_value = iter([{"text": "Hel"}, {"text": "lo"}])
+
+    async def collect():
+        return [delta async for delta in provider.astream_single("hi")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+    provider.client.chat_stream.assert_called_once()
+
+def test_astream_single_error(provider):
+    provider.client.chat_stream.side_effect = Exception("fail")
+
+    async def collect():
+        return [delta async for delta in provider.astream_single("hi")]
+
+    with pytest.raises(LlmError):
+        asyncio.run(collect())
+
+class ThrottledError(Exception):
+    response = {"Error": {"Code": "ThrottlingException"}, "ResponseMetadata": {"HTTPStatusCode": 429}}
+
+def test_stream_throttle_is_rate_limit(provider):
+    from src.main.llm.AgentCoreProvider import LlmRateLimit
+    provider.client.chat_stream.side_effect = ThrottledError("slow down")
+
+    with pytest.raises(LlmRateLimit):
+        list(provider.chat([{"role": "user", "content": [{"text": "hi"}]}], stream=True))
+
+def test_astream_single_throttle_is_rate_limit(provider):
+    from src.main.llm.AgentCoreProvider import LlmRateLimit
+
+    def stream(**kw):
+        yield {"text": "Hel"}
+        raise ThrottledError("slow down")
+
+    provider.client.chat_stream.side_effect = stream
+    seen = []
+
+    async def collect():
+        async for delta in provider.astream_single("hi"):
+            seen.append(delta)
+
+    with pytest.raises(LlmRateLimit):
+        asyncio.run(collect())
+    assert seen == ["Hel"]
+
+def test_astream_single_early_exit_stops_worker(provider):
+    import threading
+    finished = threading.Event()
+
+    def stream(**kw):
+        try:
+            for i in range(1000):
+                yield {"text": str(i)}
+        finally:
+            finished.set()
+
+    provider.client.chat_stream.side_effect = stream
+
+    async def first():
+        gen = provider.astream_single("hi")
+        delta = await gen.__anext__()
+        await gen.aclose()
+        return delta
+
+    assert asyncio.run(first()) == "0"
+    assert finished.wait(timeout=5)
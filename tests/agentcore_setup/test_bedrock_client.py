@@ -0,0 +1,20 @@
+"""
+test_bedrock_client.py
+Unit tests for the shared bedrock-runtime client factory.
+"""
+from src.main.agentcore_setup.bedrock_client import get_bedrock_client, MAX_POOL_CONNECTIONS
+
+def test_client_is_reused_per_region():
+    assert get_bedrock_client("us-east-1") is get_bedrock_client("us-east-1")
+    assert get_bedrock_client("us-east-1") is not get_bedrock_client("ap-southeast-2")
+
+def test_client_uses_pooled_config():
+    client = get_bedrock_client("us-east-1")
+    assert client.meta.config.max_pool_connections == MAX_POOL_CONNECTIONS
+
+def test_caller_retried_client_makes_one_attempt():
+    from src.main.agentcore_setup.bedrock_client import NO_BOTOCORE_RETRIES
+    client = get_bedrock_client("us-east-1", caller_retries=True)
+    assert client is not get_bedrock_client("us-east-1")
+    assert client.meta.config.retries == NO_BOTOCORE_RETRIES
+    assert get_bedrock_client("us-east-1").meta.config.retries["mode"] == "adaptive"
@@ -90,6 +90,23 @@ class TestAddMessage:
         assert memory.sessions["session-1"]["total_tokens"] == 30
 
 
+class TestAddExchange:
+    """Test recording a question and answer together."""
+    
+    def test_add_exchange_appends_both_messages(self, memory):
+        memory.add_exchange(
+            "session-1", "What is Python?", "A language",
+            user_tokens=10, assistant_tokens=20, context_ids=["doc-1"]
+        )
+        
+        history = memory.get_history("session-1")
+        assert [m["role"] for m in history] == ["user", "assistant"]
+        assert history[0]["content"] == "What is Python?"
+        assert history[1]["context_ids"] == ["doc-1"]
+        assert "context_ids" not in history[0]
+        assert memory.get_session_info("session-1")["total_tokens"] == 30
+
+
 class TestGetHistory:
     """Test retrieving conversation history."""
     
@@ -129,6 +146,22 @@ class TestGetHistory:
         assert len(history) == 1
 
 
+class TestGetSessionHistory:
+    """Test fetching existence and history together."""
+    
+    def test_missing_session(self, memory):
+        assert memory.get_session_history("nope") == (False, [])
+    
+    def test_existing_session_with_limit(self, memory):
+        for i in range(5):
+            memory.add_message("session-1", "user", f"Message {i}")
+        
+        exists, history = memory.get_session_history("session-1", max_messages=2)
+        
+        assert exists is True
+        assert [m["content"] for m in history] == ["Message 3", "Message 4"]
+
+
 class TestGetFormattedHistory:
     """Test formatting conversation history for LLM context."""
     
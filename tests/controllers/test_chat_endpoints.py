@@ -2,9 +2,10 @@
 test_chat_endpoints.py
 Integration tests for chat endpoints with conversation history.
 """
+import json
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from app import create_app
 from src.main.controllers import InternalEndpoints
 
@@ -13,7 +14,7 @@ from src.main.controllers import InternalEndpoints
 def mock_chat_service():
     """Mock ChatService."""
     mock = MagicMock()
-    mock.chat.return_value = {
+    mock.achat = AsyncMock(return_value={
         "answer": "Test answer",
         "session_id": "test-session-123",
         "is_new_session": True,
@@ -22,7 +23,7 @@ def mock_chat_service():
         "tokens_input": 100,
         "tokens_output": 50,
         "model_id": "test-model"
-    }
+    })
     return mock
 
 
@@ -111,9 +112,9 @@ class TestChatEndpoint:
         
         assert response.status_code == 200
         
-        # Verify ChatService.chat was called with session_id
-        mock_chat.chat.assert_called_once()
-        call_kwargs = mock_chat.chat.call_args.kwargs
+        # Verify ChatService.achat was called with session_id
+        mock_chat.achat.assert_called_once()
+        call_kwargs = mock_chat.achat.call_args.kwargs
         assert call_kwargs["session_id"] == "my-session-123"
     
     def test_chat_with_all_parameters(self, client):
@@ -132,7 +133,7 @@ class TestChatEndpoint:
         assert response.status_code == 200
         
         # Verify all parameters were passed
-        call_kwargs = mock_chat.chat.call_args.kwargs
+        call_kwargs = mock_chat.achat.call_args.kwargs
         assert call_kwargs["query"] == "Explain inheritance"
         assert call_kwargs["top_k"] == 10
         assert call_kwargs["session_id"] == "test-session"
@@ -162,7 +163,7 @@ class TestChatEndpoint:
         """Test that service errors are handled gracefully."""
         test_client, mock_chat, mock_memory = client
         from src.main.service.ChatService import ChatServiceError
-        mock_chat.chat.side_effect = ChatServiceError("Test error")
+        mock_chat.achat.side_effect = ChatServiceError("Test error")
         
         response = test_client.post(
             "/internal/chat",
@@ -175,6 +176,46 @@ class TestChatEndpoint:
         assert "error" in data
 
 
+class TestChatStreamEndpoint:
+    """Test POST /internal/chat/stream endpoint."""
+    
+    def test_stream_emits_ndjson_events(self, client):
+        """Events arrive one JSON object per line with the session id in a header."""
+        test_client, mock_chat, mock_memory = client
+        
+        async def events(**kwargs):
+            yield {"type": "start", "session_id": "test-session-123", "is_new_session": True,
+                   "history_length": 0, "pedagogy_mode": "explanatory"}
+            yield {"type": "delta", "text": "Test "}
+            yield {"type": "delta", "text": "answer"}
+            yield {"type": "end", "context_ids": ["doc-1"], "tokens_input": None,
+                   "tokens_output": None, "model_id": None}
+        
+        mock_chat.astream_chat = MagicMock(side_effect=events)
+        response = test_client.post("/internal/chat/stream", json={"query": "What is Python?"})
+        
+        assert response.status_code == 200
+        assert response.headers["x-session-id"] == "test-session-123"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [e["type"] for e in lines] == ["start", "delta", "delta", "end"]
+        assert "".join(e["text"] for e in lines if e["type"] == "delta") == "Test answer"
+    
+    def test_stream_error_before_start(self, client):
+        """Failures before the first event are reported like /chat."""
+        test_client, mock_chat, mock_memory = client
+        from src.main.service.ChatService import ChatServiceError
+        
+        async def events(**kwargs):
+            raise ChatServiceError("Test error")
+            yield  # pragma: no cover
+        
+        mock_chat.astream_chat = MagicMock(side_effect=events)
+        response = test_client.post("/internal/chat/stream", json={"query": "Test"})
+        
+        assert response.status_code == 200
+        assert response.json() == {"error": "Test error"}
+
+
 class TestGetHistoryEndpoint:
     """Test GET /internal/chat/history/{session_id} endpoint."""
     
@@ -327,7 +368,7 @@ class TestEndToEndConversation:
             }
         ]
         
-        mock_chat.chat.side_effect = chat_responses
+        mock_chat.achat.side_effect = chat_responses
         
         # First message (new session)
         response1 = test_client.post(
@@ -398,7 +439,7 @@ class TestPedagogyModeEndpoint:
         test_client, mock_chat, mock_memory = client
         
         # Mock response with pedagogy mode
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Let me ask you some questions to guide your thinking...",
             "session_id": "test-session-123",
             "is_new_session": True,
@@ -422,8 +463,8 @@ class TestPedagogyModeEndpoint:
         data = response.json()
         
         # Verify mode was passed to service
-        mock_chat.chat.assert_called_once()
-        call_kwargs = mock_chat.chat.call_args.kwargs
+        mock_chat.achat.assert_called_once()
+        call_kwargs = mock_chat.achat.call_args.kwargs
         assert call_kwargs["pedagogy_mode"] == "socratic"
         
         # Verify mode is in response
@@ -434,7 +475,7 @@ class TestPedagogyModeEndpoint:
         """Test that default mode is used when not specified."""
         test_client, mock_chat, mock_memory = client
         
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Here's a clear explanation...",
             "session_id": "test-session-123",
             "is_new_session": True,
@@ -464,7 +505,7 @@ class TestPedagogyModeEndpoint:
         modes = ["socratic", "explanatory", "debugging", "assessment", "review"]
         
         for mode in modes:
-            mock_chat.chat.return_value = {
+            mock_chat.achat.return_value = {
                 "answer": f"Response in {mode} mode",
                 "session_id": "test-session",
                 "is_new_session": False,
@@ -493,7 +534,7 @@ class TestPedagogyModeEndpoint:
         test_client, mock_chat, mock_memory = client
         
         # Mock service to handle invalid mode gracefully
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Response",
             "session_id": "test-session",
             "is_new_session": True,
@@ -521,7 +562,7 @@ class TestPedagogyModeEndpoint:
         test_client, mock_chat, mock_memory = client
         
         # First message with socratic mode
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "First response",
             "session_id": "persistent-session",
             "is_new_session": True,
@@ -546,7 +587,7 @@ class TestPedagogyModeEndpoint:
         assert response1.json()["pedagogy_mode"] == "socratic"
         
         # Second message without specifying mode (should use session's mode)
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Second response",
             "session_id": "persistent-session",
             "is_new_session": False,
@@ -569,7 +610,7 @@ class TestPedagogyModeEndpoint:
         
         assert response2.status_code == 200
         # Mode should persist from session
-        call_kwargs = mock_chat.chat.call_args.kwargs
+        call_kwargs = mock_chat.achat.call_args.kwargs
         # Service should handle persistence
     
     def test_pedagogy_mode_switching(self, client):
@@ -577,7 +618,7 @@ class TestPedagogyModeEndpoint:
         test_client, mock_chat, mock_memory = client
         
         # Start with explanatory
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Explanatory response",
             "session_id": "switch-session",
             "is_new_session": True,
@@ -601,7 +642,7 @@ class TestPedagogyModeEndpoint:
         assert response1.json()["pedagogy_mode"] == "explanatory"
         
         # Switch to debugging
-        mock_chat.chat.return_value = {
+        mock_chat.achat.return_value = {
             "answer": "Debugging hint response",
             "session_id": "switch-session",
             "is_new_session": False,
@@ -0,0 +1,65 @@
+"""
+test_dto_factory.py
+Unit tests for the generated fast DTO builders.
+"""
+import pytest
+from pydantic import ValidationError
+from src.main.converters.DtoFactory import build_dto, get_fast_builder
+from src.main.dtos.ChatResponse import ChatResponse
+from src.main.dtos.ChatHistoryResponse import ChatMessage
+from src.main.dtos.SessionListResponse import SessionInfo
+
+
+class TestBuildDto:
+    """Fast builders must be indistinguishable from validated construction."""
+
+    def test_full_chat_response_matches_constructor(self):
+        data = {
+            "answer": "Python is a language",
+            "session_id": "abc-123",
+            "is_new_session": True,
+            "history_length": 0,
+            "pedagogy_mode": "explanatory",
+            "context_ids": ["doc1"],
+            "tokens_input": 10,
+            "tokens_output": 20,
+            "model_id": "model",
+        }
+        fast = build_dto(ChatResponse, data)
+        assert fast == ChatResponse(**data)
+        assert fast.model_dump() == ChatResponse(**data).model_dump()
+        assert fast.model_fields_set == ChatResponse(**data).model_fields_set
+
+    def test_missing_fields_use_defaults(self):
+        fast = build_dto(ChatResponse, {"error": "boom"})
+        assert fast.error == "boom"
+        assert fast.answer is None
+        assert fast.is_new_session is False
+        assert fast.context_ids == []
+
+    def test_mutable_defaults_not_shared(self):
+        first = build_dto(ChatResponse, {"answer": "a"})
+        second = build_dto(ChatResponse, {"answer": "b"})
+        first.context_ids.append("x")
+        assert second.context_ids == []
+
+    def test_extra_keys_ignored(self):
+        info = build_dto(SessionInfo, {
+            "session_id": "s1",
+            "message_count": 2,
+            "created_at": "2025-11-13T09:00:00",
+            "last_accessed": "2025-11-13T10:00:00",
+            "total_tokens": 30,
+            "pedagogy_mode": "debugging",
+        })
+        assert info.title == "New Chat"
+        assert "pedagogy_mode" not in info.model_dump()
+
+    def test_missing_required_field_still_validates(self):
+        with pytest.raises(ValidationError):
+            build_dto(ChatMessage, {"role": "user", "content": "hi"})
+
+    def test_builder_cached_per_shape(self):
+        shape = ("role", "content", "timestamp")
+        assert get_fast_builder(ChatMessage, shape) is get_fast_builder(ChatMessage, shape)
+        assert get_fast_builder(ChatMessage, shape) is not get_fast_builder(ChatMessage, shape + ("tokens",))
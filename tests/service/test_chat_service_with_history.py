@@ -2,11 +2,15 @@
 test_chat_service_with_history.py
 Unit tests for ChatService with conversation history integration.
 """
+import asyncio
 import pytest
 import uuid
 from unittest.mock import MagicMock
 from src.main.service.ChatService import ChatService, ChatServiceError
 from src.main.agentcore_setup.memory import ConversationMemory
+from src.main.service.SemanticCache import SemanticCache
+from src.main.service.PromptService import PromptService
+from src.main.dtos.PedagogyMode import PedagogyMode
 
 
 class DummyVectorService:
@@ -357,6 +361,40 @@ class TestPromptBuilding:
         result = chat_service.chat("Test question")
         assert len(result["context_ids"]) > 0
     
+    def test_single_prompt_client_receives_plain_text(self, memory):
+        """Clients exposing chat_single get the prompt string without a messages envelope."""
+        class SinglePromptClient:
+            def __init__(self):
+                self.prompts = []
+            
+            def chat_single(self, user_text):
+                self.prompts.append(user_text)
+                return "answer"
+        
+        agent = SinglePromptClient()
+        service = ChatService(DummyVectorService(), agent, memory)
+        service.chat("What is Python?", session_id="s1")
+        
+        assert isinstance(agent.prompts[0], str)
+        assert agent.prompts[0].endswith("Current question:\nWhat is Python?")
+    
+    def test_reloaded_mode_prompt_reaches_chat_service(self, memory, tmp_path):
+        """Editing a prompt and clearing PromptService's cache changes the built prompt."""
+        prompt_file = tmp_path / PedagogyMode.EXPLANATORY.get_prompt_filename()
+        prompt_file.write_text("Old instructions")
+        prompt_service = PromptService(prompts_dir=str(tmp_path))
+        service = ChatService(DummyVectorService(), DummyAgentClient(), memory,
+                              prompt_service=prompt_service)
+        
+        assert "Old instructions" in service._build_prompt("Q", "", [], "explanatory")
+        
+        prompt_file.write_text("New instructions")
+        assert "Old instructions" in service._build_prompt("Q", "", [], "explanatory")
+        prompt_service.clear_cache()
+        prompt = service._build_prompt("Q", "", [], "explanatory")
+        assert "New instructions" in prompt
+        assert "Old instructions" not in prompt
+    
     def test_prompt_includes_history_on_followup(self, chat_service):
         """Test that history is included in prompt for follow-up."""
         session_id = "session-1"
@@ -388,8 +426,324 @@ class TestEdgeCases:
         result = chat_service.chat(special_query, session_id="session-1")
         assert result["answer"] is not None
     
+    def test_context_truncated_to_budget(self, memory):
+        """Context is cut at max_context_chars exactly as a join-then-slice would."""
+        service = ChatService(DummyVectorService(), DummyAgentClient(), memory, max_context_chars=40)
+        results = [
+            {"id": "a", "text": "A" * 30},
+            {"id": "b", "text": "B" * 30},
+            {"id": "c", "text": "C" * 30},
+        ]
+        
+        context_ids, context_str = service._format_context(results)
+        
+        assert context_ids == ["a", "b", "c"]
+        assert context_str == "\n---\n".join(r["text"] for r in results)[:40]
+    
+    def test_history_capped_to_newest_messages(self, memory):
+        """Older messages are dropped once max_history_chars is used up."""
+        service = ChatService(DummyVectorService(), DummyAgentClient(), memory, max_history_chars=60)
+        history = [
+            {"role": "user", "content": "oldest " * 5},
+            {"role": "assistant", "content": "middle " * 5},
+            {"role": "user", "content": "newest"},
+        ]
+        
+        formatted = service._format_history(history)
+        
+        assert "oldest" not in formatted
+        assert formatted.index("middle") < formatted.index("newest")
+        assert formatted.startswith("Previous conversation in this session:\n")
+    
     def test_top_k_parameter(self, chat_service):
         """Test that top_k parameter is respected."""
         result = chat_service.chat("Test", top_k=1)
         # With our mock, we always return 2 docs, but in real scenario top_k would limit
         assert len(result["context_ids"]) >= 1
+
+
+class TestAsyncChat:
+    """Test the async chat path used by the /chat endpoint."""
+    
+    def test_achat_matches_sync_result_shape(self, chat_service):
+        """achat returns the same keys as chat."""
+        sync_result = chat_service.chat("What is Python?")
+        async_result = asyncio.run(chat_service.achat("What is Python?"))
+        assert async_result.keys() == sync_result.keys()
+        assert async_result["is_new_session"] is True
+        assert async_result["context_ids"] == ["doc-1", "doc-2"]
+    
+    def test_achat_stores_history(self, chat_service, memory):
+        """achat records the exchange so follow-ups see it."""
+        session_id = "async-session"
+        asyncio.run(chat_service.achat("First question", session_id=session_id))
+        result = asyncio.run(chat_service.achat("Follow-up", session_id=session_id))
+        
+        assert result["is_new_session"] is False
+        assert result["history_length"] == 2
+        assert len(memory.get_history(session_id)) == 4
+    
+    def test_achat_uses_async_clients_when_available(self, memory):
+        """Native achat/asemantic_search are awaited instead of the sync methods."""
+        class AsyncVectorService:
+            async def asemantic_search(self, query, top_k=5):
+                return [{"id": "doc-a", "text": "async context", "score": 1.0}]
+        
+        class AsyncAgentClient:
+            def __init__(self):
+                self.calls = 0
+            
+            async def achat(self, messages):
+                self.calls += 1
+                return "async answer"
+        
+        agent = AsyncAgentClient()
+        service = ChatService(AsyncVectorService(), agent, memory)
+        result = asyncio.run(service.achat("Question", session_id="s1", include_history=False))
+        
+        assert result["answer"] == "async answer"
+        assert result["context_ids"] == ["doc-a"]
+        assert agent.calls == 2  # answer + session title
+    
+    def test_achat_generates_title_concurrently(self, memory):
+        """For new sessions the title request overlaps the answer request."""
+        class SlowAgentClient:
+            def __init__(self):
+                self.in_flight = 0
+                self.max_in_flight = 0
+            
+            async def achat(self, messages):
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.01)
+                self.in_flight -= 1
+                return "answer"
+        
+        agent = SlowAgentClient()
+        service = ChatService(DummyVectorService(), agent, memory)
+        asyncio.run(service.achat("Question"))
+        
+        assert agent.max_in_flight == 2
+    
+    def test_achat_caps_concurrent_llm_calls(self, memory):
+        """No more than max_concurrent_llm agent calls are in flight at once."""
+        class SlowAgentClient:
+            def __init__(self):
+                self.in_flight = 0
+                self.max_in_flight = 0
+            
+            async def achat(self, messages):
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+                await asyncio.sleep(0.01)
+                self.in_flight -= 1
+                return "answer"
+        
+        async def run_many(service):
+            await asyncio.gather(*(
+                service.achat(f"Question {i}", include_history=False) for i in range(6)
+            ))
+        
+        agent = SlowAgentClient()
+        service = ChatService(DummyVectorService(), agent, memory, max_concurrent_llm=2)
+        asyncio.run(run_many(service))
+        
+        assert agent.max_in_flight == 2
+    
+    def test_achat_vector_error(self, chat_service):
+        """Vector errors surface as ChatServiceError."""
+        with pytest.raises(ChatServiceError, match="Vector search failed"):
+            asyncio.run(chat_service.achat("vector_fail"))
+
+
+class TestSemanticCache:
+    """Test answering repeated questions from the semantic cache."""
+    
+    class CountingVectorService(DummyVectorService):
+        def __init__(self):
+            self.searches = 0
+        
+        def embed(self, text):
+            return [1.0, 0.0]
+        
+        def semantic_search(self, query, top_k=5):
+            self.searches += 1
+            self.last_embedding = None
+            return super().semantic_search(query, top_k)
+        
+        def search_by_embedding(self, query_embedding, top_k=5):
+            self.searches += 1
+            self.last_embedding = query_embedding
+            return super().semantic_search("", top_k)
+    
+    class CountingAgentClient(DummyAgentClient):
+        def __init__(self):
+            self.calls = 0
+        
+        def chat(self, messages):
+            self.calls += 1
+            return super().chat(messages)
+    
+    def test_repeat_question_served_from_cache(self, memory):
+        """The second identical question skips search and the LLM but is still recorded."""
+        vector = self.CountingVectorService()
+        agent = self.CountingAgentClient()
+        service = ChatService(vector, agent, memory, semantic_cache=SemanticCache())
+        
+        first = service.chat("What is Python?", session_id="s1", include_history=False)
+        second = service.chat("What is Python?", session_id="s1", include_history=False)
+        
+        assert second["answer"] == first["answer"]
+        assert second["context_ids"] == first["context_ids"]
+        assert second["tokens_input"] is None
+        assert vector.searches == 1
+        assert agent.calls == 2  # first answer + session title
+        assert len(memory.get_history("s1")) == 4
+    
+    def test_followups_with_history_bypass_cache(self, memory):
+        """Turns that include history are never answered from the cache."""
+        vector = self.CountingVectorService()
+        agent = self.CountingAgentClient()
+        service = ChatService(vector, agent, memory, semantic_cache=SemanticCache())
+        
+        service.chat("What is Python?", session_id="s1")
+        service.chat("What is Python?", session_id="s1")
+        
+        assert vector.searches == 2
+    
+    def test_cache_miss_reuses_query_embedding(self, memory):
+        """On a miss the embedding computed for the lookup is passed to the search."""
+        vector = self.CountingVectorService()
+        service = ChatService(vector, self.CountingAgentClient(), memory, semantic_cache=SemanticCache())
+        
+        service.chat("What is Python?", include_history=False)
+        
+        assert vector.last_embedding == [1.0, 0.0]
+
+
+class TestStripReasoningTags:
+    """Test removal of model chain-of-thought from answers."""
+    
+    def test_plain_answer_untouched(self, chat_service):
+        assert chat_service._strip_reasoning_tags("  Lists are ordered.\n") == "Lists are ordered."
+    
+    def test_reasoning_block_removed(self, chat_service):
+        text = "<Reasoning>think\nmore</reasoning>Lists are ordered."
+        assert chat_service._strip_reasoning_tags(text) == "Lists are ordered."
+    
+    def test_unclosed_tag_removed_content_kept(self, chat_service):
+        assert chat_service._strip_reasoning_tags("<reasoning>Lists are ordered.") == "Lists are ordered."
+    
+    def test_excess_blank_lines_collapsed(self, chat_service):
+        text = "First</reasoning>\n\n\n\nSecond"
+        assert chat_service._strip_reasoning_tags(text) == "First\n\nSecond"
+
+
+class TestSessionTitle:
+    """Test session title generation for new sessions."""
+    
+    def test_title_prompt_embeds_message_verbatim(self, chat_service):
+        """Braces in the user's message are not treated as template fields."""
+        prompt = chat_service._title_prompt("What does {x: 1} mean?")
+        assert 'First message: "What does {x: 1} mean?"' in prompt
+    
+    def test_statement_titled_without_llm(self, memory):
+        """Plain statements get a keyword title and skip the title LLM call."""
+        agent = TestSemanticCache.CountingAgentClient()
+        service = ChatService(DummyVectorService(), agent, memory)
+        
+        assert service._generate_session_title("Help me debug this code") == "Debug Code"
+        assert agent.calls == 0
+        
+        service.chat("Binary search trees in Java")
+        assert agent.calls == 1  # answer only
+    
+    def test_ambiguous_messages_fall_back_to_llm(self, memory):
+        """Questions, single keywords and pasted code are titled by the LLM."""
+        agent = TestSemanticCache.CountingAgentClient()
+        service = ChatService(DummyVectorService(), agent, memory)
+        
+        for message in ["What are lists?", "Recursion", "def f():\n    return 1"]:
+            service._generate_session_title(message)
+        assert agent.calls == 3
+
+
+class TestStreamChat:
+    """Test streaming answers through astream_chat."""
+    
+    class StreamingAgentClient:
+        def __init__(self, chunks):
+            self.chunks = chunks
+        
+        async def astream_single(self, prompt):
+            for chunk in self.chunks:
+                await asyncio.sleep(0)
+                yield chunk
+        
+        async def achat_single(self, prompt):
+            return "Title"
+    
+    @staticmethod
+    def collect(service, *args, **kwargs):
+        async def run():
+            return [event async for event in service.astream_chat(*args, **kwargs)]
+        return asyncio.run(run())
+    
+    def test_stream_events_and_history(self, memory):
+        """Deltas concatenate to the stored answer, with reasoning withheld."""
+        agent = self.StreamingAgentClient(["<reason", "ing>hmm</reasoning>Lists ", "are ordered."])
+        service = ChatService(DummyVectorService(), agent, memory)
+        
+        events = self.collect(service, "What are lists?", session_id="s1")
+        
+        assert events[0]["type"] == "start"
+        assert events[0]["session_id"] == "s1"
+        assert events[-1]["type"] == "end"
+        assert events[-1]["context_ids"] == ["doc-1", "doc-2"]
+        streamed = "".join(e["text"] for e in events if e["type"] == "delta")
+        assert streamed == "Lists are ordered."
+        assert memory.get_history("s1")[-1]["content"] == "Lists are ordered."
+    
+    def test_stream_unclosed_tag_matches_stored_answer(self, memory):
+        """An unclosed tag drops only the tag, in the stream as in the stored answer."""
+        chunks = ["Intro\n<reasoning>Lists ", "are\n\n", "\n\n<reason", "ing>ordered.\n"]
+        service = ChatService(DummyVectorService(), self.StreamingAgentClient(chunks), memory)
+        
+        events = self.collect(service, "What are lists?", session_id="s1")
+        streamed = "".join(e["text"] for e in events if e["type"] == "delta")
+        
+        assert streamed == "Intro\nLists are\n\nordered."
+        assert streamed == memory.get_history("s1")[-1]["content"]
+        assert streamed == service._strip_reasoning_tags("".join(chunks))
+    
+    def test_stream_split_tags_match_stored_answer(self, memory):
+        """Tags split across deltas and blank lines around them stream as stored."""
+        chunks = ["Lists\n", "\n<Reas", "oning>hmm</reasoning>", "\n\nare <", "b>ordered</b>.  ", "</reas", "oning>"]
+        service = ChatService(DummyVectorService(), self.StreamingAgentClient(chunks), memory)
+        
+        events = self.collect(service, "What are lists?", session_id="s1")
+        streamed = "".join(e["text"] for e in events if e["type"] == "delta")
+        
+        assert streamed == "Lists\n\nare <b>ordered</b>."
+        assert streamed == memory.get_history("s1")[-1]["content"]
+        assert streamed == service._strip_reasoning_tags("".join(chunks))
+    
+    def test_stream_falls_back_to_single_chunk(self, chat_service, memory):
+        """Clients without astream_single yield the whole answer at once."""
+        events = self.collect(chat_service, "What is Python?", session_id="s2")
+        deltas = [e for e in events if e["type"] == "delta"]
+        
+        assert len(deltas) == 1
+        assert deltas[0]["text"] == memory.get_history("s2")[-1]["content"]
+    
+    def test_stream_vector_error(self, chat_service):
+        """Retrieval errors surface before any event is yielded."""
+        with pytest.raises(ChatServiceError, match="Vector search failed"):
+            self.collect(chat_service, "vector_fail")
+
+
+def test_chat_service_uses_slots(chat_service):
+    """ChatService keeps its state in slots rather than a per-instance dict."""
+    assert not hasattr(chat_service, "__dict__")
+    with pytest.raises(AttributeError):
+        chat_service.unexpected_attribute = 1
@@ -4,7 +4,7 @@ Unit tests for ContextVectorService.upload_document and embed.
 """
 import pytest
 from unittest.mock import MagicMock
-from main.service.ContextVectorService import ContextVectorService
+from src.main.service.ContextVectorService import ContextVectorService
 
 class DummyDriver:
     def session(self):
@@ -22,6 +22,8 @@ def service():
     return svc
 
 def test_upload_document_basic(service):
+    service.preprocessor = MagicMock()
+    service.preprocessor.preprocess_to_markdown.return_value = "# Heading\nSome content here."
     service.llm.embed.return_value = [[0.1]*1024]
     result = service.upload_document(
         document_name="TestDoc",
@@ -37,3 +39,170 @@ def test_embed_shape(service):
     emb = service.embed("hello world")
     assert isinstance(emb, list)
     assert len(emb) == 1024
+
+class RecordingDriver:
+    def __init__(self, rows, index_error=None):
+        self.rows = rows
+        self.index_error = index_error
+        self.queries = []
+
+    def session(self):
+        driver = self
+        class RecordingResult(list):
+            def consume(self): return None
+        class RecordingSession:
+            def __enter__(self): return self
+            def __exit__(self, *a): pass
+            def run(self, query, **kw):
+                driver.queries.append((query, kw))
+                if "CREATE VECTOR INDEX" in query and driver.index_error:
+                    raise driver.index_error
+                return RecordingResult(driver.rows)
+        return RecordingSession()
+
+    def execute_query(self, query, routing_=None, **kw):
+        self.queries.append((query, kw))
+        return list(self.rows), None, []
+
+def test_search_by_embedding_uses_vector_index(service):
+    service.driver = RecordingDriver([{"id": "doc1", "text": "Python", "score": 0.9}])
+    results = service.search_by_embedding([0.1]*1024, top_k=3)
+    service.search_by_embedding([0.1]*1024, top_k=3)
+
+    assert results == [{"id": "doc1", "text": "Python", "score": 0.9}]
+    index_creations = [q for q, _ in service.driver.queries if "CREATE VECTOR INDEX" in q]
+    assert len(index_creations) == 1  # created once, then reused
+    query, params = service.driver.queries[-1]
+    assert "db.index.vector.queryNodes" in query
+    assert params["top_k"] == 3
+
+def test_batch_embed_splits_into_provider_batches(service):
+    service.llm.embed.side_effect = lambda batch: [[0.1]*1024 for _ in batch]
+    vectors = service._batch_embed([f"chunk {i}" for i in range(100)])
+
+    assert len(vectors) == 100
+    assert [len(call.args[0]) for call in service.llm.embed.call_args_list] == [96, 4]
+
+def test_batch_embed_truncates_each_text(service):
+    service.embed_max_chars = 10
+    service.llm.embed.side_effect = lambda batch: [[0.1]*1024 for _ in batch]
+    service._batch_embed(["x" * 50, "short"])
+
+    assert service.llm.embed.call_args.args[0] == ["x" * 10, "short"]
+
+def test_batch_embed_concurrent_batches_keep_order(service):
+    service.max_concurrency = 4
+    service.llm.embed.side_effect = lambda batch: [[float(batch[0].split()[1])]*1024 for _ in batch]
+    vectors = service._batch_embed([f"chunk {i}" for i in range(300)])
+
+    assert len(vectors) == 300
+    assert [vectors[i][0] for i in (0, 96, 192, 288)] == [0.0, 96.0, 192.0, 288.0]
+
+def test_search_falls_back_without_vector_index(service):
+    from neo4j.exceptions import ClientError
+    service.driver = RecordingDriver(
+        [
+            {"id": "far", "text": "far", "embedding": [0.0, 1.0] + [0.0]*1022},
+            {"id": "near", "text": "near", "embedding": [1.0, 0.1] + [0.0]*1022},
+            {"id": "bad", "text": "bad", "embedding": [1.0]},
+        ],
+        index_error=ClientError("vector indexes not supported"),
+    )
+    results = service.search_by_embedding([1.0, 0.0] + [0.0]*1022, top_k=1)
+
+    assert [r["id"] for r in results] == ["near"]
+    assert results[0]["score"] == pytest.approx(0.995, abs=1e-3)
+
+def test_fallback_matrix_cached_until_upload(service):
+    from neo4j.exceptions import ClientError
+    service.driver = RecordingDriver(
+        [{"id": "doc1", "text": "Python", "embedding": [0.1]*1024}],
+        index_error=ClientError("vector indexes not supported"),
+    )
+    service.search_by_embedding([0.1]*1024)
+    service.search_by_embedding([0.1]*1024)
+    corpus_reads = [q for q, _ in service.driver.queries if "MATCH (d:Document)" in q]
+    assert len(corpus_reads) == 1
+
+    service.preprocessor = MagicMock()
+    service.preprocessor.preprocess_to_markdown.return_value = "## Heading\nBody"
+    service.llm.embed.return_value = [[0.1]*1024]
+    service.upload_document("Doc", "desc", "# Heading\nBody", scope="test")
+    service.search_by_embedding([0.1]*1024)
+    corpus_reads = [q for q, _ in service.driver.queries if "MATCH (d:Document)" in q]
+    assert len(corpus_reads) == 2
+
+def test_int8_fallback_matches_float_ranking(service):
+    from neo4j.exceptions import ClientError
+    rows = [
+        {"id": f"doc{i}", "text": str(i), "embedding": [((i * 7 + j * 3) % 11) / 11 - 0.5 for j in range(1024)]}
+        for i in range(20)
+    ]
+    query = rows[5]["embedding"]
+
+    service.driver = RecordingDriver(rows, index_error=ClientError("unsupported"))
+    exact = service.search_by_embedding(query, top_k=3)
+
+    service.quantize_int8 = True
+    service._invalidate_embedding_cache()
+    approx = service.search_by_embedding(query, top_k=3)
+
+    assert [r["id"] for r in approx] == [r["id"] for r in exact]
+    assert approx[0]["score"] == pytest.approx(exact[0]["score"], abs=0.01)
+
+def test_fallback_reads_packed_float32_embeddings(service):
+    import numpy as np
+    from neo4j.exceptions import ClientError
+    packed = np.asarray([1.0] + [0.0]*1023, dtype="<f4").tobytes()
+    service.driver = RecordingDriver(
+        [
+            {"id": "packed", "text": "p", "embedding_f32": packed, "embedding": None},
+            {"id": "legacy", "text": "l", "embedding_f32": None, "embedding": [0.0, 1.0] + [0.0]*1022},
+        ],
+        index_error=ClientError("unsupported"),
+    )
+    results = service.search_by_embedding([1.0] + [0.0]*1023, top_k=2)
+
+    assert [r["id"] for r in results] == ["packed", "legacy"]
+    assert results[0]["score"] == pytest.approx(1.0)
+
+def test_upload_writes_all_chunks_in_one_query(service):
+    service.driver = RecordingDriver([])
+    service.preprocessor = MagicMock()
+    service.preprocessor.preprocess_to_markdown.return_value = "## One\nfirst\n## Two\nsecond"
+    service.llm.embed.side_effect = lambda batch: [[0.1]*1024 for _ in batch]
+    result = service.upload_document("Doc", "desc", "raw", scope="test")
+
+    assert len(service.driver.queries) == 1
+    query, params = service.driver.queries[0]
+    assert "UNWIND $rows" in query
+    assert [row["idx"] for row in params["rows"]] == [0, 1]
+    assert [c["chunk_idx"] for c in result["chunks"]] == [0, 1]
+
+def test_list_documents_filters_on_lowercase_scope(service):
+    service.driver = RecordingDriver([])
+    service.list_documents(offset=0, limit=10, scope="COMP1511")
+    service.list_documents(offset=0, limit=10, scope="COMP1511")
+
+    list_queries = [(q, kw) for q, kw in service.driver.queries if "RETURN d.id AS document_id" in q]
+    assert "d.scope = $scope" in list_queries[0][0]
+    assert "d.Scope" not in list_queries[0][0]
+    assert sum("CREATE INDEX" in q for q, _ in service.driver.queries) == 1
+
+def test_llm_provider_built_on_first_use():
+    svc = ContextVectorService()
+    assert "llm" not in vars(svc)
+
+def test_float_scores_match_with_and_without_sgemv(monkeypatch):
+    import numpy as np
+    import src.main.service.ContextVectorService as cvs
+    rng = np.random.default_rng(0)
+    matrix = rng.standard_normal((50, 1024)).astype(np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    query = matrix[7]
+
+    expected = matrix @ query
+    if cvs.sgemv is not None:
+        assert np.allclose(ContextVectorService._float_scores(matrix, query), expected, atol=1e-5)
+    monkeypatch.setattr(cvs, "sgemv", None)
+    assert np.allclose(ContextVectorService._float_scores(matrix, query), expected, atol=1e-5)
@@ -3,7 +3,8 @@ test_file_to_text_service.py
 Unit tests for FileToTextService PDF extraction logic.
 """
 import pytest
-from main.service.FileToTextService import FileToTextService
+from src.main.service import FileToTextService as ftt
+from src.main.service.FileToTextService import FileToTextService
 from PyPDF2 import PdfWriter
 import os
 
@@ -36,3 +37,39 @@ def test_file_to_text_unreadable(tmp_path, service, monkeypatch):
     pdf_path.write_bytes(b"not a real pdf")
     result = service.file_to_text(str(pdf_path))
     assert result == ""
+
+def write_blank_pdf(path, pages):
+    writer = PdfWriter()
+    for _ in range(pages):
+        writer.add_blank_page(width=72, height=72)
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+def test_extract_page_range_reads_only_its_pages(tmp_path, monkeypatch):
+    pdf_path = write_blank_pdf(tmp_path / "range.pdf", 10)
+    seen = []
+    monkeypatch.setattr("PyPDF2._page.PageObject.extract_text", lambda self: seen.append(1) or "page;")
+    assert ftt._extract_page_range(pdf_path, 3, 7) == "page;" * 4
+    assert len(seen) == 4
+
+def test_file_to_text_large_pdf_all_pages(tmp_path, service, monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+    pdf_path = write_blank_pdf(tmp_path / "large.pdf", 40)
+    ranges = []
+
+    def extract(path, start, stop):
+        ranges.append((start, stop))
+        return "".join(f"{i};" for i in range(start, stop))
+
+    # Run the ranges in-process: the split and ordering are under test, not the pool
+    monkeypatch.setattr(ftt, "_extract_page_range", extract)
+    monkeypatch.setattr(ftt.os, "cpu_count", lambda: 4)
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        monkeypatch.setattr(ftt, "_process_pool", lambda: pool)
+        result = service.file_to_text(pdf_path)
+    assert result == "".join(f"{i};" for i in range(40))
+    assert sorted(ranges) == [(0, 10), (10, 20), (20, 30), (30, 40)]
+
+def test_process_pool_is_shared():
+    assert ftt._process_pool() is ftt._process_pool()
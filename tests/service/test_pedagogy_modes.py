@@ -133,6 +133,20 @@ class TestPromptService:
         prompt_service.preload_all_prompts()
         assert len(prompt_service._prompt_cache) == len(PedagogyMode)
     
+    def test_large_prompt_read_via_mmap(self, tmp_path):
+        """Large prompt files decode identically, with newlines normalised."""
+        body = "Explain step by step.\r\n" * 4000  # > 64 KB
+        (tmp_path / PedagogyMode.EXPLANATORY.get_prompt_filename()).write_bytes(body.encode("utf-8"))
+        service = PromptService(prompts_dir=tmp_path)
+        
+        assert service.get_mode_prompt(PedagogyMode.EXPLANATORY) == body.replace("\r\n", "\n")
+    
+    def test_missing_prompt_file(self, tmp_path):
+        """A missing prompt file still raises FileNotFoundError."""
+        service = PromptService(prompts_dir=tmp_path)
+        with pytest.raises(FileNotFoundError):
+            service.get_mode_prompt(PedagogyMode.DEBUGGING)
+    
     def test_get_combined_prompt(self, prompt_service):
         """Test combining base prompt with mode prompt."""
         base = "You are an AI tutor."
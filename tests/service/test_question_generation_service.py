@@ -0,0 +1,25 @@
+"""
+test_question_generation_service.py
+Unit tests for QuestionGenerationService response parsing.
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.main.service.QuestionGenerationService import QuestionGenerationService, QuestionGenerationError
+
+@pytest.fixture
+def service(tmp_path):
+    return QuestionGenerationService(agent_client=MagicMock(), output_dir=str(tmp_path))
+
+def test_parse_json_block_after_code_fence(service):
+    reply = (
+        "The student's loop:\n```python\nprint(1)\n```\n"
+        "Questions:\n```json\n[{\"question\": \"Why?\"}]\n```"
+    )
+    assert service._parse_json_response(reply) == [{"question": "Why?"}]
+
+def test_parse_uppercase_json_fence(service):
+    assert service._parse_json_response("```JSON\n[{\"question\": \"Why?\"}]\n```") == [{"question": "Why?"}]
+
+def test_parse_rejects_non_list(service):
+    with pytest.raises(QuestionGenerationError):
+        service._parse_json_response("```json\n{\"question\": \"Why?\"}\n```")
@@ -0,0 +1,230 @@
+"""
+test_response_evaluation_service.py
+Unit tests for ResponseEvaluationService parsing and batched evaluation.
+"""
+import pytest
+from unittest.mock import MagicMock
+from src.main.service.ResponseEvaluationService import ResponseEvaluationService
+
+@pytest.fixture
+def service(tmp_path):
+    return ResponseEvaluationService(
+        agent_client=MagicMock(),
+        base_output_dir=str(tmp_path / "evaluations"),
+        responses_dir=str(tmp_path),
+        use_cache=False,
+        requests_per_minute=0,
+    )
+
+def test_load_json_skips_quoted_student_code(service):
+    reply = (
+        "The student wrote:\n```python\nfor i in range(3):\n    print(i)\n```\n"
+        "```json\n{\"total_score\": 7}\n```"
+    )
+    assert service._load_json(reply) == {"total_score": 7}
+
+class FakeEvalClient:
+    """achat stand-in: scores each answer by the number in its transcript."""
+    
+    def __init__(self, malformed_batches=False, reverse_batches=False):
+        self.malformed_batches = malformed_batches
+        self.reverse_batches = reverse_batches
+        self.calls = []
+    
+    @staticmethod
+    def evaluation(score, number=None):
+        evaluation = {
+            "correctness_score": score / 2,
+            "understanding_score": score / 2,
+            "total_score": score,
+            "feedback": f"scored {score}",
+        }
+        if number is not None:
+            evaluation["question_number"] = number
+        return evaluation
+    
+    @staticmethod
+    def scores(prompt):
+        # Each question block ends with the transcript line after this heading
+        return [int(part.split("\n", 2)[1]) for part in prompt.split("**Student's Answer (Transcribed):**")[1:]]
+    
+    async def achat(self, messages):
+        import asyncio, json
+        prompt = messages[-1]["content"][0]["text"]
+        scores = self.scores(prompt)
+        self.calls.append(len(scores) if "## Question 1" in prompt else "single")
+        # Later questions answer sooner, so completion order differs from CSV order
+        await asyncio.sleep(0.001 * (10 - scores[0]))
+        if "## Question 1" not in prompt:
+            return "```json\n" + json.dumps(self.evaluation(scores[0])) + "\n```"
+        if self.malformed_batches:
+            return '{"evaluations": [{"question_number": 1}]}'
+        items = [self.evaluation(s, n) for n, s in enumerate(scores, start=1)]
+        if self.reverse_batches:
+            items.reverse()
+        return json.dumps({"evaluations": items})
+
+def write_responses(path, scores):
+    import csv
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["question_number", "question_type", "question", "code_reference", "transcript"])
+        for i, score in enumerate(scores, start=1):
+            writer.writerow([i, "concept", f"Question {i}?", "", score])
+    return path
+
+def add_job(service, job_id, estimated_total):
+    import threading
+    service.jobs[job_id] = {
+        "total_questions": estimated_total,
+        "progress": {"questions_evaluated": 0, "total_questions": estimated_total, "percentage": 0.0},
+        "_lock": threading.Lock(),
+        "_inv_total": 1.0 / max(estimated_total, 1),
+    }
+    return service.jobs[job_id]
+
+def evaluate_csv(service, path, estimated_total=1):
+    import asyncio
+    job = add_job(service, "job", estimated_total)
+    evaluations = asyncio.run(service._evaluate_all("job", service._iter_responses_csv(str(path))))
+    return evaluations, job
+
+def test_batch_replies_mapped_back_in_csv_order(service, tmp_path):
+    service.agent_client = FakeEvalClient(reverse_batches=True)
+    service.batch_size = 3
+    scores = [9, 1, 8, 2, 7, 3, 6]
+    evaluations, _ = evaluate_csv(service, write_responses(tmp_path / "r.csv", scores))
+    
+    assert service.agent_client.calls == [3, 3, "single"]
+    assert [e["total_score"] for e in evaluations] == scores
+    assert [e["question_number"] for e in evaluations] == list(range(1, 8))
+    assert [e["question"] for e in evaluations] == [f"Question {i}?" for i in range(1, 8)]
+
+def test_malformed_batch_falls_back_to_single_questions(service, tmp_path):
+    service.agent_client = FakeEvalClient(malformed_batches=True)
+    service.batch_size = 4
+    scores = [4, 5, 6, 7, 8]
+    evaluations, _ = evaluate_csv(service, write_responses(tmp_path / "r.csv", scores))
+    
+    assert service.agent_client.calls.count(4) == 1
+    assert service.agent_client.calls.count("single") == 5
+    assert [e["total_score"] for e in evaluations] == scores
+    assert not any("error" in e for e in evaluations)
+
+def test_failed_single_question_gets_placeholder(service, tmp_path):
+    class FailingClient(FakeEvalClient):
+        async def achat(self, messages):
+            if "Question 2?" in messages[-1]["content"][0]["text"]:
+                return "no json here"
+            return await super().achat(messages)
+    
+    service.agent_client = FailingClient()
+    service.batch_size = 1
+    evaluations, _ = evaluate_csv(service, write_responses(tmp_path / "r.csv", [5, 6, 7]))
+    
+    assert [e["total_score"] for e in evaluations] == [5, 0, 7]
+    assert "error" in evaluations[1]
+    assert evaluations[1]["question_number"] == "2"
+
+def test_progress_counts_every_question_and_corrects_estimate(service, tmp_path):
+    service.agent_client = FakeEvalClient()
+    service.batch_size = 2
+    evaluations, job = evaluate_csv(service, write_responses(tmp_path / "r.csv", [1, 2, 3, 4, 5]), estimated_total=9)
+    
+    assert len(evaluations) == 5
+    assert job["total_questions"] == 5
+    assert job["progress"] == {"questions_evaluated": 5, "total_questions": 5, "percentage": 100.0}
+
+def test_iter_responses_csv_maps_columns_by_header(service, tmp_path):
+    path = tmp_path / "r.csv"
+    path.write_text(
+        'transcript,question,question_number,extra\n'
+        '"line one\nline two",What is a list?,1,x\n'
+        '\n'
+        'short row\n',
+        encoding="utf-8",
+    )
+    rows = list(service._iter_responses_csv(str(path)))
+    
+    assert len(rows) == 2
+    assert rows[0].transcript == "line one\nline two"
+    assert rows[0].question == "What is a list?"
+    assert rows[0].question_number == "1"
+    assert rows[0].question_type == "" and rows[0].code_reference == ""
+    assert rows[1].transcript == "short row" and rows[1].question == ""
+
+def test_iter_responses_csv_is_lazy(service, tmp_path):
+    path = write_responses(tmp_path / "r.csv", [1, 2, 3])
+    rows = service._iter_responses_csv(str(path))
+    assert next(rows).transcript == "1"
+    assert [r.transcript for r in rows] == ["2", "3"]
+
+def test_iter_responses_csv_empty_file(service, tmp_path):
+    path = tmp_path / "r.csv"
+    path.write_text("", encoding="utf-8")
+    assert list(service._iter_responses_csv(str(path))) == []
+
+SAMPLE_EVALUATIONS = [
+    {"question_number": 1, "question": "What is a list?", "question_type": "concept", "correctness_score": 4,
+     "understanding_score": 3.5, "total_score": 7.5, "feedback": "Good", "strengths": ["clear", "concise"],
+     "weaknesses": [], "suggested_improvements": ["examples"]},
+    {"question_number": 2, "question": "Explain {x}", "question_type": "code", "correctness_score": 0,
+     "understanding_score": 0, "total_score": 0, "feedback": "Evaluation failed: boom", "strengths": [],
+     "weaknesses": ["Evaluation failed"], "suggested_improvements": [], "error": "boom"},
+]
+
+def test_summary_csv_rows(service, tmp_path):
+    path = service._save_summary_csv(tmp_path, [dict(e) for e in SAMPLE_EVALUATIONS])
+    assert path.read_text(encoding="utf-8").splitlines() == [
+        "question_number,question_type,correctness_score,understanding_score,total_score,percentage,feedback_summary",
+        "1,concept,4,3.5,7.5,75.0,Good",
+        "2,code,0,0,0,0.0,Evaluation failed: boom",
+    ]
+
+def test_report_matches_original_layout(service, tmp_path):
+    from datetime import datetime
+    path = service._save_report(
+        tmp_path, "bob", [dict(e) for e in SAMPLE_EVALUATIONS],
+        7.5, 20, 37.5, "Unsatisfactory", 2.0, 1.75, datetime(2024, 1, 2, 3, 4, 5)
+    )
+    # Text produced by the original line-by-line writer for the same inputs
+    assert path.read_text(encoding="utf-8") == (
+        "# Oral Exam Evaluation Report\n\n**Student:** bob\n\n**Date:** 2024-01-02 03:04:05\n\n"
+        "**Overall Grade:** Unsatisfactory (37.5%)\n\n---\n\n## Summary\n\n- **Total Questions:** 2\n"
+        "- **Total Score:** 7.5/20\n- **Percentage:** 37.5%\n- **Average Correctness:** 2.00/5\n"
+        "- **Average Understanding:** 1.75/5\n\n---\n\n## Question-by-Question Results\n\n"
+        "### Question 1 (Concept) - 7.5/10 (75.0%)\n\n**Question:** What is a list?\n\n**Score Breakdown:**\n"
+        "- Correctness: 4/5\n- Understanding: 3.5/5\n- **Total: 7.5/10**\n\n**Strengths:**\n- clear\n- concise\n\n"
+        "**Feedback:** Good\n\n**Suggested Improvements:**\n- examples\n\n---\n\n"
+        "### Question 2 (Code) - 0/10 (0%)\n\n**Question:** Explain {x}\n\n**Score Breakdown:**\n"
+        "- Correctness: 0/5\n- Understanding: 0/5\n- **Total: 0/10**\n\n**Areas for Improvement:**\n"
+        "- Evaluation failed\n\n**Feedback:** Evaluation failed: boom\n\n---\n\n## Overall Performance\n\n"
+        "You scored 7.5 out of 20 points (37.5%), earning a grade of **Unsatisfactory**.\n\n"
+        "Your responses indicate areas needing significant improvement. Review the feedback carefully.\n"
+    )
+
+def test_evaluation_job_runs_end_to_end(service, tmp_path):
+    import json
+    service.agent_client = FakeEvalClient()
+    service.batch_size = 2
+    write_responses(tmp_path / "alice_responses.csv", [10, 6, 8])
+    
+    job_id = service.start_evaluation("alice", "alice_responses.csv")["job_id"]
+    service.jobs[job_id]["future"].result(timeout=10)
+    status = service.get_job_status(job_id)
+    
+    assert status["status"] == "completed"
+    result = status["result"]
+    assert result["total_questions"] == 3
+    assert result["total_score"] == 24
+    assert result["percentage"] == 80.0
+    assert result["grade"] == "Excellent"
+    assert result["correctness_avg"] == 4.0
+    assert result["understanding_avg"] == 4.0
+    with open(result["detailed_json_path"], encoding="utf-8") as f:
+        detailed = json.load(f)
+    assert [e["total_score"] for e in detailed["evaluations"]] == [10, 6, 8]
+    with open(result["summary_csv_path"], encoding="utf-8") as f:
+        assert [line.split(",")[5] for line in f.read().splitlines()[1:]] == ["100.0", "60.0", "80.0"]
+    with open(result["report_path"], encoding="utf-8") as f:
+        assert "You scored 24.0 out of 30 points (80.0%)" in f.read()
@@ -0,0 +1,71 @@
+"""
+test_semantic_cache.py
+Unit tests for SemanticCache.
+"""
+from src.main.service.SemanticCache import SemanticCache
+
+
+PAYLOAD = {"answer": "A list is an ordered collection", "model_id": "m", "context_ids": ["doc-1"]}
+
+
+def test_exact_repeat_hits_after_normalisation():
+    cache = SemanticCache()
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD)
+    assert cache.check("  what IS a   list? ", [0.0, 1.0]) == PAYLOAD
+
+
+def test_similar_embedding_hits():
+    cache = SemanticCache(threshold=0.95)
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD)
+    assert cache.check("Explain lists", [0.99, 0.05]) == PAYLOAD
+
+
+def test_dissimilar_embedding_misses():
+    cache = SemanticCache(threshold=0.95)
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD)
+    assert cache.check("What is recursion?", [0.5, 0.5]) is None
+
+
+def test_namespaces_are_isolated():
+    cache = SemanticCache()
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD, namespace="explanatory")
+    assert cache.check("What is a list?", [1.0, 0.0], namespace="practice") is None
+
+
+def test_lru_eviction():
+    cache = SemanticCache(max_entries=2)
+    cache.store("q1", [1.0, 0.0, 0.0], PAYLOAD)
+    cache.store("q2", [0.0, 1.0, 0.0], PAYLOAD)
+    cache.check("q1", [1.0, 0.0, 0.0])  # q1 becomes most recently used
+    cache.store("q3", [0.0, 0.0, 1.0], PAYLOAD)
+    assert len(cache) == 2
+    assert cache.check("q2", [0.0, 1.0, 0.0]) is None
+    assert cache.check("q1", [1.0, 0.0, 0.0]) == PAYLOAD
+
+
+def test_expired_entries_miss():
+    cache = SemanticCache(ttl_seconds=-1)
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD)
+    assert cache.check("What is a list?", [1.0, 0.0]) is None
+
+
+def test_similarity_scan_runs_outside_lock(monkeypatch):
+    import numpy as np
+    cache = SemanticCache(threshold=0.95)
+    cache.store("What is a list?", [1.0, 0.0], PAYLOAD)
+    held = []
+    real_stack = np.stack
+
+    def stack(arrays):
+        held.append(cache._lock.locked())
+        return real_stack(arrays)
+
+    monkeypatch.setattr(np, "stack", stack)
+    assert cache.check("Explain lists", [0.99, 0.05]) == PAYLOAD
+    assert held == [False]
+
+
+def test_mismatched_dimensions_are_skipped():
+    cache = SemanticCache(threshold=0.95)
+    cache.store("old model", [1.0, 0.0, 0.0], PAYLOAD)
+    assert cache.check("Explain lists", [1.0, 0.0]) is None
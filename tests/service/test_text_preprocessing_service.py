@@ -4,7 +4,7 @@ Unit tests for TextPreprocessingService.preprocess_to_markdown.
 """
 import pytest
 from unittest.mock import MagicMock
-from src.main.service.TextPreprocessingService import TextPreprocessingService
+from src.main.service.TextPreprocessingService import TextPreprocessingService, _load_config
 
 @pytest.fixture
 def service():
@@ -12,6 +12,17 @@ def service():
     svc.llm = MagicMock()
     return svc
 
+@pytest.fixture
+def set_env(service, monkeypatch):
+    """Change config env vars and reload the service's once-read config."""
+    def apply(**env):
+        for name, value in env.items():
+            monkeypatch.setenv(name, value)
+        _load_config.cache_clear()
+        service._cfg = _load_config()
+    yield apply
+    _load_config.cache_clear()
+
 def test_preprocess_to_markdown_string(service):
     service.llm.chat.return_value = "# Heading\nContent"
     result = service.preprocess_to_markdown("Some text")
@@ -27,3 +38,97 @@ def test_preprocess_to_markdown_error(service):
     with pytest.raises(TypeError):
         service.preprocess_to_markdown("Some text")
 
+
+def test_preprocess_to_markdown_chunks_keep_order(service, set_env):
+    set_env(BEDROCK_MAX_INPUT_CHARS="400")
+    service.llm.chat.side_effect = lambda messages, **kw: messages[-1]["content"][0]["text"].split("]\n", 1)[0] + "]"
+    result = service.preprocess_to_markdown(" ".join(f"word{i}" for i in range(400)))
+    parts = result.split("\n\n---\n\n")
+    total = len(parts)
+    assert total > 1
+    assert [p.rsplit("[Chunk ", 1)[1] for p in parts] == [f"{i}/{total}]" for i in range(1, total + 1)]
+
+def test_stream_markdown_yields_deltas(service):
+    service.llm.chat.return_value = iter(["# Heading", "\nContent"])
+    assert list(service.stream_markdown("Some text")) == ["# Heading", "\nContent"]
+    assert service.llm.chat.call_args.kwargs["stream"] is True
+
+def test_preprocess_to_markdown_does_not_stream(service):
+    service.llm.chat.return_value = "# Heading\nContent"
+    service.preprocess_to_markdown("Some text")
+    assert "stream" not in service.llm.chat.call_args.kwargs
+
+def test_split_text_into_chunks_slices_on_word_boundaries(service):
+    text = "alpha beta\ngamma  delta " * 50
+    chunks = service._split_text_into_chunks("", text, max_chars=400)
+    assert len(chunks) > 1
+    assert all(len(c) <= 400 - 64 for c in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+    assert all(c in text for c in chunks)
+
+def test_repeated_input_reuses_cached_output(service):
+    service.llm.chat.return_value = "# Heading\nContent"
+    assert service.preprocess_to_markdown("Same text") == "# Heading\nContent"
+    assert service.preprocess_to_markdown("Same text") == "# Heading\nContent"
+    assert service.llm.chat.call_count == 1
+    service.preprocess_to_markdown("Other text")
+    assert service.llm.chat.call_count == 2
+
+def test_ordered_results_bounds_in_flight_work():
+    from concurrent.futures import ThreadPoolExecutor
+    submitted = []
+
+    def fn(i):
+        submitted.append(i)
+        return i * 10
+
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        results = TextPreprocessingService._ordered_results(ex, fn, range(10), window=3)
+        assert next(results) == 0
+        assert len(submitted) <= 3
+        assert list(results) == [i * 10 for i in range(1, 10)]
+
+def test_instructions_sent_as_system_message(service):
+    service.llm.chat.return_value = "ok"
+    service.preprocess_to_markdown("Some text")
+    system, user = service.llm.chat.call_args.args[0]
+    assert system["role"] == "system"
+    assert user == {"role": "user", "content": [{"text": "Some text"}]}
+
+def test_byte_budget_splits_non_ascii_text(service, set_env):
+    set_env(BEDROCK_MAX_INPUT_CHARS="100000", BEDROCK_MAX_INPUT_BYTES="4000")
+    service.llm.chat.side_effect = lambda messages, **kw: messages[-1]["content"][0]["text"]
+    text = " ".join(["日本語のテキスト"] * 400)
+    result = service.preprocess_to_markdown(text)
+    bodies = [part.split("\n", 1)[1] for part in result.split("\n\n---\n\n")]
+    assert len(bodies) > 1
+    assert " ".join(bodies) == text
+
+def test_get_default_shares_one_instance_per_config():
+    a = TextPreprocessingService.get_default()
+    assert TextPreprocessingService.get_default() is a
+    assert TextPreprocessingService.get_default(prompt_path="prompts/other.md") is not a
+
+def test_apreprocess_to_markdown_matches_sync_chunking(service, set_env):
+    import asyncio
+    set_env(BEDROCK_MAX_INPUT_CHARS="400")
+
+    async def achat(messages, **kw):
+        return messages[-1]["content"][0]["text"].split("]\n", 1)[0] + "]"
+
+    service.llm.chat.side_effect = lambda messages, **kw: messages[-1]["content"][0]["text"].split("]\n", 1)[0] + "]"
+    service.llm.achat = achat
+    text = " ".join(f"word{i}" for i in range(400))
+    expected = service.preprocess_to_markdown(text)
+    service._cache.clear()
+    assert asyncio.run(service.apreprocess_to_markdown(text)) == expected
+
+def test_config_is_read_once(service, monkeypatch):
+    monkeypatch.setenv("BEDROCK_MAX_INPUT_CHARS", "1")
+    assert service._cfg.max_input_chars != 1
+    assert TextPreprocessingService()._cfg is service._cfg
+
+def test_short_input_skips_chunk_scan(service, monkeypatch):
+    monkeypatch.setattr(TextPreprocessingService, "_chunk_spans", MagicMock(side_effect=AssertionError))
+    service.llm.chat.return_value = "ok"
+    assert service.preprocess_to_markdown("short") == "ok"
@@ -0,0 +1,32 @@
+"""
+test_extract_json.py
+Unit tests for ExtractJson.extract_json_block.
+"""
+from src.main.utils.ExtractJson import extract_json_block
+
+def test_plain_text_returned_stripped():
+    assert extract_json_block('  [1, 2]\n') == "[1, 2]"
+
+def test_json_fence():
+    assert extract_json_block('Here:\n```json\n{"a": 1}\n```\nDone') == '{"a": 1}'
+
+def test_json_fence_preferred_over_earlier_code_fence():
+    text = 'Student wrote:\n```python\nprint(1)\n```\nResult:\n```json\n[{"q": 1}]\n```'
+    assert extract_json_block(text) == '[{"q": 1}]'
+
+def test_json_fence_preferred_over_earlier_bare_fence():
+    text = '```\nprint(1)\n```\n```json\n{"a": 1}\n```'
+    assert extract_json_block(text) == '{"a": 1}'
+
+def test_uppercase_json_tag_not_captured():
+    assert extract_json_block('```JSON\n{"a": 1}\n```') == '{"a": 1}'
+
+def test_bare_fence_used_when_no_json_fence():
+    text = '```python\nx = 1\n```\n```\n[1]\n```'
+    assert extract_json_block(text) == "[1]"
+
+def test_unclosed_fence_runs_to_end():
+    assert extract_json_block('```json\n{"a": 1}') == '{"a": 1}'
+
+def test_inline_fence():
+    assert extract_json_block('```json[1, 2]```') == "[1, 2]"
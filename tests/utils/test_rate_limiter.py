@@ -0,0 +1,56 @@
+"""
+test_rate_limiter.py
+Unit tests for RateLimiter.SlidingWindowRateLimiter and TokenBucketRateLimiter.
+"""
+import asyncio
+import pytest
+from src.main.utils.RateLimiter import SlidingWindowRateLimiter, TokenBucketRateLimiter
+
+def test_calls_under_limit_do_not_wait():
+    limiter = SlidingWindowRateLimiter(max_calls=3, period=60.0)
+    assert [limiter._reserve() for _ in range(3)] == [0, 0, 0]
+
+def test_call_over_limit_waits_for_window():
+    limiter = SlidingWindowRateLimiter(max_calls=2, period=60.0)
+    limiter._reserve()
+    limiter._reserve()
+    delay = limiter._reserve()
+    assert 59.0 < delay <= 60.0
+
+def test_waiters_are_spread_across_windows():
+    limiter = SlidingWindowRateLimiter(max_calls=1, period=10.0)
+    delays = [limiter._reserve() for _ in range(3)]
+    assert delays[0] == 0
+    assert 9.0 < delays[1] <= 10.0
+    assert 19.0 < delays[2] <= 20.0
+
+def test_async_acquire_sleeps_until_slot():
+    limiter = SlidingWindowRateLimiter(max_calls=1, period=0.05)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        await limiter.acquire()
+        await limiter.acquire()
+        return loop.time() - start
+
+    assert asyncio.run(run()) >= 0.04
+
+def test_invalid_limit_rejected():
+    with pytest.raises(ValueError):
+        SlidingWindowRateLimiter(max_calls=0)
+
+def test_token_bucket_spends_initial_capacity_without_waiting():
+    bucket = TokenBucketRateLimiter(capacity=1000, period=60.0)
+    assert bucket._reserve(600) == 0
+    assert bucket._reserve(400) == 0
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucketRateLimiter(capacity=600, period=60.0)  # refills 10 units/s
+    bucket._reserve(600)
+    delay = bucket._reserve(100)
+    assert 9.0 < delay <= 10.0
+
+def test_token_bucket_caps_oversized_requests():
+    bucket = TokenBucketRateLimiter(capacity=100, period=60.0)
+    assert bucket._reserve(10_000) == 0
@@ -2,8 +2,9 @@
 test_read_prompt.py
 Unit tests for ReadPrompt.read_prompt.
 """
+import os
 import pytest
-from src.main.utils.ReadPrompt import read_prompt
+from src.main.utils.ReadPrompt import read_prompt, clear_prompt_cache, _resolve, _read_cached
 from pathlib import Path
 
 def test_read_prompt(tmp_path):
@@ -12,3 +13,41 @@ def test_read_prompt(tmp_path):
     result = read_prompt(prompt_path=prompt_file)
     assert result == "Hello world!"
 
+
+def test_read_prompt_rereads_after_edit(tmp_path):
+    prompt_file = tmp_path / "prompt.md"
+    prompt_file.write_text("v1")
+    assert read_prompt(prompt_path=prompt_file) == "v1"
+    prompt_file.write_text("v2")
+    os.utime(prompt_file, ns=(0, prompt_file.stat().st_mtime_ns + 1_000_000))
+    assert read_prompt(prompt_path=prompt_file) == "v2"
+
+def test_read_prompt_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        read_prompt(prompt_path=tmp_path / "missing_prompt.md")
+
+
+def test_read_prompt_relative_path_follows_working_directory(tmp_path, monkeypatch):
+    for name in ("a", "b"):
+        (tmp_path / name / "prompts").mkdir(parents=True)
+        (tmp_path / name / "prompts" / "prompt.md").write_text(name)
+    monkeypatch.chdir(tmp_path / "a")
+    assert read_prompt(prompt_path="prompt.md") == "a"
+    monkeypatch.chdir(tmp_path / "b")
+    assert read_prompt(prompt_path="prompt.md") == "b"
+
+
+def test_read_prompt_falls_back_to_cwd_prompts_dir(tmp_path, monkeypatch):
+    (tmp_path / "prompts").mkdir()
+    (tmp_path / "prompts" / "only_here.md").write_text("fallback")
+    monkeypatch.chdir(tmp_path)
+    assert read_prompt(prompt_path=tmp_path / "elsewhere" / "only_here.md") == "fallback"
+
+
+def test_clear_prompt_cache(tmp_path):
+    prompt_file = tmp_path / "prompt.md"
+    prompt_file.write_text("Hello")
+    read_prompt(prompt_path=prompt_file)
+    clear_prompt_cache()
+    assert _resolve.cache_info().currsize == 0
+    assert _read_cached.cache_info().currsize == 0
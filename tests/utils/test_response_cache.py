@@ -0,0 +1,27 @@
+"""
+test_response_cache.py
+Unit tests for ResponseCache.
+"""
+from src.main.utils.ResponseCache import ResponseCache
+
+def test_miss_returns_none(tmp_path):
+    cache = ResponseCache(tmp_path / "c.sqlite3")
+    assert cache.get(ResponseCache.make_key("rubric", "q")) is None
+
+def test_set_then_get_round_trips(tmp_path):
+    cache = ResponseCache(tmp_path / "c.sqlite3")
+    key = ResponseCache.make_key("rubric", "q")
+    cache.set(key, {"total_score": 7, "feedback": "héllo"})
+    assert cache.get(key) == {"total_score": 7, "feedback": "héllo"}
+
+def test_entries_persist_across_instances(tmp_path):
+    path = tmp_path / "nested" / "c.sqlite3"
+    key = ResponseCache.make_key("rubric", "q")
+    first = ResponseCache(path)
+    first.set(key, [1, 2])
+    first.close()
+    assert ResponseCache(path).get(key) == [1, 2]
+
+def test_key_depends_on_part_boundaries():
+    assert ResponseCache.make_key("ab", "c") != ResponseCache.make_key("a", "bc")
+    assert ResponseCache.make_key("ab", "c") == ResponseCache.make_key("ab", "c")
@@ -0,0 +1,77 @@
+"""
+test_retry.py
+Unit tests for the Retry helpers (backoff, Retry-After handling, fail-fast).
+"""
+import asyncio
+import pytest
+
+from src.main.utils import Retry
+from src.main.utils.Retry import acall_with_retry, call_with_retry, parse_retry_after
+
+
+class Transient(Exception):
+    def __init__(self, retry_after=None):
+        super().__init__("transient")
+        self.retry_after = retry_after
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    recorded = []
+    monkeypatch.setattr(Retry.time, "sleep", recorded.append)
+
+    async def fake_sleep(delay):
+        recorded.append(delay)
+
+    monkeypatch.setattr(Retry.asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_retries_until_success(sleeps):
+    calls = iter([Transient(), Transient(), "ok"])
+
+    def fn():
+        value = next(calls)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    assert call_with_retry(fn, retry_on=(Transient,)) == "ok"
+    assert len(sleeps) == 2
+
+
+def test_non_retryable_fails_fast(sleeps):
+    def fn():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        call_with_retry(fn, retry_on=(Transient,))
+    assert sleeps == []
+
+
+def test_gives_up_after_attempts(sleeps):
+    def fn():
+        raise Transient()
+
+    with pytest.raises(Transient):
+        call_with_retry(fn, retry_on=(Transient,), attempts=3)
+    assert len(sleeps) == 2
+
+
+def test_async_honours_retry_after(sleeps):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        if len(calls) == 1:
+            raise Transient(retry_after=7)
+        return "done"
+
+    assert asyncio.run(acall_with_retry(fn, retry_on=(Transient,))) == "done"
+    assert sleeps == [7.0]
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("3") == 3.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
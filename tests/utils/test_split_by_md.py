@@ -3,7 +3,7 @@ test_split_by_md.py
 Unit tests for SplitByMd.split_by_markdown_heading.
 """
 import pytest
-from src.main.utils.SplitByMd import split_by_markdown_heading
+from src.main.utils.SplitByMd import iter_markdown_sections, split_by_markdown_heading
 
 def test_split_basic():
     text = "## Section\nContent\n## Next\nMore"
@@ -12,3 +12,23 @@ def test_split_basic():
     assert chunks[0]["title"] == "Section"
     assert "Content" in chunks[0]["content"]
 
+
+def test_split_without_headings():
+    assert split_by_markdown_heading("  plain text \n") == [{"title": "", "content": "plain text"}]
+    assert split_by_markdown_heading("   ") == []
+
+def test_split_ignores_deeper_headings_and_preamble():
+    text = "intro\n## One\na\n### Sub\nb\n## Two\nc"
+    chunks = split_by_markdown_heading(text)
+    assert [c["title"] for c in chunks] == ["One", "Two"]
+    assert chunks[0]["content"] == "a\n### Sub\nb"
+    assert chunks[1]["content"] == "c"
+
+def test_heading_title_must_be_on_the_same_line():
+    chunks = split_by_markdown_heading("##\nnot a title\n## Real\nbody")
+    assert chunks == [{"title": "Real", "content": "body"}]
+
+def test_iter_sections_is_lazy():
+    sections = iter_markdown_sections("## A\none\n## B\ntwo")
+    assert next(sections) == {"title": "A", "content": "one"}
+    assert list(sections) == [{"title": "B", "content": "two"}]